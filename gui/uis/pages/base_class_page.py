@@ -6,12 +6,14 @@
 # ///////////////////////////////////////////////////////////////
 
 import os
+import cv2
 from PySide6.QtWidgets import QWidget, QLabel, QHBoxLayout, QVBoxLayout, QSizePolicy, QMainWindow, QMenu, QMessageBox, QInputDialog, QDoubleSpinBox, QDialog, QDialogButtonBox, QFrame, QPushButton, QGraphicsDropShadowEffect
-from PySide6.QtGui import QIcon, Qt, QFont, QColor
-from PySide6.QtCore import QCoreApplication
+from PySide6.QtGui import QIcon, Qt, QFont, QColor, QGuiApplication
+from PySide6.QtCore import QCoreApplication, QTimer
 from gui.core.functions import Functions
 from gui.widgets import PyPushButton
 from ...widgets.py_add_icon_dialog import ModernAddIconDialog
+from rotation.config_store import get_config_store
 
 
 class BaseClassPage:
@@ -32,6 +34,12 @@ class BaseClassPage:
         # 用于存储图标widget和路径的字典
         self.icon_widgets = {}  # 存储所有图标widget，key为图标名称，value为icon_widget
         self.icon_paths = {}  # 存储图标路径，key为图标名称，value为图标文件路径
+
+        # rotation_config.yaml 的进程级缓存（与引擎共享），文件只在变化时重新解析
+        self.config_store = get_config_store()
+        self._config_watch_timer = None
+        # 当前天赋图标尺寸的缓存：(图标目录, [(名称, (高, 宽))])，见 _talent_template_sizes
+        self._template_sizes_cache = None
         
     def get_game_version(self):
         """返回游戏版本"""
@@ -521,7 +529,7 @@ QPushButton:pressed {{
         
         if hasattr(self, 'save_config_with_rules'):
             self.save_config_with_rules()
-            self._restart_listener_if_running()
+            self._reconfigure_listener_if_running()
             self.show_modern_message(
                 "Threshold Set",
                 f"Threshold for '{ability_name}' has been set to {threshold_value:.2f}",
@@ -573,126 +581,107 @@ QPushButton:pressed {{
             threshold_value = threshold_spin.value()
             self._validate_and_save_threshold(ability_name, threshold_value)
     
-    def _restart_listener_if_running(self):
+    def load_rotation_config(self):
+        """rotation/rotation_config.yaml 的只读快照（来自共享缓存，不会重新打开、解析文件）。"""
+        return self.config_store.snapshot()
+
+    def _start_config_watch(self, interval_ms=1000):
         """
-        如果监听正在运行，重启它以应用新的阈值设置。
-        子类可以覆盖此方法以实现特定的重启逻辑。
+        定时检查 rotation_config.yaml 是否被外部修改（只 stat 文件，变化时才重新解析），
+        region / zoom / hdr_darkness 变化时在 GUI 线程中调用 _on_rotation_config_changed。
         """
-        # 检查是否有 rotation_thread 属性
-        if not hasattr(self, 'rotation_thread'):
-            return
-        
-        # 对于 classic 版本：检查 is_running
-        if hasattr(self, 'is_running') and self.is_running:
-            if self.rotation_thread and self.rotation_thread.isRunning():
-                print("[DEBUG] Restarting listener to apply new threshold settings...", flush=True)
-                # 停止当前线程
-                self.rotation_thread.stop()
-                # 等待线程结束（异步，真正的清理在 on_thread_finished 中）
-                # 使用 QTimer 延迟重启，确保线程完全停止
-                from PySide6.QtCore import QTimer
-                QTimer.singleShot(500, self._restart_classic_listener)
-        
-        # 对于 retail 版本：检查 rotation_mode
-        elif hasattr(self, 'rotation_mode') and self.rotation_mode in ("run", "preview"):
-            if self.rotation_thread and self.rotation_thread.isRunning():
-                print("[DEBUG] Restarting listener to apply new threshold settings...", flush=True)
-                # 保存当前模式
-                saved_mode = self.rotation_mode
-                # 停止当前线程
-                self.rotation_thread.stop()
-                # 使用 QTimer 延迟重启，确保线程完全停止
-                from PySide6.QtCore import QTimer
-                QTimer.singleShot(500, lambda: self._restart_retail_listener(saved_mode))
-    
-    def _restart_classic_listener(self):
-        """重启 classic 版本的监听"""
-        if not hasattr(self, 'selected_class_name') or not hasattr(self, 'selected_talent_name'):
+        if self._config_watch_timer is not None:
             return
-        
-        # 如果线程还在运行，再等待一下
-        if self.rotation_thread and self.rotation_thread.isRunning():
-            from PySide6.QtCore import QTimer
-            QTimer.singleShot(300, self._restart_classic_listener)
+        self.config_store.subscribe(self._on_rotation_config_changed, keys=("hdr_darkness", "region", "zoom"))
+        self._config_watch_timer = QTimer()
+        self._config_watch_timer.timeout.connect(self.config_store.poll)
+        self._config_watch_timer.start(interval_ms)
+
+    def _on_rotation_config_changed(self, snapshot, changed):
+        """rotation_config.yaml 中关心的字段变化时调用，子类按需覆盖。"""
+
+    def _preview_max_fps(self):
+        """预览帧率上限：当前屏幕的刷新率，取不到时按 60FPS。"""
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 0
+        return rate if rate and rate > 0 else 60.0
+
+    def _set_engine_preview(self, enabled):
+        """开关 rotation_thread 的预览帧输出（预览帧由引擎线程产出，GUI 只绘制）。"""
+        rotation_thread = getattr(self, 'rotation_thread', None)
+        if rotation_thread is not None:
+            rotation_thread.set_preview_enabled(enabled, self._preview_max_fps())
+
+    def _connect_engine_preview(self):
+        """把新建的 rotation_thread 的预览信号接到 _on_preview_ready，并按 preview_active 开关预览输出。"""
+        rotation_thread = getattr(self, 'rotation_thread', None)
+        if rotation_thread is None:
             return
-        
-        config_filepath = self.load_latest_config()
-        if not config_filepath:
-            print("Configuration file not found, unable to restart the rotation thread.")
+        if hasattr(self, '_on_preview_ready'):
+            rotation_thread.preview_ready.connect(self._on_preview_ready)
+        self._set_engine_preview(getattr(self, 'preview_active', False))
+
+    def _reconfigure_listener_if_running(self):
+        """
+        如果监听正在运行，把刚保存的按键绑定 / 阈值 / 缩放热更新到引擎，
+        不停止、不重建 rotation_thread，匹配不中断。
+        """
+        rotation_thread = getattr(self, 'rotation_thread', None)
+        if rotation_thread is None or not rotation_thread.isRunning():
             return
-        
-        from rotation import RotationThread
-        print("Restarting RotationThread after threshold update...")
-        self.rotation_thread = RotationThread(
-            config_file='rotation_config.yaml',
-            keybind_file=config_filepath,
-            class_name=self.selected_class_name,
-            talent_name=self.selected_talent_name,
-            game_version='classic'
-        )
-        self.rotation_thread.finished.connect(self.on_thread_finished)
-        if hasattr(self, 'on_icon_matched'):
-            self.rotation_thread.icon_matched.connect(self.on_icon_matched)
-        
-        self.rotation_thread.start()
-        self.is_running = True
-        if hasattr(self, 'start_button'):
-            from PySide6.QtGui import QIcon
-            from gui.core.functions import Functions
-            self.start_button.setText("Stop")
-            self.start_button.setIcon(QIcon(Functions.set_svg_icon("pause.svg")))
-        print("RotationThread restarted.")
+        print("[DEBUG] Applying updated settings to the running listener...", flush=True)
+        rotation_thread.reload_keybinds()
     
-    def _restart_retail_listener(self, saved_mode):
-        """重启 retail 版本的监听"""
-        if not hasattr(self, 'selected_class_name') or not hasattr(self, 'selected_talent_name'):
-            return
-        
-        # 如果线程还在运行，再等待一下
-        if self.rotation_thread and self.rotation_thread.isRunning():
-            from PySide6.QtCore import QTimer
-            QTimer.singleShot(300, lambda: self._restart_retail_listener(saved_mode))
-            return
-        
-        config_filepath = self.load_latest_config()
-        if not config_filepath:
-            print("Configuration file not found, unable to restart the rotation thread.")
+    def _reconfigure_engine(self, **changes):
+        """
+        把控件的当前值（zoom / hdr_darkness）立即推给运行中的引擎，拖动滑动条时预览随之更新；
+        只修改引擎，不写配置文件（松开滑动条时才保存）。
+        """
+        rotation_thread = getattr(self, 'rotation_thread', None)
+        if rotation_thread is None or not rotation_thread.isRunning():
             return
-        
-        from rotation import RotationThread
-        print(f"Restarting RotationThread in {saved_mode} mode after threshold update...")
-        self.rotation_thread = RotationThread(
-            config_file='rotation_config.yaml',
-            keybind_file=config_filepath,
-            class_name=self.selected_class_name,
-            talent_name=self.selected_talent_name,
-            game_version='retail'
-        )
-        self.rotation_thread.finished.connect(self.on_thread_finished)
-        if hasattr(self, 'on_icon_matched'):
-            self.rotation_thread.icon_matched.connect(self.on_icon_matched)
-        
-        self.rotation_thread.set_mode(saved_mode)
-        self.rotation_thread.start()
-        self.rotation_mode = saved_mode
-        self.is_running = True
-        
-        # 更新按钮状态
-        if hasattr(self, 'start_button'):
-            from PySide6.QtGui import QIcon
-            from gui.core.functions import Functions
-            if saved_mode == "run":
-                self.start_button.setText("Stop")
-                self.start_button.setIcon(QIcon(Functions.set_svg_icon("pause.svg")))
-            elif saved_mode == "preview":
-                self.start_button.setText("Start")
-                self.start_button.setIcon(QIcon(Functions.set_svg_icon("start.svg")))
-                if hasattr(self, 'preview_button'):
-                    self.preview_button.setText("Stop Preview")
-                    self.preview_button.setIcon(QIcon(Functions.set_svg_icon("pause.svg")))
-                    self.preview_active = True
-        print("RotationThread restarted.")
-    
+        rotation_thread.reconfigure(**changes)
+
+    def _talent_icons_dir(self):
+        """当前职业 / 天赋的技能图标目录，子类按游戏版本实现。"""
+        raise NotImplementedError("Subclasses must implement _talent_icons_dir method")
+
+    def _talent_template_sizes(self):
+        """
+        当前天赋技能图标的 (名称, (高, 宽)) 列表，用于缩放告警与开启预览前的检查。
+
+        - 必须已经选择当前职业和天赋，并且天赋技能区域已展开；
+        - 按图标目录缓存，切换职业 / 天赋后才重新读取。
+        """
+        if not self.selected_class_name or not self.selected_talent_name:
+            return []
+        if not self.talent_ability.isVisible():
+            return []
+
+        templates_dir = self._talent_icons_dir()
+        cached = self._template_sizes_cache
+        if cached is not None and cached[0] == templates_dir:
+            return cached[1]
+        if not os.path.isdir(templates_dir):
+            print(f"未找到天赋图标目录: {templates_dir}")
+            return []
+
+        sizes = []
+        supported_extensions = (".tga", ".png", ".jpg", ".jpeg")
+        for filename in os.listdir(templates_dir):
+            if not filename.lower().endswith(supported_extensions):
+                continue
+            img = cv2.imread(os.path.join(templates_dir, filename), cv2.IMREAD_UNCHANGED)
+            if img is None or img.size == 0:
+                continue
+            sizes.append((os.path.splitext(filename)[0], img.shape[:2]))
+
+        if not sizes:
+            print(f"天赋目录中未找到可用的图标: {templates_dir}")
+
+        self._template_sizes_cache = (templates_dir, sizes)
+        return sizes
+
     def _calculate_dialog_height(self, message, base_height=280, fixed_part=200):
         """计算对话框高度"""
         message_label_temp = QLabel(message)
@@ -1115,6 +1104,7 @@ QPushButton:pressed {{
                     # 保存更新后的配置（如果子类实现了此方法）
                     if hasattr(self, 'save_config_with_rules'):
                         self.save_config_with_rules()
+                        self._reconfigure_listener_if_running()
                 
                 # 刷新页面，重新加载图标
                 self.reload_icons()
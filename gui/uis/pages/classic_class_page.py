@@ -2,10 +2,6 @@ import json
 import os
 import sys
 
-import yaml
-import cv2
-import numpy as np
-from PIL import ImageGrab
 from PySide6.QtCore import QCoreApplication, QPropertyAnimation, QEasingCurve, QRect, QSize, QThread, Signal, QTimer, QPoint
 from PySide6.QtGui import QIcon, Qt, QPixmap, QFont, QColor, QImage, QPainter, QPen, QRegion, QGuiApplication
 from PySide6.QtWidgets import QPushButton, QGridLayout, QVBoxLayout, QLabel, QHBoxLayout, QWidget, \
@@ -14,10 +10,8 @@ from PySide6.QtWidgets import QGraphicsDropShadowEffect
 from gui.core.json_settings import Settings
 from gui.core.functions import Functions
 from gui.core.json_themes import Themes
-from gui.widgets import PyGroupbox, PyPushButton, PyLoggerWindow
+from gui.widgets import PyGroupbox, PyPushButton, PyLoggerWindow, PyPreviewLabel
 from rotation import RotationThread
-from rotation.matcher import ImageMatcher
-from rotation.template_matcher import TemplateMatcher
 from .key_binding import KeyBindDialog
 from ...widgets.py_dialog import PyDialog
 from ...widgets.py_add_icon_dialog import ModernAddIconDialog
@@ -120,15 +114,10 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.current_highlighted_icon = None  # 当前高亮的图标名称
         self.highlight_animations = {}  # 存储高亮动画
 
-        # 预览相关缓存（按当前天赋缓存模板）
-        self.preview_templates = None  # 用于存储当前天赋下的模板 (name, bgr) 列表
-        self.preview_class_name = None
-        self.preview_talent_name = None
-        # 实时预览定时器（默认关闭，60FPS）
-        self.preview_timer = QTimer(self.main_window)
-        self.preview_timer.setInterval(int(1000 / 60))
-        self.preview_timer.timeout.connect(self._preview_tick)
+        # 预览帧由 RotationThread 的引擎线程产出（按屏幕刷新率节流），GUI 只负责绘制；
+        # 未在运行时开启预览会以 "preview" 模式单独启动一个 RotationThread
         self.preview_active = False
+        self.preview_owns_thread = False
 
         # HDR 亮度参数（0.1 - 5.0，数值越小画面越暗，>1 会整体变亮）
         self.hdr_darkness = 0.3
@@ -195,7 +184,7 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.page_skills_layout.addWidget(self.preview_group)
 
         # 预览区域：左侧为 region 截图，右侧为最佳匹配图标 + 信息
-        self.preview_region_label = QLabel()
+        self.preview_region_label = PyPreviewLabel()
         self.preview_region_label.setFixedSize(220, 220)
         self.preview_region_label.setStyleSheet("border: 1px solid rgba(255, 255, 255, 50);")
 
@@ -205,7 +194,7 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.cropped_image_label.setStyleSheet("border: 1px solid rgba(255, 255, 255, 50);")
         self.cropped_image_label.setVisible(False)
 
-        self.preview_best_icon_label = QLabel()
+        self.preview_best_icon_label = PyPreviewLabel()
         self.preview_best_icon_label.setFixedSize(72, 72)
         self.preview_best_icon_label.setStyleSheet("border: 1px solid rgba(255, 255, 255, 50);")
 
@@ -215,6 +204,13 @@ class Ui_ClassicClassPage(BaseClassPage):
         )
         self.preview_coordinates_label.setVisible(False)
 
+        # 实时性能：FPS 与截图→按键端到端延迟（由 RotationThread.stats_updated 刷新）
+        self.preview_stats_label = QLabel()
+        self.preview_stats_label.setStyleSheet(
+            "color: white; background-color: rgba(0, 0, 0, 120); padding: 6px; border-radius: 6px;"
+        )
+        self.preview_stats_label.setVisible(False)
+
         # 模板缩放控制：滑动条 + 精确输入框（0.1 - 5.0）
         self.template_scale = 1.0
         self.scale_slider = QSlider(Qt.Horizontal)
@@ -253,6 +249,7 @@ class Ui_ClassicClassPage(BaseClassPage):
         # 从配置初始化一次缩放值和 HDR 亮度
         self._init_template_scale_from_config()
         self._init_hdr_from_config()
+        self._start_config_watch()
 
         # 预览控制按钮（开始/停止）
         self.preview_button = self.create_button(icon="refresh.svg")
@@ -271,6 +268,7 @@ class Ui_ClassicClassPage(BaseClassPage):
         right_box = QVBoxLayout()
         right_box.addWidget(self.preview_best_icon_label, 0, Qt.AlignTop)
         right_box.addWidget(self.preview_coordinates_label, 0, Qt.AlignTop)
+        right_box.addWidget(self.preview_stats_label, 0, Qt.AlignTop)
         right_box.addStretch()
 
         # Scale 告警标签
@@ -382,10 +380,7 @@ class Ui_ClassicClassPage(BaseClassPage):
         if self.is_running and self.rotation_thread and self.rotation_thread.isRunning():
             self.toggle_start_pause()
         if self.preview_active:
-            self.preview_timer.stop()
-            self.preview_active = False
-            self.preview_button.setText("Preview Region")
-            self.preview_button.setIcon(QIcon(Functions.set_svg_icon("refresh.svg")))
+            self._stop_preview()
 
         # Grab the current screen's screenshot
         screen = QGuiApplication.primaryScreen()
@@ -446,23 +441,8 @@ class Ui_ClassicClassPage(BaseClassPage):
             "y2": adjusted_y1,
         }
 
-        config = self.load_rotation_config()
-        config['region'] = new_region
-        self.save_rotation_config(config)
-
-    def save_rotation_config(self, config):
-        """Save the configuration to the YAML file."""
-        # 计算项目根目录的绝对路径
-        # __file__ 是 gui/uis/pages/classic_class_page.py，需要向上4级到项目根目录
-        current_file = os.path.abspath(__file__)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))
-        config_path = os.path.join(project_root, 'rotation', 'rotation_config.yaml')
-        
-        # 确保目录存在
-        os.makedirs(os.path.dirname(config_path), exist_ok=True)
-        with open(config_path, 'w', encoding='utf-8') as file:
-            yaml.dump(config, file, default_flow_style=False, allow_unicode=True)
-        print(f"Region saved to: {config_path}")
+        self.config_store.update(region=new_region)
+        print(f"Region saved to: {self.config_store.path}")
 
     def save_icon_as(self):
         """ Save the cropped screenshot to a user-selected directory. """
@@ -486,20 +466,8 @@ class Ui_ClassicClassPage(BaseClassPage):
     # --------------------
     # 预览：配置与模板加载
     # --------------------
-    def load_rotation_config(self):
-        """读取 rotation/rotation_config.yaml，用于获取 region 配置。"""
-        try:
-            # 计算项目根目录的绝对路径
-            current_file = os.path.abspath(__file__)
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))
-            config_path = os.path.join(project_root, 'rotation', 'rotation_config.yaml')
-            with open(config_path, 'r', encoding='utf-8') as file:
-                return yaml.safe_load(file) or {}
-        except FileNotFoundError:
-            return {}
-
     def _init_hdr_from_config(self):
-        """仅在 UI 初始化时调用一次，用配置中的 HDR 亮度同步到控件（经典服）。
+        """UI 初始化、以及配置文件中的 hdr_darkness 被修改时调用，用配置中的 HDR 亮度同步到控件（经典服）。
 
         配置项：
         - hdr_darkness: HDR 压暗系数（0.1 - 5.0，越小越暗，>1 整体变亮）
@@ -518,6 +486,13 @@ class Ui_ClassicClassPage(BaseClassPage):
         except Exception:
             self.hdr_darkness = 0.3
 
+    def _on_rotation_config_changed(self, snapshot, changed):
+        """rotation_config.yaml 被修改后同步 HDR 控件与缩放告警（由 _start_config_watch 在 GUI 线程调用）。"""
+        if "hdr_darkness" in changed:
+            self._init_hdr_from_config()
+        if "region" in changed or "zoom" in changed:
+            self._check_scale_warning()
+
     def _init_template_scale_from_config(self):
         """仅在 UI 初始化时调用一次，为缩放控件设置默认值（经典服）。
 
@@ -532,102 +507,9 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.scale_spin.setValue(1.0)
         self.scale_spin.blockSignals(False)
 
-    def _load_preview_templates(self):
-        """
-        加载用于预览的模板图标（经典服）。
-
-        - 必须已经选择当前职业和天赋，并且天赋技能区域已展开；
-        - 使用当前 class + talent 对应的图标目录：
-          gui/uis/icons/classic/talent_icons/<class>/<talent>/
-        """
-        if not self.selected_class_name or not self.selected_talent_name:
-            return []
-        if not self.talent_ability.isVisible():
-            return []
-
-        class_name = self.selected_class_name
-        talent_name = self.selected_talent_name.lower()
-
-        # 如果职业和天赋没有变化，则直接使用缓存
-        if (
-            self.preview_templates is not None
-            and self.preview_class_name == class_name
-            and self.preview_talent_name == talent_name
-        ):
-            return self.preview_templates
-
-        templates_dir = os.path.join(gui_dir, "uis", "icons", "classic", "talent_icons", class_name, talent_name)
-        if not os.path.isdir(templates_dir):
-            print(f"[Classic] 未找到天赋图标目录: {templates_dir}")
-            return []
-
-        loaded = []
-        supported_extensions = (".tga", ".png", ".jpg", ".jpeg")
-        for filename in os.listdir(templates_dir):
-            if not filename.lower().endswith(supported_extensions):
-                continue
-            path = os.path.join(templates_dir, filename)
-            img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
-            if img is None or img.size == 0:
-                continue
-            # 统一为 BGR
-            if img.ndim == 3 and img.shape[2] == 4:
-                tmpl_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-            elif img.ndim == 3:
-                tmpl_bgr = img
-            else:
-                tmpl_bgr = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-
-            name = os.path.splitext(filename)[0]
-            loaded.append((name, tmpl_bgr))
-
-        if not loaded:
-            print(f"[Classic] 天赋目录中未找到可用的图标: {templates_dir}")
-
-        self.preview_templates = loaded
-        self.preview_class_name = class_name
-        self.preview_talent_name = talent_name
-        return self.preview_templates
-
-    def _match_best_icon(self, frame_bgr):
-        """
-        在给定的 BGR 截图上执行模板匹配，返回最佳模板名称及其图像。
-        使用与 RotationThread 相同的灰度 + 缩放算法，保证一致性。
-        """
-        templates = self._load_preview_templates()
-        if not templates or frame_bgr is None or frame_bgr.size == 0:
-            return None, None, None
-
-        # 将 (name, tmpl_bgr) 列表转换为 {name: tmpl_bgr} 字典，便于共用算法
-        templates_dict = {name: tmpl_bgr for name, tmpl_bgr in templates}
-        scale = float(getattr(self, "template_scale", 1.0))
-
-        best_name, best_img_info, best_score = ImageMatcher.match_best_icon_with_scale(
-            frame_bgr, templates_dict, scale
-        )
-        return best_name, best_img_info, best_score
-
-    def _numpy_to_qimage(self, bgr_image: np.ndarray) -> QImage:
-        """将 BGR 的 numpy 图像转换为 QImage。"""
-        if bgr_image is None or bgr_image.size == 0:
-            return QImage()
-        rgb_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb_image.shape
-        bytes_per_line = ch * w
-        return QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888).copy()
-
-    def _apply_hdr_correction(self, frame_bgr):
-        """
-        针对开启 HDR 时截图偏亮的问题，对截图做一次「色调映射 + 可调压暗」（经典服预览）。
-
-        实现完全复用 `TemplateMatcher.apply_hdr_correction`，使用当前 UI 中的
-        `self.hdr_darkness`（0.1 - 1.0，越小越暗）作为压暗系数。
-        """
-        try:
-            factor = float(getattr(self, "hdr_darkness", 0.3))
-        except Exception:
-            factor = 0.3
-        return TemplateMatcher.apply_hdr_correction(frame_bgr, dark_factor=factor)
+    def _talent_icons_dir(self):
+        """当前职业 / 天赋的技能图标目录：gui/uis/icons/classic/talent_icons/<class>/<talent>/"""
+        return os.path.join(gui_dir, "uis", "icons", "classic", "talent_icons", self.selected_class_name, self.selected_talent_name.lower())
 
     # --------------------
     # 模板缩放控制槽函数
@@ -640,6 +522,8 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.scale_spin.blockSignals(True)
         self.scale_spin.setValue(scale)
         self.scale_spin.blockSignals(False)
+        # 拖动时立即应用到引擎，预览随之更新（松开时才写配置）
+        self._reconfigure_engine(zoom=scale)
         # 检查scale是否过大
         self._check_scale_warning()
 
@@ -651,18 +535,21 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.scale_slider.blockSignals(True)
         self.scale_slider.setValue(slider_val)
         self.scale_slider.blockSignals(False)
+        self._reconfigure_engine(zoom=scale)
         # 检查scale是否过大
         self._check_scale_warning()
 
     def _on_scale_slider_released(self):
-        """滑动条松开时，将当前缩放写入配置文件。"""
+        """滑动条松开时，将当前缩放写入配置文件，并热更新到正在运行的引擎。"""
         self._save_template_scale_to_config()
+        self._reconfigure_listener_if_running()
         # 检查scale是否过大
         self._check_scale_warning()
 
     def _on_scale_spin_finished(self):
-        """输入框编辑完成时，将当前缩放写入配置文件。"""
+        """输入框编辑完成时，将当前缩放写入配置文件，并热更新到正在运行的引擎。"""
         self._save_template_scale_to_config()
+        self._reconfigure_listener_if_running()
         # 检查scale是否过大
         self._check_scale_warning()
 
@@ -692,8 +579,8 @@ class Ui_ClassicClassPage(BaseClassPage):
             self.scale_warning_label.setVisible(False)
             return
         
-        # 获取模板列表
-        templates = self._load_preview_templates()
+        # 获取模板尺寸列表
+        templates = self._talent_template_sizes()
         if not templates:
             self.scale_warning_label.setVisible(False)
             return
@@ -703,10 +590,7 @@ class Ui_ClassicClassPage(BaseClassPage):
         max_template_h = 0
         max_template_name = None
         
-        for name, tmpl_bgr in templates:
-            if tmpl_bgr is None or tmpl_bgr.size == 0:
-                continue
-            h, w = tmpl_bgr.shape[:2]
+        for name, (h, w) in templates:
             if h <= 0 or w <= 0:
                 continue
             
@@ -771,6 +655,8 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.hdr_spin.blockSignals(True)
         self.hdr_spin.setValue(val)
         self.hdr_spin.blockSignals(False)
+        # 拖动时立即应用到引擎，预览随之更新（松开时才写配置）
+        self._reconfigure_engine(hdr_darkness=val)
 
     def _on_hdr_spin_changed(self, value: float):
         """HDR 数值输入改变时，同步更新系数和滑动条。"""
@@ -780,6 +666,7 @@ class Ui_ClassicClassPage(BaseClassPage):
         self.hdr_slider.blockSignals(True)
         self.hdr_slider.setValue(slider_val)
         self.hdr_slider.blockSignals(False)
+        self._reconfigure_engine(hdr_darkness=val)
 
     def _on_hdr_slider_released(self):
         """HDR 滑动条松开时，将当前亮度写入配置文件。"""
@@ -799,13 +686,8 @@ class Ui_ClassicClassPage(BaseClassPage):
         current_hdr = float(getattr(self, "hdr_darkness", 0.3))
 
         # 1) 写入全局 rotation_config.yaml
-        cfg = self.load_rotation_config()
-        if not isinstance(cfg, dict):
-            cfg = {}
-        cfg["hdr_darkness"] = current_hdr
         try:
-            with open('rotation/rotation_config.yaml', 'w', encoding='utf-8') as f:
-                yaml.safe_dump(cfg, f, allow_unicode=True)
+            self.config_store.update(hdr_darkness=current_hdr)
         except Exception as e:
             print(f"[Classic] 写入 HDR 亮度配置失败: {e}", flush=True)
 
@@ -832,6 +714,8 @@ class Ui_ClassicClassPage(BaseClassPage):
                 print(f"[Classic] 写入 HDR 亮度到配置文件失败 {config_filepath}: {e}", flush=True)
 
     def load_logger_frame(self):
+        # 日志窗口保留行数与刷新间隔（rotation_config.yaml 中的 logging.gui_max_lines / gui_flush_ms）
+        log_cfg = self.load_rotation_config().get("logging") or {}
         self.log_text_edit = PyLoggerWindow(
             bg_color=self.themes["app_color"]["bg_one"],
             color=self.themes["app_color"]["text_foreground"],
@@ -839,7 +723,9 @@ class Ui_ClassicClassPage(BaseClassPage):
             padding="10px",
             font_size=30,
             bg_color_readonly=self.themes["app_color"]["dark_two"],
-            hover_color=self.themes["app_color"]["context_hover"]
+            hover_color=self.themes["app_color"]["context_hover"],
+            max_lines=int(log_cfg.get("gui_max_lines", 1000)),
+            flush_interval_ms=int(log_cfg.get("gui_flush_ms", 200)),
         )
         self.page_skills_layout.addWidget(self.log_text_edit)  # 将日志框体添加到布局的最下方
 
@@ -859,24 +745,17 @@ class Ui_ClassicClassPage(BaseClassPage):
     def toggle_preview_region(self):
         """
         开关实时预览：
-        - 开启时以 60FPS 连续刷新当前 region 的匹配结果；
-        - 关闭时停止定时器，保留最后一帧画面。
+        - 开启时由 RotationThread 的引擎线程按屏幕刷新率产出预览帧，GUI 只负责绘制；
+          轮转已在运行时直接复用该线程，否则以 "preview" 模式（不按键）单独启动一个；
+        - 关闭时停止预览输出（预览单独启动的线程一并停止）。
         """
         if self.preview_active:
-            # 停止预览
-            self.preview_timer.stop()
-            self.preview_active = False
-            self.preview_button.setText("Preview Region")
-            self.preview_button.setIcon(QIcon(Functions.set_svg_icon("refresh.svg")))
-            # 隐藏内容容器
-            self.preview_content_widget.setVisible(False)
+            self._stop_preview()
         else:
-            # 启动预览前清空缓存，确保按当前天赋重建模板
-            self.preview_templates = None
-            self.preview_class_name = None
-            self.preview_talent_name = None
+            # 启动预览前清空缓存，确保按当前天赋目录重新读取图标
+            self._template_sizes_cache = None
 
-            templates = self._load_preview_templates()
+            templates = self._talent_template_sizes()
             if not templates:
                 QMessageBox.warning(
                     self.main_window,
@@ -885,10 +764,34 @@ class Ui_ClassicClassPage(BaseClassPage):
                 )
                 return
 
+            if self.is_running and self.rotation_thread and self.rotation_thread.isRunning():
+                # 轮转正在运行：直接让该线程额外产出预览帧
+                self.preview_active = True
+                self._set_engine_preview(True)
+            else:
+                config_filepath = self.load_latest_config()
+                if not config_filepath:
+                    print("Configuration file not found, unable to start the preview.")
+                    return
+                print("QT Starting RotationThread in PREVIEW mode...")
+                self.rotation_thread = RotationThread(
+                    config_file='rotation_config.yaml',
+                    keybind_file=config_filepath,
+                    class_name=self.selected_class_name,
+                    talent_name=self.selected_talent_name,
+                    game_version='classic'
+                )
+                self.rotation_thread.finished.connect(self.on_thread_finished)
+                self.rotation_thread.icon_matched.connect(self.on_icon_matched)
+                self.rotation_thread.stats_updated.connect(self.on_latency_stats)
+                self.preview_active = True
+                self._connect_engine_preview()
+                self.rotation_thread.set_mode("preview")
+                self.rotation_thread.start()
+                self.preview_owns_thread = True
+
             # 显示内容容器
             self.preview_content_widget.setVisible(True)
-            self.preview_timer.start()
-            self.preview_active = True
             self.preview_button.setText("Stop Preview")
             self.preview_button.setIcon(QIcon(Functions.set_svg_icon("pause.svg")))
             # 延迟确保talent abilities图标不被压缩，等待布局完成
@@ -897,6 +800,20 @@ class Ui_ClassicClassPage(BaseClassPage):
             QTimer.singleShot(150, self._ensure_talent_ability_column_widths)
             QTimer.singleShot(300, self._ensure_talent_ability_column_widths)
 
+    def _stop_preview(self):
+        """停止预览：预览单独启动的线程直接停止，与轮转共用的线程只关闭预览输出。"""
+        self.preview_active = False
+        if self.preview_owns_thread and self.rotation_thread and self.rotation_thread.isRunning():
+            self.rotation_thread.stop()
+            # 不调用 wait()，真正的结束在 on_thread_finished 中清理
+        else:
+            self._set_engine_preview(False)
+        self.preview_owns_thread = False
+        self.preview_button.setText("Preview Region")
+        self.preview_button.setIcon(QIcon(Functions.set_svg_icon("refresh.svg")))
+        # 隐藏内容容器
+        self.preview_content_widget.setVisible(False)
+
     def _ensure_talent_ability_column_widths(self):
         """确保talent abilities布局的列宽不被压缩"""
         if not self.talent_ability.isVisible():
@@ -937,86 +854,33 @@ class Ui_ClassicClassPage(BaseClassPage):
         if self.talent_ability.parent():
             self.talent_ability.parent().updateGeometry()
     
-    def _preview_tick(self):
-        """定时器回调：每一帧执行一次预览刷新。"""
-        self.preview_current_region()
+    def _on_preview_ready(self):
+        """引擎线程产出了新的预览帧（在 GUI 线程中执行）：取最新一帧并绘制。"""
+        if not self.preview_active or self.rotation_thread is None:
+            return
+        frame = self.rotation_thread.take_preview_frame()
+        if frame is not None:
+            self._paint_preview_frame(frame)
 
-    def preview_current_region(self):
+    def _paint_preview_frame(self, frame):
         """
-        根据 rotation_config.yaml 中的 region，截取当前屏幕区域，
-        并在界面中预览该区域以及当前最匹配的一个模板图标。
+        绘制一帧引擎产出的预览（rotation.preview.PreviewFrame）：
+        区域截图与匹配框、最佳匹配图标、区域坐标与得分。
         """
-        config = self.load_rotation_config()
-        region_cfg = config.get("region")
-        if not region_cfg:
-            return
+        x1, y1, x2, y2 = frame.region
+        best_name = frame.best_name
+        best_score = frame.best_score
 
-        try:
-            x1 = int(region_cfg.get("x1"))
-            y1 = int(region_cfg.get("y1"))
-            x2 = int(region_cfg.get("x2"))
-            y2 = int(region_cfg.get("y2"))
-        except Exception:
-            return
+        # 区域截图与匹配框：零拷贝包装为 QImage，匹配框由 QPainter 画在缩放后的图上
+        self.preview_region_label.set_frame(frame.image, frame.box)
 
-        if x2 <= x1 or y2 <= y1:
-            return
-
-        try:
-            bbox = (x1, y1, x2, y2)
-            screenshot = ImageGrab.grab(bbox=bbox)
-        except Exception:
-            return
-
-        screenshot_np = np.array(screenshot)  # RGB（HDR 下通常偏亮）
-        frame_bgr = cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR)
-
-        # 对截图做一次 HDR 亮度压缩，预览效果更接近实际匹配时的输入
-        frame_bgr = self._apply_hdr_correction(frame_bgr)
-
-        # 匹配最佳模板
-        best_name, best_img_info, best_score = self._match_best_icon(frame_bgr)
-
-        # 在配置区域预览中标出匹配框
-        frame_for_show = frame_bgr.copy()
-        if best_img_info is not None:
-            tmpl_bgr, top_left, (w, h) = best_img_info
-            x, y = top_left
-            cv2.rectangle(frame_for_show, (x, y), (x + w, y + h), (0, 255, 0), 2)
-
-        # 显示配置区域截图
-        qimg_region = self._numpy_to_qimage(frame_for_show)
-        pixmap_region = QPixmap.fromImage(qimg_region)
-        pixmap_region = pixmap_region.scaled(
-            self.preview_region_label.width(),
-            self.preview_region_label.height(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
-        self.preview_region_label.setPixmap(pixmap_region)
-
-        # 显示最佳匹配图标
-        if best_img_info is not None:
-            tmpl_bgr, _, _ = best_img_info
-            qimg_icon = self._numpy_to_qimage(tmpl_bgr)
-            pixmap_icon = QPixmap.fromImage(qimg_icon)
-            pixmap_icon = pixmap_icon.scaled(
-                self.preview_best_icon_label.width(),
-                self.preview_best_icon_label.height(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation,
-            )
-            self.preview_best_icon_label.setPixmap(pixmap_icon)
-            self.preview_best_icon_label.setVisible(True)
-        else:
-            # 如果没有匹配，清空图标显示
-            self.preview_best_icon_label.clear()
-            self.preview_best_icon_label.setVisible(True)
+        # 显示最佳匹配图标（模板图像不变时直接复用缓存的缩放结果），没有匹配时清空
+        self.preview_best_icon_label.set_frame(frame.icon)
+        self.preview_best_icon_label.setVisible(True)
 
         # 在坐标标签中展示匹配信息（始终显示，即使没有匹配）
-        # 如果有 best_img_info，说明有匹配结果，应该显示
-        if best_img_info is not None and best_name is not None:
-            # best_score 可能为 -1.0（初始值），但如果有 best_img_info，说明有匹配
+        if frame.box is not None and best_name is not None:
+            # best_score 可能为 -1.0（初始值），但如果有匹配框，说明有匹配
             score_text = f"({best_score:.2f})" if best_score is not None and best_score > -1.0 else "(N/A)"
             self.preview_coordinates_label.setText(
                 f"Region: ({x1}, {y1}) - ({x2}, {y2}) | Best: {best_name} {score_text}"
@@ -1197,7 +1061,16 @@ class Ui_ClassicClassPage(BaseClassPage):
             print(f"Found unknown {self.selected_class} + {self.selected_talent}.")
             return
 
-        if not self.is_running:
+        if not self.is_running and self.preview_owns_thread and self.rotation_thread and self.rotation_thread.isRunning():
+            # 预览线程已在运行：直接切换为运行模式，预览继续由同一线程产出
+            print("[DEBUG] Switch RotationThread to RUN mode.")
+            self.rotation_thread.set_mode("run")
+            self.preview_owns_thread = False
+            self.start_button.setText("Stop")
+            self.start_button.setIcon(QIcon(Functions.set_svg_icon("pause.svg")))
+            self.is_running = True
+
+        elif not self.is_running:
             # Starting the rotation thread
             print("QT Starting RotationThread...")
 
@@ -1222,6 +1095,8 @@ class Ui_ClassicClassPage(BaseClassPage):
                 self.rotation_thread.finished.connect(self.on_thread_finished)
                 # Connect icon matched signal to highlight handler
                 self.rotation_thread.icon_matched.connect(self.on_icon_matched)
+                self.rotation_thread.stats_updated.connect(self.on_latency_stats)
+                self._connect_engine_preview()
 
                 self.rotation_thread.start()  # Start the thread
                 print("RotationThread started.")
@@ -1238,7 +1113,15 @@ class Ui_ClassicClassPage(BaseClassPage):
             print("QT stopping RotationThread...")
 
             # Ensure the RotationThread is running before trying to stop it
-            if self.rotation_thread and self.rotation_thread.isRunning():
+            if self.preview_active and self.rotation_thread and self.rotation_thread.isRunning():
+                # 预览仍开启：线程切回预览模式（不按键），由预览继续持有
+                print("[DEBUG] Switch RotationThread to PREVIEW mode.")
+                self.rotation_thread.set_mode("preview")
+                self.preview_owns_thread = True
+                self.start_button.setText("Start")
+                self.start_button.setIcon(QIcon(Functions.set_svg_icon("start.svg")))
+                self.is_running = False
+            elif self.rotation_thread and self.rotation_thread.isRunning():
                 self.rotation_thread.stop()  # Stop the RotationThread
                 # 不再调用 wait()，避免主线程卡死；真正的结束在 on_thread_finished 中清理
 
@@ -1257,6 +1140,13 @@ class Ui_ClassicClassPage(BaseClassPage):
             self.rotation_thread = None  # Remove reference to the thread
         self.start_button.setText("Start")
         self.is_running = False
+        if self.preview_active:
+            # 线程结束时预览也随之停止
+            self.preview_active = False
+            self.preview_owns_thread = False
+            self.preview_button.setText("Preview Region")
+            self.preview_button.setIcon(QIcon(Functions.set_svg_icon("refresh.svg")))
+            self.preview_content_widget.setVisible(False)
 
     def create_button(self, size=40, icon=None):
         button = QPushButton()
@@ -2064,6 +1954,23 @@ QPushButton:pressed {{
 
         return button
 
+    def on_latency_stats(self, stats):
+        """Show live FPS and frame-to-keypress latency in the preview panel"""
+        stages = stats.get("stages", {})
+        text = f"FPS: {stats.get('fps', 0.0):.1f}"
+        match = stages.get("match")
+        if match and match["count"]:
+            text += f"\n匹配 p50/p95: {match['p50']:.1f} / {match['p95']:.1f} ms"
+        frame_to_key = stages.get("frame_to_key")
+        if frame_to_key and frame_to_key["count"]:
+            text += (
+                f"\n截图→按键 p50/p95/p99: {frame_to_key['p50']:.0f} / "
+                f"{frame_to_key['p95']:.0f} / {frame_to_key['p99']:.0f} ms"
+            )
+        self.preview_stats_label.setText(text)
+        self.preview_stats_label.adjustSize()
+        self.preview_stats_label.setVisible(True)
+
     def on_icon_matched(self, icon_name):
         """Handle icon matched signal - highlight the matched icon"""
         if icon_name in self.icon_widgets:
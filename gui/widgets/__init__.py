@@ -71,4 +71,5 @@ from . py_line_edit import PyLineEdit
 from . py_table_widget import PyTableWidget
 
 from . py_logger_window import PyLoggerWindow
+from . py_preview_label import PyPreviewLabel
 from . py_groupbox import PyGroupbox
\ No newline at end of file
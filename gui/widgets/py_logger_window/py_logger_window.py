@@ -1,9 +1,18 @@
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QTextEdit
+import collections
 
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QPlainTextEdit
 
-class PyLoggerWindow(QTextEdit):
-    textWritten = Signal(str)
+
+class PyLoggerWindow(QPlainTextEdit):
+    """
+    日志窗口：可以直接作为 sys.stdout / sys.stderr 使用。
+
+    - `write` 可在任意线程调用，只把文本放入有界的待显示队列，不触碰控件；
+    - GUI 线程的定时器每 flush_interval_ms 毫秒批量取出队列，一次性追加到纯文本视图；
+    - 视图最多保留 max_lines 行（QPlainTextEdit 的 maximumBlockCount），旧行自动丢弃，
+      待显示队列同样只保留最近 max_lines 行，刷屏时内存占用固定。
+    """
 
     def __init__(
         self,
@@ -14,6 +23,8 @@ class PyLoggerWindow(QTextEdit):
         font_size=30,
         bg_color_readonly="#1e1e1e",
         hover_color="#6c99f4",
+        max_lines=1000,
+        flush_interval_ms=200,
         parent=None,
     ):
 
@@ -24,14 +35,14 @@ class PyLoggerWindow(QTextEdit):
 
         # 设置样式，包括自定义滚动条样式
         self.setStyleSheet(f"""
-            QTextEdit {{
+            QPlainTextEdit {{
                 background-color: {bg_color};
                 color: {color};
                 border-radius: {radius};
                 padding: {padding};
                 font-size: {font_size}px;
             }}
-            QTextEdit[readOnly="true"] {{
+            QPlainTextEdit[readOnly="true"] {{
                 background-color: {bg_color_readonly};
             }}
             /* 自定义滚动条样式 */
@@ -57,21 +68,50 @@ class PyLoggerWindow(QTextEdit):
             }}
         """)
 
-        # 连接信号以追加日志消息
-        self.textWritten.connect(self.append_log)
+        # 保留行数上限：超过后最旧的行被丢弃
+        self.setMaximumBlockCount(max(1, int(max_lines)))
+        # 待显示队列（线程安全的 deque 追加），同样有界
+        self._pending = collections.deque(maxlen=max(1, int(max_lines)))
+
+        # 批量刷新定时器
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(max(16, int(flush_interval_ms)))
+        self._flush_timer.timeout.connect(self._flush_pending)
+        self._flush_timer.start()
+
+    def set_max_lines(self, max_lines):
+        """调整保留的日志行数。"""
+        max_lines = max(1, int(max_lines))
+        self.setMaximumBlockCount(max_lines)
+        self._pending = collections.deque(self._pending, maxlen=max_lines)
 
     def write(self, message):
-        """将捕获的输出发送到信号"""
+        """捕获输出：放入待显示队列，由定时器批量刷新到界面"""
         if message.strip():  # 过滤空白字符
-            self.textWritten.emit(message)
+            self._pending.append(message.rstrip("\n"))
 
     def flush(self):
         """用于兼容性"""
         pass
 
     def append_log(self, message):
-        """追加日志消息并滚动到末尾"""
-        self.append(message)
-        self.ensureCursorVisible()
+        """追加一条日志消息（与 write 相同，在下一次刷新时显示）"""
+        self.write(message)
+
+    def _flush_pending(self):
+        """把待显示队列一次性追加到视图；只有原本停在底部时才自动滚动。"""
+        if not self._pending:
+            return
+        lines = []
+        try:
+            while True:
+                lines.append(self._pending.popleft())
+        except IndexError:
+            pass
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.appendPlainText("\n".join(lines))
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
 
@@ -0,0 +1,109 @@
+import numpy as np
+
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPixmap
+from PySide6.QtWidgets import QLabel
+
+
+class PyPreviewLabel(QLabel):
+    """
+    显示 BGR NumPy 图像的标签（预览区域截图 / 最佳匹配图标）：
+
+    - `wrap_bgr` 用 QImage.Format_BGR888 直接引用数组内存，不再先转 RGB、再 `QImage.copy()`；
+      被引用的数组保存在 `self._frame` 中，保证 QImage 使用期间缓冲区不会被释放；
+    - 缩放后的 QPixmap 按（图像、匹配框、标签尺寸）缓存：同一帧重复绘制、或图标不变时不再重新缩放；
+    - 匹配框用 QPainter 画在缩放后的 pixmap 上，不再对整帧 `copy()` 后用 cv2.rectangle 绘制。
+
+    传入的数组在绘制期间不得被修改（预览帧由引擎线程拷贝产出，模板图像只读）。
+    """
+
+    def __init__(self, box_color="#00ff00", box_width=2, parent=None):
+        super().__init__(parent)
+        self.setAlignment(Qt.AlignCenter)
+        self.box_color = QColor(box_color)
+        self.box_width = box_width
+        self._source = None
+        self._frame = None
+        self._image = None
+        self._box = None
+        self._cache_key = None
+        # 每包装一帧新图像加一，作为缓存键的一部分（不用 id()，旧数组释放后地址可能被复用）
+        self._generation = 0
+        self.render_count = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def wrap_bgr(frame):
+        """
+        零拷贝地把 BGR / BGRA / 灰度 uint8 数组包装为 QImage。
+
+        返回：
+        - (QImage, 被引用的数组)。数组不连续时会先拷贝一次，调用方须持有返回的数组。
+        """
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        h, w = frame.shape[:2]
+        if frame.ndim == 2:
+            image_format = QImage.Format_Grayscale8
+        elif frame.shape[2] == 4:
+            # 小端内存中的 BGRA 字节序即 ARGB32
+            image_format = QImage.Format_ARGB32
+        else:
+            image_format = QImage.Format_BGR888
+        return QImage(frame.data, w, h, frame.strides[0], image_format), frame
+
+    def set_frame(self, frame, box=None):
+        """
+        显示一帧图像。
+
+        参数：
+        - frame: BGR uint8 数组，None 时清空
+        - box: 要标出的匹配框 (x, y, w, h)，坐标相对于 frame
+        """
+        if frame is None or frame.size == 0:
+            self.clear()
+            return
+        if frame is not self._source:
+            # 记住调用方传入的数组：同一帧再次传入时直接复用已包装的 QImage
+            self._source = frame
+            self._image, self._frame = self.wrap_bgr(frame)
+            self._generation += 1
+        self._box = box
+        self._render()
+
+    def _render(self):
+        if self._image is None:
+            return
+        size = (self.width(), self.height())
+        cache_key = (self._generation, self._box, size)
+        if cache_key == self._cache_key:
+            self.cache_hits += 1
+            return
+        self._cache_key = cache_key
+        self.render_count += 1
+
+        pixmap = QPixmap.fromImage(self._image).scaled(
+            size[0], size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation
+        )
+        if self._box is not None and self._image.width() > 0 and self._image.height() > 0:
+            sx = pixmap.width() / self._image.width()
+            sy = pixmap.height() / self._image.height()
+            x, y, w, h = self._box
+            painter = QPainter(pixmap)
+            pen = QPen(self.box_color)
+            pen.setWidth(self.box_width)
+            painter.setPen(pen)
+            painter.drawRect(QRectF(x * sx, y * sy, w * sx, h * sy))
+            painter.end()
+        self.setPixmap(pixmap)
+
+    def clear(self):
+        self._source = None
+        self._frame = None
+        self._image = None
+        self._box = None
+        self._cache_key = None
+        super().clear()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._render()
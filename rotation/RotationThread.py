@@ -1,15 +1,21 @@
 from PySide6.QtCore import QThread, Signal, QMutex
 from rotation import RotationHelper
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 class RotationThread(QThread):
     finished = Signal()  # Signal emitted when the thread finishes
     icon_matched = Signal(str)  # Signal emitted when an icon is matched (icon_name)
+    stats_updated = Signal(dict)  # Signal emitted periodically with per-stage latency stats
+    preview_ready = Signal()  # Signal emitted when a new preview frame can be taken with take_preview_frame()
 
     def __init__(self, config_file, keybind_file, class_name, talent_name, game_version):
         super().__init__()
         self.rotation_helper = RotationHelper(class_name, talent_name, config_file, keybind_file, game_version)
         # Set callback to emit signal when icon is matched
         self.rotation_helper.set_match_callback(self.on_icon_matched)
+        self.rotation_helper.set_stats_callback(self.on_stats_updated)
         self.is_running = True  # Control the running state
         self.mutex = QMutex()  # Thread lock
     
@@ -17,25 +23,50 @@ class RotationThread(QThread):
         """Callback function to emit signal when icon is matched"""
         self.icon_matched.emit(icon_name)
 
+    def on_stats_updated(self, stats):
+        """Callback function to emit signal with the latest latency stats"""
+        self.stats_updated.emit(stats)
+
+    def set_preview_enabled(self, enabled: bool, max_fps: float = 60.0):
+        """Produce preview frames on the worker thread, throttled to max_fps."""
+        if self.rotation_helper:
+            self.rotation_helper.set_preview_callback(self.preview_ready.emit if enabled else None, max_fps)
+
+    def take_preview_frame(self):
+        """Return the latest preview frame (or None) for the UI thread to paint."""
+        helper = self.rotation_helper
+        return helper.take_preview_frame() if helper else None
+
+    def reload_keybinds(self, keybind_file=None):
+        """Apply edited key bindings / thresholds / zoom to the running engine without restarting it."""
+        if self.rotation_helper:
+            return self.rotation_helper.reload_keybinds(keybind_file)
+        return False
+
+    def reconfigure(self, **changes):
+        """Push matcher settings (zoom, hdr_darkness, ...) to the running engine; applied before the next frame."""
+        if self.rotation_helper:
+            self.rotation_helper.matcher.reconfigure(**changes)
+
     def set_mode(self, mode: str):
         """Proxy to change RotationHelper mode at runtime."""
         if self.rotation_helper:
             self.rotation_helper.set_mode(mode)
 
     def run(self):
-        print("RotationThread started.")
+        logger.info("RotationThread started.")
         try:
             self.rotation_helper.run()  # This will loop until `running` is False
         except Exception as e:
-            print(f"Error in RotationHelper: {e}")
+            logger.exception("Error in RotationHelper: %s", e)
         finally:
             self.is_running = False
-            print("RotationThread finished.")
+            logger.info("RotationThread finished.")
             self.finished.emit()  # Emit the finished signal when the thread completes
 
     def stop(self):
         """Stop the thread by signaling the rotation_helper to stop."""
-        print("Stopping RotationThread.")
+        logger.info("Stopping RotationThread.")
         self.mutex.lock()
         if self.rotation_helper:
             self.rotation_helper.stop()  # Signal the RotationHelper to stop its loop
@@ -44,8 +75,8 @@ class RotationThread(QThread):
 
     def clean_up(self):
         """Force cleanup by ensuring the instance is fully cleared."""
-        print("Cleaning up RotationHelper...")
+        logger.debug("Cleaning up RotationHelper...")
         self.mutex.lock()
         self.rotation_helper = None  # Clear any remaining reference
         self.mutex.unlock()
-        print("RotationHelper Clean Done")
+        logger.debug("RotationHelper Clean Done")
@@ -1,3 +1,13 @@
 from . run import RotationHelper
-from . RotationThread import RotationThread
 from . icon_loader import SkillIconLoader
+from . config_store import ConfigStore, get_config_store
+
+
+def __getattr__(name):
+    # RotationThread 依赖 PySide6，按需导入：无界面场景（python -m rotation、回放基准）不加载 Qt
+    if name == "RotationThread":
+        from .RotationThread import RotationThread
+
+        globals()["RotationThread"] = RotationThread
+        return RotationThread
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
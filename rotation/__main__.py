@@ -0,0 +1,159 @@
+"""
+无界面运行轮转引擎：截图 → 匹配 → 决策，每帧输出一行 JSON。
+
+示例：
+    python -m rotation --class warrior --talent fury --keybind warrior_fury.json \
+        --capture replay --capture-path recordings/20250101_120000 --frames 500
+
+stdout 只输出 JSON 行（每帧一行，结束时一行 summary），引擎自身的日志输出到 stderr。
+"""
+import argparse
+import json
+import sys
+import time
+
+from .capture_backend import CAPTURE_BACKENDS, create_capture_backend
+from .run import RotationHelper
+
+INPUT_PRINT = "print"
+INPUT_KEYS = "keys"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rotation", description="无界面轮转引擎（JSON 行输出）")
+    parser.add_argument("--class", dest="class_name", required=True, help="职业名称（图标目录名）")
+    parser.add_argument("--talent", required=True, help="天赋名称")
+    parser.add_argument("--keybind", default="config.json", help="按键绑定 JSON（路径或 gui/config 下的文件名）")
+    parser.add_argument("--config", default="rotation_config.yaml", help="rotation_config.yaml 路径")
+    parser.add_argument("--game-version", default="retail", choices=("retail", "classic"))
+    parser.add_argument("--capture", choices=sorted(CAPTURE_BACKENDS), help="覆盖配置中的 capture.backend")
+    parser.add_argument("--capture-path", help="file / replay 后端的数据路径")
+    parser.add_argument("--realtime", action="store_true", help="replay 后端按录制节奏回放")
+    parser.add_argument(
+        "--input", default=INPUT_PRINT, choices=(INPUT_PRINT, INPUT_KEYS),
+        help="print：只输出决策不按键；keys：通过异步按键分发器真正按键（后端见 input.backend）",
+    )
+    parser.add_argument("--require-focus", action="store_true", help="只有游戏窗口在前台时才做按键决策")
+    parser.add_argument("--frames", type=int, default=0, help="处理的帧数，0 表示直到截图结束或 Ctrl+C")
+    parser.add_argument("--fps", type=float, default=0.0, help="截图帧率上限，0 表示全速")
+    parser.add_argument("--output", help="JSON 行输出文件，默认 stdout")
+    return parser.parse_args(argv)
+
+
+def build_helper(args):
+    """按命令行参数创建 RotationHelper，并按需替换截图后端。"""
+    helper = RotationHelper(args.class_name, args.talent, args.config, args.keybind, args.game_version)
+    if args.capture or args.capture_path:
+        capture_cfg = dict(helper.rotation_config.get("capture") or {})
+        if args.capture:
+            capture_cfg["backend"] = args.capture
+        if args.capture_path:
+            capture_cfg["path"] = args.capture_path
+        if args.realtime:
+            capture_cfg["realtime"] = True
+        capture_cfg.setdefault("loop", False)
+        backend = create_capture_backend(dict(helper.rotation_config, capture=capture_cfg))
+        # 先关闭 RotationHelper 按配置创建的后端（可能已持有文件或截图句柄），再换上命令行指定的后端
+        helper.matcher.capture_backend.close()
+        helper.matcher.capture_backend = backend
+    return helper
+
+
+def run(args, out):
+    helper = build_helper(args)
+    matcher = helper.matcher
+    matcher.require_focus = args.require_focus
+    matcher.enable_keys = True
+
+    decisions = []
+    if args.input == INPUT_KEYS:
+        def key_sink(item):
+            decisions.append(item)
+            matcher.key_dispatcher.submit(*item)
+    else:
+        key_sink = decisions.append
+    matcher.key_sink = key_sink
+
+    result = {}
+
+    def on_frame(screenshot, best_img_info, best_name, best_score):
+        result["name"] = best_name
+        result["score"] = best_score
+
+    matcher.set_frame_callback(on_frame)
+    backend = matcher.capture_backend
+    interval = 1.0 / args.fps if args.fps > 0 else 0.0
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while args.frames <= 0 or frames < args.frames:
+            frame_start = time.perf_counter()
+            matcher.latency_stats.last.clear()
+            slot, raw_frame = matcher._capture_into_slot()
+            if slot is None:
+                if getattr(backend, "exhausted", False):
+                    break
+                time.sleep(max(interval, 0.01))
+                continue
+            frame_time = slot.timestamp
+            result.clear()
+            del decisions[:]
+            matcher.process_frame(slot, raw_frame)
+            frame_end = time.perf_counter()
+            last = matcher.latency_stats.last
+            record = {
+                "frame": frames,
+                "t": frame_time,
+                "name": result.get("name"),
+                "score": result.get("score"),
+                "unchanged": matcher.last_frame_unchanged,
+                "keys": [item[0] for item in decisions],
+                "latency_ms": {
+                    stage: round(last[stage], 3)
+                    for stage in ("capture", "hdr", "match", "focus", "key_press")
+                    if stage in last
+                },
+            }
+            record["latency_ms"]["total"] = round((frame_end - frame_start) * 1000.0, 3)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            frames += 1
+            if interval > 0:
+                remaining = interval - (time.perf_counter() - frame_start)
+                if remaining > 0:
+                    time.sleep(remaining)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        matcher.close()
+        backend.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "summary": {
+            "frames": frames,
+            "elapsed_s": round(elapsed, 3),
+            "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+            "skip_rate": matcher.skip_rate,
+            "latency": matcher.latency_stats.snapshot()["stages"],
+        }
+    }
+    out.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # stdout 只留给 JSON 行：引擎内部的 print 日志全部转到 stderr
+    json_out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        run(args, json_out)
+    finally:
+        sys.stdout = sys.__stdout__
+        if json_out is not sys.__stdout__:
+            json_out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+import glob
+import os
+import time
+import cv2
+import numpy as np
+from .frame_recorder import FrameRecording
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+class CaptureBackend:
+    """
+    截图后端接口：
+
+    - `grab(region)` 截取 region=(x1, y1, x2, y2) 区域，返回 BGR uint8 图像，失败返回 None；
+    - `close()` 释放后端持有的资源。
+
+    具体实现由 `create_capture_backend` 根据 rotation_config.yaml 中的 `capture.backend` 选择。
+    """
+
+    name = "base"
+
+    def grab(self, region):
+        raise NotImplementedError
+
+    def grab_into(self, region, out):
+        """
+        截图并写入调用方预分配的 BGR 缓冲区 `out`，返回 `out`。
+
+        截到的帧尺寸与 `out` 不一致时（例如文件后端的帧比 region 小），
+        返回后端自己的数组而不写入 `out`；失败返回 None。
+        """
+        frame = self.grab(region)
+        if frame is None:
+            return None
+        if frame.shape != out.shape:
+            return frame
+        np.copyto(out, frame)
+        return out
+
+    def close(self):
+        pass
+
+
+class ImageGrabCaptureBackend(CaptureBackend):
+    """基于 PIL.ImageGrab 的截图后端（原有实现，作为兜底方案）。"""
+
+    name = "imagegrab"
+
+    def __init__(self):
+        from PIL import ImageGrab
+        self._image_grab = ImageGrab
+
+    def grab(self, region):
+        screenshot = self._image_grab.grab(bbox=tuple(region))
+        if screenshot is None:
+            return None
+        screenshot_np = np.asarray(screenshot)  # RGB
+        if screenshot_np.size == 0:
+            return None
+        return cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR)
+
+    def grab_into(self, region, out):
+        screenshot = self._image_grab.grab(bbox=tuple(region))
+        if screenshot is None:
+            return None
+        screenshot_np = np.asarray(screenshot)  # RGB
+        if screenshot_np.size == 0:
+            return None
+        if screenshot_np.shape != out.shape:
+            return cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR)
+        cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR, dst=out)
+        return out
+
+
+class MssCaptureBackend(CaptureBackend):
+    """
+    基于 mss 的持久化截图后端：
+
+    - 复用同一个 mss 句柄（X11 下使用 XShm 共享内存，Windows 下复用 GDI 资源）；
+    - 复用输出缓冲区，region 尺寸不变时每帧不再分配新的 BGR 数组。
+
+    注意：mss 句柄与创建它的线程绑定，因此在第一次 `grab` 时（即截图线程内）才创建；
+    返回的数组会在下一次 `grab` 时被覆盖，需要长期保存时调用方应自行拷贝。
+    """
+
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self._mss_module = mss
+        self._sct = None
+        self._out = None
+
+    def _grab_bgra(self, region):
+        if self._sct is None:
+            self._sct = self._mss_module.mss()
+        x1, y1, x2, y2 = (int(v) for v in region)
+        monitor = {"left": x1, "top": y1, "width": x2 - x1, "height": y2 - y1}
+        shot = self._sct.grab(monitor)
+        h, w = shot.height, shot.width
+        if h <= 0 or w <= 0:
+            return None
+        # 直接以视图方式解释 mss 的原始 BGRA 字节，不做额外拷贝
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(h, w, 4)
+
+    def grab(self, region):
+        bgra = self._grab_bgra(region)
+        if bgra is None:
+            return None
+        h, w = bgra.shape[:2]
+        if self._out is None or self._out.shape[:2] != (h, w):
+            self._out = np.empty((h, w, 3), dtype=np.uint8)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self._out)
+        return self._out
+
+    def grab_into(self, region, out):
+        bgra = self._grab_bgra(region)
+        if bgra is None:
+            return None
+        if bgra.shape[:2] != out.shape[:2]:
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=out)
+        return out
+
+    def close(self):
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception as e:
+                logger.warning("[Capture] 关闭 mss 句柄失败: %s", e)
+            self._sct = None
+        self._out = None
+
+
+class FileCaptureBackend(CaptureBackend):
+    """
+    从图片文件读取帧的后端，用于测试与离线基准：
+
+    - path 可以是单个图片文件、目录（按文件名排序）或 glob 模式；
+    - 依次循环返回各帧，并按 region 尺寸裁剪左上角（不足时原样返回）。
+    """
+
+    name = "file"
+
+    def __init__(self, path, loop: bool = True):
+        if os.path.isdir(path):
+            files = sorted(
+                os.path.join(path, f)
+                for f in os.listdir(path)
+                if f.lower().endswith((".png", ".jpg", ".jpeg", ".bmp", ".tga"))
+            )
+        else:
+            files = sorted(glob.glob(path))
+        self.frames = []
+        for file_path in files:
+            img = cv2.imread(file_path, cv2.IMREAD_COLOR)
+            if img is not None and img.size > 0:
+                self.frames.append(img)
+        if not self.frames:
+            logger.warning("[Capture] 未找到可用的帧文件: %s", path)
+        self.loop = loop
+        self._index = 0
+
+    def grab(self, region):
+        if not self.frames:
+            return None
+        if self._index >= len(self.frames):
+            if not self.loop:
+                return None
+            self._index = 0
+        frame = self.frames[self._index]
+        self._index += 1
+        x1, y1, x2, y2 = (int(v) for v in region)
+        h, w = y2 - y1, x2 - x1
+        if 0 < h <= frame.shape[0] and 0 < w <= frame.shape[1]:
+            return frame[:h, :w]
+        return frame
+
+
+class SyntheticCaptureBackend(CaptureBackend):
+    """
+    合成帧后端，用于测试与基准：
+
+    - 传入 frames 时循环返回这些 BGR 帧；
+    - 否则按 region 尺寸生成固定随机种子的噪声帧。
+    """
+
+    name = "synthetic"
+
+    def __init__(self, frames=None, seed: int = 0):
+        self.frames = list(frames) if frames else []
+        self._rng = np.random.default_rng(seed)
+        self._index = 0
+
+    def grab(self, region):
+        if self.frames:
+            frame = self.frames[self._index % len(self.frames)]
+            self._index += 1
+            return frame
+        x1, y1, x2, y2 = (int(v) for v in region)
+        h, w = max(1, y2 - y1), max(1, x2 - x1)
+        return self._rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+
+
+class ReplayCaptureBackend(CaptureBackend):
+    """
+    回放 `FrameRecorder` 录制的帧：
+
+    - recording 可以是录制目录路径或 `FrameRecording` 实例；
+    - realtime=False 时全速返回下一帧；realtime=True 时按录制时的时间间隔等待后再返回；
+    - 播放完毕后 loop=False 时返回 None 并置 `exhausted`，loop=True 时从头开始。
+
+    返回的帧是内存映射的只读视图，不随 region 裁剪。
+    """
+
+    name = "replay"
+
+    def __init__(self, recording, realtime: bool = False, loop: bool = False):
+        self.recording = recording if isinstance(recording, FrameRecording) else FrameRecording(recording)
+        if len(self.recording) == 0:
+            logger.warning("[Capture] 录制为空: %s", self.recording.path)
+        self.realtime = realtime
+        self.loop = loop
+        self.exhausted = len(self.recording) == 0
+        self._index = 0
+        self._start_wall = None
+
+    def grab(self, region):
+        if self._index >= len(self.recording):
+            if not self.loop or len(self.recording) == 0:
+                self.exhausted = True
+                return None
+            self._index = 0
+            self._start_wall = None
+        if self.realtime:
+            offset = self.recording.timestamps[self._index] - self.recording.timestamps[0]
+            if self._start_wall is None:
+                self._start_wall = time.perf_counter() - offset
+            delay = self._start_wall + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        frame = self.recording.frame(self._index)
+        self._index += 1
+        if self._index >= len(self.recording) and not self.loop:
+            self.exhausted = True
+        return frame
+
+
+CAPTURE_BACKENDS = {
+    MssCaptureBackend.name: MssCaptureBackend,
+    ImageGrabCaptureBackend.name: ImageGrabCaptureBackend,
+    FileCaptureBackend.name: FileCaptureBackend,
+    SyntheticCaptureBackend.name: SyntheticCaptureBackend,
+    ReplayCaptureBackend.name: ReplayCaptureBackend,
+}
+
+
+def create_capture_backend(config):
+    """
+    根据 rotation_config.yaml 中的 `capture` 配置创建截图后端。
+
+    配置示例：
+        capture:
+          backend: mss        # mss / imagegrab / file / synthetic / replay
+          path: recordings/   # file 后端为图片路径，replay 后端为录制目录
+          realtime: false     # 仅 replay 后端：按录制时的节奏回放
+
+    mss 不可用（未安装或初始化失败）时自动回退到 ImageGrab。
+    """
+    capture_cfg = (config or {}).get("capture") or {}
+    backend_name = str(capture_cfg.get("backend", "mss")).lower()
+
+    if backend_name == FileCaptureBackend.name:
+        return FileCaptureBackend(capture_cfg.get("path", ""), loop=bool(capture_cfg.get("loop", True)))
+    if backend_name == ReplayCaptureBackend.name:
+        return ReplayCaptureBackend(
+            capture_cfg.get("path", ""),
+            realtime=bool(capture_cfg.get("realtime", False)),
+            loop=bool(capture_cfg.get("loop", False)),
+        )
+    if backend_name == SyntheticCaptureBackend.name:
+        return SyntheticCaptureBackend(seed=int(capture_cfg.get("seed", 0)))
+    if backend_name == MssCaptureBackend.name:
+        try:
+            return MssCaptureBackend()
+        except Exception as e:
+            logger.warning("[Capture] mss 后端不可用，回退到 ImageGrab: %s", e)
+            return ImageGrabCaptureBackend()
+    if backend_name != ImageGrabCaptureBackend.name:
+        logger.warning("[Capture] 未知的截图后端 '%s'，使用 ImageGrab", backend_name)
+    return ImageGrabCaptureBackend()
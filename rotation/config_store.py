@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from types import MappingProxyType
+import yaml
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rotation_config.yaml")
+
+# 配置文件缺失或无法解析时使用的最小配置
+DEFAULT_ROTATION_CONFIG = {
+    'delay': {'min': 0.069, 'max': 0.160},
+    'screenshot_delay': 0.3,
+    'region': {'x1': 0, 'y1': 0, 'x2': 80, 'y2': 200},
+    'pressed_start': '`',
+}
+
+
+def freeze(value):
+    """把解析出的配置递归转换为只读结构：dict → MappingProxyType，list → tuple。"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """`freeze` 的逆操作：得到可修改、可写回 YAML 的普通 dict / list。"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def with_overrides(snapshot, **overrides):
+    """在只读快照的基础上覆盖若干顶层字段，返回新的只读快照（原快照不变）。"""
+    merged = dict(snapshot)
+    merged.update({key: freeze(value) for key, value in overrides.items()})
+    return MappingProxyType(merged)
+
+
+class ConfigStore:
+    """
+    rotation_config.yaml 的进程级缓存：
+
+    - 文件只在内容变化时解析一次，`snapshot()` 直接返回缓存的只读快照，不再每次打开、解析 YAML；
+    - 通过文件的 (mtime, inode, size) 判断是否变化，`poll()` 最多每 check_interval 秒 stat 一次；
+    - 快照是不可修改的（嵌套的 dict / list 也是只读的），持有旧快照的代码不会看到半更新的状态；
+      需要修改时用 `update()`，它会写回文件并立即发布新快照；
+    - `subscribe(callback, keys)` 在关心的顶层字段（如 region / zoom / hdr_darkness）变化时
+      回调 callback(snapshot, changed_keys)。回调在发现变化的线程中同步执行
+      （GUI 中由页面的定时器调用 `poll()`），需要跨线程时由订阅者自行转交。
+
+    通常通过 `get_config_store()` 取得同一路径的共享实例。
+    """
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, check_interval: float = 0.5):
+        self.path = os.path.abspath(path)
+        self.check_interval = max(0.0, float(check_interval))
+        self._lock = threading.RLock()
+        self._subscribers = ()
+        self._signature = None
+        self._checked_at = None
+        self._snapshot = MappingProxyType({})
+        self.version = 0
+        self.loads = 0
+        self._reload(self._stat())
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
+
+    def _parse(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                config = yaml.safe_load(file)
+        except FileNotFoundError:
+            logger.warning("[Config] 未找到配置文件 %s，使用默认设置。", self.path)
+            return dict(DEFAULT_ROTATION_CONFIG)
+        except yaml.YAMLError as e:
+            logger.error("[Config] 读取 %s 时出错: %s", self.path, e)
+            return None
+        return config if isinstance(config, dict) else {}
+
+    def _reload(self, signature):
+        """重新解析文件并发布新快照，返回变化的顶层字段（未变化或解析失败时为空）。"""
+        config = self._parse()
+        self._signature = signature
+        self.loads += 1
+        if config is None:
+            # 解析失败（例如文件正在被写入）：保留上一份快照，文件再次变化时重试
+            if not self._snapshot:
+                self._snapshot = freeze(dict(DEFAULT_ROTATION_CONFIG))
+            return ()
+        return self._publish(freeze(config))
+
+    def _publish(self, snapshot):
+        previous = self._snapshot
+        changed = tuple(sorted(
+            key for key in set(previous) | set(snapshot)
+            if previous.get(key) != snapshot.get(key)
+        ))
+        self._snapshot = snapshot
+        if changed:
+            self.version += 1
+        return changed
+
+    def _notify(self, snapshot, changed):
+        if not changed:
+            return
+        for callback, keys in self._subscribers:
+            if keys is not None and keys.isdisjoint(changed):
+                continue
+            try:
+                callback(snapshot, changed)
+            except Exception as e:
+                logger.error("[Config] 配置变化回调出错: %s", e)
+
+    def snapshot(self):
+        """当前配置的只读快照（必要时先检查文件是否变化）。"""
+        self.poll()
+        return self._snapshot
+
+    def poll(self, force: bool = False):
+        """
+        检查文件是否变化，变化时重新解析并通知订阅者。
+
+        参数：
+        - force: 忽略 check_interval，立即 stat 一次
+
+        返回：
+        - 变化的顶层字段元组（未变化时为空）
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return ()
+            self._checked_at = now
+            signature = self._stat()
+            if signature == self._signature:
+                return ()
+            changed = self._reload(signature)
+            snapshot = self._snapshot
+        if changed:
+            logger.info("[Config] 配置文件已变化: %s", ", ".join(changed))
+        self._notify(snapshot, changed)
+        return changed
+
+    def get(self, key, default=None):
+        return self.snapshot().get(key, default)
+
+    def update(self, changes=None, **kwargs):
+        """
+        修改若干顶层字段并写回 YAML 文件（原子替换），随后立即发布新快照并通知订阅者。
+
+        参数：
+        - changes: 字段名 → 新值的字典（也可直接用关键字参数传入）
+
+        返回：
+        - 新的只读快照
+        """
+        changes = dict(changes or {}, **kwargs)
+        with self._lock:
+            config = thaw(self._snapshot)
+            config.update(thaw(changes))
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                yaml.safe_dump(config, file, default_flow_style=False, allow_unicode=True)
+            os.replace(tmp_path, self.path)
+            # 自己写出的文件不再重新解析
+            self._signature = self._stat()
+            self._checked_at = time.monotonic()
+            changed = self._publish(freeze(config))
+            snapshot = self._snapshot
+        self._notify(snapshot, changed)
+        return snapshot
+
+    def subscribe(self, callback, keys=None):
+        """
+        订阅配置变化。
+
+        参数：
+        - callback: callback(snapshot, changed_keys)
+        - keys: 只关心的顶层字段，None 表示任何变化都通知
+
+        返回：
+        - 取消订阅用的函数
+        """
+        entry = (callback, frozenset(keys) if keys is not None else None)
+        with self._lock:
+            self._subscribers = self._subscribers + (entry,)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = tuple(s for s in self._subscribers if s is not entry)
+
+        return unsubscribe
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_config_store(path=None):
+    """
+    取得配置文件的共享 ConfigStore（同一路径在进程内只有一个实例）。
+
+    参数：
+    - path: 配置文件路径；相对路径按 rotation 目录解析，None 为 rotation/rotation_config.yaml
+    """
+    if path is None:
+        path = DEFAULT_CONFIG_PATH
+    elif not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(DEFAULT_CONFIG_PATH), path)
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = ConfigStore(path)
+        return store
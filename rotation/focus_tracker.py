@@ -0,0 +1,97 @@
+import threading
+import time
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_TITLE_PATTERNS = ("魔兽世界", "World of Warcraft")
+
+
+def _pygetwindow_active_title():
+    # 延迟导入：pygetwindow 仅在需要检查前台窗口时加载，无界面环境不受影响
+    import pygetwindow as gw
+
+    active_window = gw.getActiveWindow()
+    return active_window.title if active_window else ""
+
+
+class FocusTracker:
+    """
+    带缓存的前台窗口检测：
+
+    - 前台窗口标题在 ttl 秒内只查询一次，其余调用直接返回缓存结果，不再每帧调用系统接口；
+    - 标题包含任意一个 title_patterns（不区分大小写）即视为游戏在前台；
+    - `invalidate()` 可让下一次调用强制刷新（例如收到焦点变化通知时）。
+
+    配置（rotation_config.yaml）：
+        focus:
+          titles: ["魔兽世界", "World of Warcraft"]
+          ttl: 0.25
+          pause_capture: true   # 游戏不在前台时完全停止截图（仅运行模式）
+          poll_interval: 0.5    # 暂停期间检查前台窗口的间隔
+    """
+
+    def __init__(self, title_patterns=DEFAULT_TITLE_PATTERNS, ttl: float = 0.25, title_provider=None):
+        """
+        参数：
+        - title_patterns: 游戏窗口标题关键字列表
+        - ttl: 缓存有效期（秒），0 表示每次都查询
+        - title_provider: 返回当前前台窗口标题的函数，默认使用 pygetwindow
+        """
+        self.title_patterns = [str(p).lower() for p in title_patterns if str(p)]
+        self.ttl = max(0.0, float(ttl))
+        self.title_provider = title_provider or _pygetwindow_active_title
+        self._lock = threading.Lock()
+        self._focused = None
+        self._title = ""
+        self._checked_at = None
+        self.queries = 0
+        self.hits = 0
+
+    @classmethod
+    def from_config(cls, config, title_provider=None):
+        focus_cfg = (config or {}).get("focus") or {}
+        titles = focus_cfg.get("titles") or DEFAULT_TITLE_PATTERNS
+        if isinstance(titles, str):
+            titles = [titles]
+        return cls(titles, ttl=float(focus_cfg.get("ttl", 0.25)), title_provider=title_provider)
+
+    def matches(self, title):
+        title = (title or "").lower()
+        return any(pattern in title for pattern in self.title_patterns)
+
+    def is_focused(self):
+        """游戏窗口是否在前台（缓存 ttl 秒）。"""
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.ttl:
+                self.hits += 1
+                return self._focused
+        try:
+            title = self.title_provider() or ""
+        except Exception as e:
+            logger.warning("[Focus] 获取前台窗口失败: %s", e)
+            title = ""
+        focused = self.matches(title)
+        with self._lock:
+            self._title = title
+            self._focused = focused
+            self._checked_at = now
+            self.queries += 1
+        return focused
+
+    def invalidate(self):
+        """丢弃缓存，下一次 `is_focused` 立即重新查询。"""
+        with self._lock:
+            self._checked_at = None
+
+    @property
+    def title(self):
+        """最近一次查询到的前台窗口标题。"""
+        return self._title
+
+    def set_title_patterns(self, title_patterns):
+        with self._lock:
+            self.title_patterns = [str(p).lower() for p in title_patterns if str(p)]
+            self._checked_at = None
@@ -0,0 +1,90 @@
+import threading
+import numpy as np
+
+
+class FrameSlot:
+    """
+    环形缓冲区中的一个预分配帧槽位：
+
+    - `raw`：截图后端写入的原始 BGR 帧
+    - `processed`：HDR 处理后的 BGR 帧（供匹配与预览使用）
+
+    下游各阶段拿到的都是这两个数组的视图而不是拷贝。需要在当前帧之后继续持有
+    数据的消费者（如预览回调跨线程转交）必须先 `retain()`，用完后 `release()`；
+    引用计数归零后该槽位才会被重新写入。
+    """
+
+    def __init__(self, ring, index, shape):
+        self._ring = ring
+        self.index = index
+        self.raw = np.empty(shape, dtype=np.uint8)
+        self.processed = np.empty(shape, dtype=np.uint8)
+        self.refcount = 0
+        self.timestamp = 0.0
+
+    @property
+    def shape(self):
+        return self.raw.shape
+
+    def retain(self):
+        """增加一次引用，返回自身便于链式调用。"""
+        with self._ring.lock:
+            self.refcount += 1
+        return self
+
+    def release(self):
+        """释放一次引用；引用全部释放后槽位可被复用。"""
+        with self._ring.lock:
+            if self.refcount > 0:
+                self.refcount -= 1
+
+
+class FrameRingBuffer:
+    """
+    预分配的固定大小帧环形缓冲区：
+
+    - 按帧尺寸一次性分配 `size` 个槽位，截图 / HDR 直接写入槽位内的数组；
+    - `acquire` 按顺序寻找引用计数为 0 的槽位并返回（已 retain 一次）；
+    - 所有槽位都被占用时临时分配一个不入环的槽位（计入 `overflows`），保证截图从不阻塞；
+    - 帧尺寸（region）变化时整体重新分配。
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = max(2, int(size))
+        self.lock = threading.Lock()
+        self._slots = []
+        self._shape = None
+        self._next = 0
+        self.overflows = 0
+
+    def _allocate(self, shape):
+        self._slots = [FrameSlot(self, i, shape) for i in range(self.size)]
+        self._shape = shape
+        self._next = 0
+
+    def acquire(self, shape):
+        """
+        获取一个可写槽位（引用计数已为 1），调用方处理完后需 `release()`。
+
+        参数：
+        - shape: 帧形状 (h, w, 3)
+        """
+        shape = tuple(shape)
+        with self.lock:
+            if shape != self._shape:
+                self._allocate(shape)
+            for offset in range(self.size):
+                slot = self._slots[(self._next + offset) % self.size]
+                if slot.refcount == 0:
+                    self._next = (slot.index + 1) % self.size
+                    slot.refcount = 1
+                    return slot
+            self.overflows += 1
+        overflow_slot = FrameSlot(self, -1, shape)
+        overflow_slot.refcount = 1
+        return overflow_slot
+
+    def in_use(self):
+        """当前被引用的槽位数量。"""
+        with self.lock:
+            return sum(1 for slot in self._slots if slot.refcount > 0)
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+
+class FrameChangeDetector:
+    """
+    廉价的帧变化检测器：
+
+    - 将截图下采样为很小的灰度缩略图作为「指纹」；
+    - 与上一帧指纹的平均绝对差（MAD）不超过阈值时，认为画面没有变化；
+    - 画面未变化时，调用方可以直接复用上一帧的匹配结果，跳过 HDR 与模板匹配。
+
+    统计计数：`frames`（检测的帧数）、`skipped`（判定未变化的帧数）、`skip_rate`。
+    """
+
+    def __init__(self, threshold: float = 1.0, thumb_size: int = 16, enabled: bool = True):
+        """
+        参数：
+        - threshold: 平均绝对差阈值（0 - 255 灰度单位），不超过该值视为未变化
+        - thumb_size: 指纹缩略图边长
+        - enabled: 为 False 时始终报告「已变化」
+        """
+        self.threshold = float(threshold)
+        self.thumb_size = max(4, int(thumb_size))
+        self.enabled = bool(enabled)
+        self._last_thumb = None
+        self.frames = 0
+        self.skipped = 0
+
+    def _thumbnail(self, frame_bgr):
+        if frame_bgr.ndim == 3:
+            gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = frame_bgr
+        thumb = cv2.resize(gray, (self.thumb_size, self.thumb_size), interpolation=cv2.INTER_AREA)
+        return thumb.astype(np.int16)
+
+    def is_unchanged(self, frame_bgr):
+        """
+        判断当前帧与上一帧相比是否没有变化，并更新内部指纹。
+
+        返回：
+        - True: 画面未变化，可复用上一帧结果
+        - False: 画面已变化（或首帧 / 检测关闭 / 帧尺寸变化）
+        """
+        if frame_bgr is None or getattr(frame_bgr, "size", 0) == 0:
+            return False
+        self.frames += 1
+        if not self.enabled:
+            return False
+
+        thumb = self._thumbnail(frame_bgr)
+        last = self._last_thumb
+        if last is None or last.shape != thumb.shape:
+            self._last_thumb = thumb
+            return False
+
+        mad = float(np.mean(np.abs(thumb - last)))
+        if mad <= self.threshold:
+            # 不更新指纹：缓慢渐变累积到阈值后仍会被识别为变化
+            self.skipped += 1
+            return True
+
+        self._last_thumb = thumb
+        return False
+
+    def reset(self):
+        """清除上一帧指纹（例如 HDR 系数或模板变化后强制重新匹配）。"""
+        self._last_thumb = None
+
+    @property
+    def skip_rate(self):
+        """被跳过的帧占比（0.0 - 1.0）。"""
+        return self.skipped / self.frames if self.frames else 0.0
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import namedtuple
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+# 一次「截图 + 匹配」的结果，由 FrameHub 广播给所有订阅者
+# - frame:  HDR 处理后的截图（帧环形缓冲区中的视图，只在回调期间有效，需保留时自行拷贝）
+# - raw:    原始 BGR 截图（同上）
+# - best_img_info: (tmpl_bgr_used, top_left, (w, h)) 或 None
+# - unchanged: 画面未变化、复用了上一帧的匹配结果
+# - index:  帧序号（从 0 开始）
+# - source_index: frame 与匹配结果实际来自的帧序号（画面未变化时为被复用的那一帧）
+FrameEvent = namedtuple(
+    "FrameEvent",
+    ["frame", "raw", "best_img_info", "best_name", "best_score", "timestamp", "unchanged", "index", "source_index"],
+)
+
+
+class FrameSubscription:
+    """一个订阅者及其抽样设置，由 `FrameHub.subscribe` 返回。"""
+
+    def __init__(self, hub, callback, every=1, max_fps=0.0, name=None, order=0):
+        self.hub = hub
+        self.callback = callback
+        self.every = max(1, int(every))
+        self.min_interval = 0.0
+        self.set_max_fps(max_fps)
+        self.name = name or getattr(callback, "__name__", "subscriber")
+        self.order = order
+        self.delivered = 0
+        self.skipped = 0
+        self._last_delivery = None
+
+    def set_max_fps(self, max_fps):
+        """限制该订阅者的接收频率（0 表示不限制）。"""
+        self.min_interval = 1.0 / float(max_fps) if max_fps and max_fps > 0 else 0.0
+
+    def wants(self, event, now):
+        if event.index % self.every:
+            return False
+        if self.min_interval and self._last_delivery is not None and now - self._last_delivery < self.min_interval:
+            return False
+        return True
+
+    def deliver(self, event, now):
+        if not self.wants(event, now):
+            self.skipped += 1
+            return
+        self._last_delivery = now
+        self.delivered += 1
+        self.callback(event)
+
+    def unsubscribe(self):
+        self.hub.unsubscribe(self)
+
+
+class FrameHub:
+    """
+    单一的截图 + 匹配结果分发中心（每个 ImageMatcher / 截图区域一个）：
+
+    - 截图、HDR 与模板匹配每帧只做一次，结果以 `FrameEvent` 广播给所有订阅者
+      （按键决策、GUI 预览、录制、遥测……），开启预览或录制不会再多截一次图、多匹配一次；
+    - 每个订阅者可以单独抽样：every=N 只接收每 N 帧中的一帧，max_fps 限制接收频率；
+    - 回调在引擎线程中按 order 从小到大依次同步调用，应尽快返回；单个订阅者出错只记录日志，
+      不影响其它订阅者；
+    - 订阅 / 取消订阅可在任意线程进行（写时复制，广播过程中不加锁）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = ()
+        self._index = 0
+
+    def subscribe(self, callback, every: int = 1, max_fps: float = 0.0, name=None, order: int = 0):
+        """
+        添加订阅者 callback(event)。
+
+        参数：
+        - every: 每 every 帧接收一帧
+        - max_fps: 最高接收频率，0 表示不限制
+        - name: 订阅者名称（用于统计与日志）
+        - order: 同一帧内的调用顺序，越小越先调用
+
+        返回：
+        - FrameSubscription，可调用其 `unsubscribe()` 取消订阅
+        """
+        subscription = FrameSubscription(self, callback, every=every, max_fps=max_fps, name=name, order=order)
+        with self._lock:
+            self._subscriptions = tuple(
+                sorted(self._subscriptions + (subscription,), key=lambda s: s.order)
+            )
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    @property
+    def subscriptions(self):
+        return self._subscriptions
+
+    def next_index(self):
+        """分配下一帧的序号（由发布方在构造 FrameEvent 时调用）。"""
+        index = self._index
+        self._index += 1
+        return index
+
+    def publish(self, event):
+        """把一帧结果依次交给所有订阅者。"""
+        now = time.monotonic()
+        for subscription in self._subscriptions:
+            try:
+                subscription.deliver(event, now)
+            except Exception as e:
+                logger.error("[FrameHub] 订阅者 %s 处理帧时出错: %s", subscription.name, e)
+
+    def stats(self):
+        """各订阅者的接收 / 跳过帧数。"""
+        return {s.name: {"delivered": s.delivered, "skipped": s.skipped} for s in self._subscriptions}
@@ -0,0 +1,196 @@
+import json
+import os
+import queue
+import threading
+import time
+import numpy as np
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+class FrameRecorder:
+    """
+    把截图帧、时间戳与匹配结果写入磁盘的录制器：
+
+    - 帧数据按原始 BGR 字节顺序追加到 `frames.bin`，可用 `np.memmap` 直接映射读取；
+    - 每帧一行写入 `index.jsonl`：偏移、形状、截图时刻、最佳匹配名称与得分；
+    - `record` 只做一次帧拷贝并放入有界队列，由后台线程写盘；队列满时丢弃该帧并计数，
+      绝不阻塞匹配线程。
+
+    录制结果由 `FrameRecording` 读取，由 `ReplayCaptureBackend` 回放。
+    """
+
+    FRAMES_FILE = "frames.bin"
+    INDEX_FILE = "index.jsonl"
+
+    def __init__(self, path, max_pending: int = 64):
+        """
+        参数：
+        - path: 录制目录（不存在时自动创建，已有的录制会被覆盖）
+        - max_pending: 等待写盘的最大帧数
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._frames_file = open(os.path.join(path, self.FRAMES_FILE), "wb")
+        self._index_file = open(os.path.join(path, self.INDEX_FILE), "w", encoding="utf-8")
+        self._offset = 0
+        self.recorded = 0
+        self.dropped = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._write_loop, name="rotation-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, frame, timestamp, best_name=None, best_score=None):
+        """
+        登记一帧（调用方线程只做拷贝与入队）。
+
+        参数：
+        - frame: BGR uint8 图像（可以是环形缓冲区中的视图，这里会拷贝）
+        - timestamp: 截图时刻（time.time()）
+        - best_name / best_score: 该帧的匹配结果，可为 None
+        """
+        if self._closed or frame is None:
+            return False
+        entry = (
+            np.ascontiguousarray(frame, dtype=np.uint8).copy(),
+            float(timestamp),
+            best_name,
+            None if best_score is None else float(best_score),
+        )
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _write_loop(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                break
+            frame, timestamp, best_name, best_score = entry
+            try:
+                data = frame.tobytes()
+                self._frames_file.write(data)
+                self._index_file.write(json.dumps({
+                    "offset": self._offset,
+                    "shape": list(frame.shape),
+                    "t": timestamp,
+                    "name": best_name,
+                    "score": best_score,
+                }, ensure_ascii=False) + "\n")
+                self._offset += len(data)
+                self.recorded += 1
+            except Exception as e:
+                logger.error("[Recorder] 写入录制帧出错: %s", e)
+
+    def close(self):
+        """等待队列中的帧写完并关闭文件。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._frames_file.close()
+        self._index_file.close()
+        logger.info("[Recorder] 录制结束: %d 帧写入 %s，丢弃 %d 帧", self.recorded, self.path, self.dropped)
+
+
+class FrameRecording:
+    """
+    读取 `FrameRecorder` 写出的录制目录：
+
+    - 帧数据通过 `np.memmap` 只读映射，`frame(i)` 返回零拷贝视图；
+    - `timestamps`、`names`、`scores` 为与帧一一对应的索引数据。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        index_path = os.path.join(path, FrameRecorder.INDEX_FILE)
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            for line in index_file:
+                line = line.strip()
+                if line:
+                    self.entries.append(json.loads(line))
+        frames_path = os.path.join(path, FrameRecorder.FRAMES_FILE)
+        if self.entries and os.path.getsize(frames_path) > 0:
+            self._data = np.memmap(frames_path, dtype=np.uint8, mode="r")
+        else:
+            self._data = np.zeros(0, dtype=np.uint8)
+        self.timestamps = np.array([e["t"] for e in self.entries], dtype=np.float64)
+        self.names = [e.get("name") for e in self.entries]
+        self.scores = np.array(
+            [np.nan if e.get("score") is None else e["score"] for e in self.entries], dtype=np.float64
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    def frame(self, index):
+        """返回第 index 帧的只读 BGR 视图。"""
+        entry = self.entries[index]
+        shape = tuple(entry["shape"])
+        size = int(np.prod(shape))
+        offset = entry["offset"]
+        return self._data[offset:offset + size].reshape(shape)
+
+    @property
+    def duration(self):
+        """录制时长（秒）。"""
+        if len(self.timestamps) < 2:
+            return 0.0
+        return float(self.timestamps[-1] - self.timestamps[0])
+
+
+def run_replay_benchmark(recording_path, matcher, realtime: bool = False):
+    """
+    无界面基准：把录制的帧依次送入同一个 ImageMatcher，统计匹配结果与耗时。
+
+    matcher 需由调用方创建（可使用任意模板与阈值），本函数会：
+    - 将截图后端替换为 `ReplayCaptureBackend`；
+    - 关闭前台窗口检查，并用记录列表替代按键输出（不触发键盘与屏幕）。
+
+    返回：
+    - {"frames", "elapsed_s", "fps", "decisions", "agreement", "latency"}，
+      agreement 为回放匹配名称与录制时匹配名称一致的帧占比。
+    """
+    from .capture_backend import ReplayCaptureBackend
+
+    recording = FrameRecording(recording_path)
+    backend = ReplayCaptureBackend(recording, realtime=realtime, loop=False)
+    decisions = []
+    names = []
+    previous = (
+        matcher.capture_backend, matcher.key_sink, matcher.require_focus, matcher.frame_callback, matcher.enable_keys
+    )
+    matcher.capture_backend = backend
+    matcher.key_sink = decisions.append
+    matcher.require_focus = False
+    matcher.enable_keys = True
+    matcher.frame_callback = lambda screenshot, info, name, score: names.append(name)
+    matcher.latency_stats.reset()
+    start = time.perf_counter()
+    try:
+        while not backend.exhausted:
+            matcher.match_images()
+    finally:
+        elapsed = time.perf_counter() - start
+        (
+            matcher.capture_backend, matcher.key_sink, matcher.require_focus, matcher.frame_callback,
+            matcher.enable_keys,
+        ) = previous
+
+    recorded_names = recording.names[:len(names)]
+    same = sum(1 for a, b in zip(names, recorded_names) if a == b)
+    return {
+        "frames": len(names),
+        "elapsed_s": elapsed,
+        "fps": len(names) / elapsed if elapsed > 0 else 0.0,
+        "decisions": decisions,
+        "agreement": same / len(names) if names else 0.0,
+        "latency": matcher.latency_stats.snapshot(),
+    }
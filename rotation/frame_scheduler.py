@@ -0,0 +1,155 @@
+import threading
+import time
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+class FrameScheduler:
+    """
+    自适应截图节奏调度器，取代固定的 `time.sleep(0.1)`：
+
+    - "active"：开始热键按住时使用高帧率（scheduler.active_fps），降低战斗中的反应延迟；
+    - "idle"  ：游戏窗口不在前台，或画面连续多帧未变化时使用低帧率（默认取 screenshot_delay）；
+    - "target"：其余情况使用目标帧率（scheduler.target_fps）；
+    - "paused"：游戏窗口不在前台且 pause_when_unfocused 为真时完全停止截图，
+      截图线程只按 focus.poll_interval 检查前台窗口，回到前台后恢复；
+    - "preview"：预览模式（`set_preview`）固定按显示刷新率（preview_fps）截图，
+      此时 GUI 在前台、画面常常不变，不因前台窗口或画面未变化而降频。
+
+    等待采用截止时间方式：下一帧的截止时间 = 本帧开始时间 + 当前间隔，
+    已经花在截图 / 匹配上的时间会被扣除；超时的帧不补偿，直接从当前时刻重新计时。
+    `wake()` 可以提前结束等待（例如热键刚按下时立即截图）。
+    """
+
+    MODE_ACTIVE = "active"
+    MODE_TARGET = "target"
+    MODE_IDLE = "idle"
+    MODE_PAUSED = "paused"
+    MODE_PREVIEW = "preview"
+
+    def __init__(self, config=None):
+        """
+        参数：
+        - config: rotation_config.yaml 解析后的字典，读取其中的 scheduler 段与 screenshot_delay
+        """
+        config = config or {}
+        sched_cfg = config.get("scheduler") or {}
+        screenshot_delay = float(config.get("screenshot_delay", 0.3))
+
+        self.target_fps = max(0.1, float(sched_cfg.get("target_fps", 10)))
+        self.active_fps = max(0.1, float(sched_cfg.get("active_fps", 30)))
+        idle_default = 1.0 / screenshot_delay if screenshot_delay > 0 else 2.0
+        self.idle_fps = max(0.1, float(sched_cfg.get("idle_fps", idle_default)))
+        # 连续多少帧画面未变化后进入 idle
+        self.idle_after = max(1, int(sched_cfg.get("idle_after", 5)))
+        # 游戏不在前台时是否暂停截图（focus.pause_capture），以及暂停期间的前台检查间隔
+        focus_cfg = config.get("focus") or {}
+        self.pause_when_unfocused = bool(focus_cfg.get("pause_capture", True))
+        self.pause_poll_interval = max(0.05, float(focus_cfg.get("poll_interval", 0.5)))
+
+        # 预览模式的帧率：默认 60，开启预览时由调用方设为屏幕刷新率
+        self.preview_fps = max(0.1, float(sched_cfg.get("preview_fps", 60)))
+        self.preview = False
+
+        self.hotkey_held = False
+        self.focused = None  # None 表示未知（不据此降频）
+        self.unchanged_streak = 0
+        self.mode = self.MODE_TARGET
+
+        self._frame_start = None
+        self._wake_event = threading.Event()
+        self.mode_switches = 0
+        self.frames = 0
+        self.overruns = 0
+
+    def update(self, hotkey_held=None, focused=None, unchanged=None):
+        """更新调度依据的状态；参数为 None 时保持原值。"""
+        if hotkey_held is not None:
+            self.hotkey_held = bool(hotkey_held)
+        if focused is not None:
+            self.focused = bool(focused)
+        if unchanged is not None:
+            self.unchanged_streak = self.unchanged_streak + 1 if unchanged else 0
+        self._select_mode()
+
+    def set_preview(self, enabled, fps=None):
+        """开关预览模式；fps 给出时同时更新预览帧率（例如屏幕刷新率）。"""
+        if fps is not None and fps > 0:
+            self.preview_fps = max(0.1, float(fps))
+        self.preview = bool(enabled)
+        self._select_mode()
+
+    def _select_mode(self):
+        if self.preview:
+            mode = self.MODE_PREVIEW
+        elif self.focused is False and self.pause_when_unfocused:
+            mode = self.MODE_PAUSED
+        elif self.hotkey_held:
+            mode = self.MODE_ACTIVE
+        elif self.focused is False or self.unchanged_streak >= self.idle_after:
+            mode = self.MODE_IDLE
+        else:
+            mode = self.MODE_TARGET
+        if mode != self.mode:
+            self.mode = mode
+            self.mode_switches += 1
+            logger.info("[Scheduler] 截图节奏切换为 %s（%.1f FPS）", mode, self.current_fps)
+
+    @property
+    def paused(self):
+        return self.mode == self.MODE_PAUSED
+
+    @property
+    def current_fps(self):
+        if self.mode == self.MODE_PREVIEW:
+            return self.preview_fps
+        if self.mode == self.MODE_PAUSED:
+            return 1.0 / self.pause_poll_interval
+        if self.mode == self.MODE_ACTIVE:
+            return self.active_fps
+        if self.mode == self.MODE_IDLE:
+            return self.idle_fps
+        return self.target_fps
+
+    @property
+    def current_interval(self):
+        return 1.0 / self.current_fps
+
+    def begin_frame(self):
+        """标记一帧开始，作为计算下一帧截止时间的基准。"""
+        self._frame_start = time.perf_counter()
+        self.frames += 1
+
+    def wait(self, stop_event=None):
+        """
+        等待到下一帧的截止时间（扣除本帧已用时间），可被 `wake()` 或 stop_event 提前唤醒。
+
+        返回实际等待的秒数。
+        """
+        now = time.perf_counter()
+        start = self._frame_start if self._frame_start is not None else now
+        remaining = start + self.current_interval - now
+        if remaining <= 0:
+            self.overruns += 1
+            return 0.0
+        if stop_event is not None and stop_event.is_set():
+            return 0.0
+        # 只在确实被唤醒时消费唤醒标记：超时返回后才到达的 wake() 保留到下一次等待，
+        # 否则它会被 clear() 抹掉，下一帧仍要睡满整个间隔
+        if self._wake_event.wait(remaining):
+            self._wake_event.clear()
+        return time.perf_counter() - now
+
+    def wake(self):
+        """立即结束当前等待，让下一帧马上开始。"""
+        self._wake_event.set()
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "fps": self.current_fps,
+            "frames": self.frames,
+            "overruns": self.overruns,
+            "mode_switches": self.mode_switches,
+        }
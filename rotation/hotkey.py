@@ -0,0 +1,129 @@
+import threading
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+class HotkeySource:
+    """
+    热键事件来源接口：
+
+    - `start(key, callback)` 开始监听 key，按下 / 松开时调用 callback(is_down)；
+    - `stop()` 停止监听。
+
+    回调可能运行在来源自己的线程中（例如 keyboard 库的钩子线程），应尽快返回。
+    """
+
+    name = "base"
+
+    def start(self, key, callback):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+
+class KeyboardHookSource(HotkeySource):
+    """基于 keyboard 库全局键盘钩子的热键来源（按下 / 松开事件，不再轮询）。"""
+
+    name = "keyboard"
+
+    def __init__(self):
+        self._handle = None
+        self._keyboard = None
+
+    def start(self, key, callback):
+        # 延迟导入：keyboard 只在 GUI 运行时需要，无界面场景不依赖它
+        import keyboard
+
+        self._keyboard = keyboard
+        self._handle = keyboard.hook_key(key, lambda event: callback(event.event_type == keyboard.KEY_DOWN))
+
+    def stop(self):
+        if self._handle is not None:
+            try:
+                self._keyboard.unhook(self._handle)
+            except (KeyError, ValueError):
+                pass
+            self._handle = None
+
+
+class SyntheticHotkeySource(HotkeySource):
+    """测试用的热键来源：通过 `press()` / `release()` 手动产生事件。"""
+
+    name = "synthetic"
+
+    def __init__(self):
+        self._callback = None
+
+    def start(self, key, callback):
+        self._callback = callback
+
+    def stop(self):
+        self._callback = None
+
+    def press(self):
+        if self._callback is not None:
+            self._callback(True)
+
+    def release(self):
+        if self._callback is not None:
+            self._callback(False)
+
+
+class HotkeyState:
+    """
+    由按下 / 松开事件维护的热键状态：
+
+    - `held` 读取一个 threading.Event，任意线程读取都是原子的，不再每帧调用 keyboard.is_pressed；
+    - 只在状态真正变化时调用 on_change(held)（系统的按键自动重复不会重复触发），
+      调用方可借此立即唤醒正在等待的引擎。
+    """
+
+    def __init__(self, key, source=None, on_change=None):
+        """
+        参数：
+        - key: 热键（rotation_config.yaml 中的 pressed_start）
+        - source: HotkeySource，默认 KeyboardHookSource
+        - on_change: 状态变化回调 on_change(held)
+        """
+        self.key = key
+        self.source = source if source is not None else KeyboardHookSource()
+        self.on_change = on_change
+        self._held = threading.Event()
+        self._lock = threading.Lock()
+        self.started = False
+
+    @property
+    def held(self):
+        return self._held.is_set()
+
+    def start(self):
+        """开始监听热键；钩子安装失败时打印原因，热键保持未按下。"""
+        if self.started:
+            return True
+        try:
+            self.source.start(self.key, self._on_event)
+        except Exception as e:
+            logger.error("[Hotkey] 无法监听热键 '%s': %s", self.key, e)
+            return False
+        self.started = True
+        return True
+
+    def stop(self):
+        if self.started:
+            self.source.stop()
+            self.started = False
+        self._held.clear()
+
+    def _on_event(self, is_down):
+        with self._lock:
+            if is_down == self._held.is_set():
+                return
+            if is_down:
+                self._held.set()
+            else:
+                self._held.clear()
+        logger.info("[Key Detection] Hotkey '%s' %s", self.key, "pressed" if is_down else "released")
+        if self.on_change is not None:
+            self.on_change(is_down)
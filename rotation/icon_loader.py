@@ -4,6 +4,9 @@ import os
 import numpy as np
 
 class SkillIconLoader:
+    # 支持的文件扩展名
+    SUPPORTED_EXTENSIONS = ('.tga', '.png', '.jpg', '.jpeg', '.bmp')
+
     def __init__(self, class_name, talent_name, binded_abilities, game_version=''):
         """
         技能图标加载器，支持 Retail 和 Classic 版本。
@@ -35,37 +38,52 @@ class SkillIconLoader:
 
         self.images = self._load_images()
 
-    def _load_images(self):
-        """加载 'base' 和天赋技能文件夹中的图标"""
+    def _load_images(self, abilities=None):
+        """加载 'base' 和天赋技能文件夹中的图标（abilities 为 None 时加载全部绑定的技能）"""
         images = {}
+        if abilities is None:
+            abilities = self.binded_abilities
 
         # 加载 'base' 文件夹中的图标
         if os.path.exists(self.class_directory):
-            images.update(self._load_images_from_directory(self.class_directory))
+            images.update(self._load_images_from_directory(self.class_directory, abilities))
         else:
             print(f"[WARN] Base directory does not exist: {self.class_directory}")
 
         # 加载天赋文件夹中的图标
         if os.path.exists(self.talent_directory):
-            images.update(self._load_images_from_directory(self.talent_directory))
+            images.update(self._load_images_from_directory(self.talent_directory, abilities))
         else:
             print(f"[WARN] Talent directory does not exist: {self.talent_directory}")
 
         print(f"[INFO] Loaded icons: {list(images.keys())}")
         return images
 
-    def _load_images_from_directory(self, directory):
+    def load_images(self, abilities):
+        """只加载指定技能的图标（热更新按键绑定时只解码新增的技能），不影响已加载的 images"""
+        return self._load_images(list(abilities))
+
+    def available_abilities(self):
+        """'base' 和天赋文件夹中全部图标对应的技能名称（不论是否绑定按键），预览模式用它匹配整个天赋"""
+        names = []
+        for directory in (self.class_directory, self.talent_directory):
+            if not os.path.exists(directory):
+                continue
+            for filename in os.listdir(directory):
+                ability_name, ext = os.path.splitext(filename)
+                if ext.lower() in self.SUPPORTED_EXTENSIONS and ability_name not in names:
+                    names.append(ability_name)
+        return names
+
+    def _load_images_from_directory(self, directory, abilities):
         """加载指定目录中的图标"""
         images = {}
 
-        # 支持的文件扩展名
-        supported_extensions = ('.tga', '.png', '.jpg', '.jpeg', '.bmp')
-
         for filename in os.listdir(directory):
             ability_name, ext = os.path.splitext(filename)
 
             # 检查文件是否在绑定的技能列表中，且扩展名受支持
-            if ability_name in self.binded_abilities and ext.lower() in supported_extensions:
+            if ability_name in abilities and ext.lower() in self.SUPPORTED_EXTENSIONS:
                 image_path = os.path.join(directory, filename)
                 try:
                     # 读取并转换图像
@@ -0,0 +1,413 @@
+import collections
+import heapq
+import sys
+import threading
+import time
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+class KeyInputBackend:
+    """
+    按键输出后端接口：
+
+    - `press(key)` 按下并松开一个键（例如 "1"、"f5"、"shift+2"），不做任何额外等待；
+    - `close()` 释放后端持有的资源。
+
+    具体实现由 `create_key_backend` 根据 rotation_config.yaml 中的 `input.backend` 选择。
+    """
+
+    name = "base"
+
+    def press(self, key):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiKeyBackend(KeyInputBackend):
+    """
+    基于 pyautogui 的按键后端（原有实现）。
+
+    以 `_pause=False` 调用，跳过 pyautogui.PAUSE（默认 0.1 秒）的隐式等待，
+    按键间隔统一由 `KeyInputDispatcher` 控制。
+    """
+
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+
+        self._pyautogui = pyautogui
+
+    def press(self, key):
+        self._pyautogui.press(key, _pause=False)
+
+
+class SendInputKeyBackend(KeyInputBackend):
+    """
+    直接调用 Windows `SendInput` 的按键后端：
+
+    - 每个键的 INPUT 数组（按下 + 松开）首次使用时构建并缓存，之后每次按键只有一次系统调用；
+    - 支持单字符、f1 - f24、常用命名键以及 "shift+2" 这类组合键；
+      单字符需要的 shift / ctrl / alt（例如 AltGr 布局下的字符）按 `VkKeyScanW` 的结果自动补上。
+
+    仅在 Windows 上可用，其他平台构造时抛出 OSError。
+    """
+
+    name = "sendinput"
+
+    INPUT_KEYBOARD = 1
+    KEYEVENTF_KEYUP = 0x0002
+
+    NAMED_KEYS = {
+        "backspace": 0x08, "tab": 0x09, "enter": 0x0D, "return": 0x0D,
+        "shift": 0x10, "ctrl": 0x11, "alt": 0x12, "pause": 0x13, "capslock": 0x14,
+        "esc": 0x1B, "escape": 0x1B, "space": 0x20, "pageup": 0x21, "pagedown": 0x22,
+        "end": 0x23, "home": 0x24, "left": 0x25, "up": 0x26, "right": 0x27, "down": 0x28,
+        "insert": 0x2D, "delete": 0x2E, "del": 0x2E,
+        "multiply": 0x6A, "add": 0x6B, "subtract": 0x6D, "decimal": 0x6E, "divide": 0x6F,
+    }
+
+    def __init__(self):
+        if sys.platform != "win32":
+            raise OSError("SendInput 仅在 Windows 上可用")
+        import ctypes
+        from ctypes import wintypes
+
+        ulong_ptr = ctypes.c_size_t
+
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [
+                ("wVk", wintypes.WORD),
+                ("wScan", wintypes.WORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ulong_ptr),
+            ]
+
+        class MOUSEINPUT(ctypes.Structure):
+            _fields_ = [
+                ("dx", wintypes.LONG),
+                ("dy", wintypes.LONG),
+                ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD),
+                ("dwExtraInfo", ulong_ptr),
+            ]
+
+        class _INPUTUNION(ctypes.Union):
+            _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT)]
+
+        class INPUT(ctypes.Structure):
+            _anonymous_ = ("u",)
+            _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+        self._ctypes = ctypes
+        self._INPUT = INPUT
+        self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+        self._user32.SendInput.restype = wintypes.UINT
+        self._cache = {}
+
+    def _virtual_keys(self, key):
+        """把按键描述解析为虚拟键码列表（修饰键在前）。"""
+        key = str(key).lower()
+        parts = key.split("+") if len(key) > 1 and not key.endswith("+") else [key]
+        codes = []
+        for part in parts:
+            if part in self.NAMED_KEYS:
+                codes.append(self.NAMED_KEYS[part])
+            elif len(part) > 1 and part[0] == "f" and part[1:].isdigit() and 1 <= int(part[1:]) <= 24:
+                codes.append(0x70 + int(part[1:]) - 1)
+            elif part.startswith("num") and part[3:].isdigit() and len(part) == 4:
+                codes.append(0x60 + int(part[3:]))
+            elif len(part) == 1:
+                scan = self._user32.VkKeyScanW(ord(part))
+                if scan == -1 or scan == 0xFFFF:
+                    raise ValueError(f"无法映射按键: {part}")
+                # 高字节为需要同时按下的修饰键：1 = shift，2 = ctrl，4 = alt，其余位（如 Hankaku）无法模拟
+                modifiers = (scan >> 8) & 0xFF
+                if modifiers & ~0x07:
+                    raise ValueError(f"无法映射按键: {part}（需要不支持的修饰键 0x{modifiers:02x}）")
+                for bit, modifier in ((0x01, "shift"), (0x02, "ctrl"), (0x04, "alt")):
+                    if modifiers & bit and self.NAMED_KEYS[modifier] not in codes:
+                        codes.append(self.NAMED_KEYS[modifier])
+                codes.append(scan & 0xFF)
+            else:
+                raise ValueError(f"无法映射按键: {part}")
+        return codes
+
+    def _build_inputs(self, key):
+        codes = self._virtual_keys(key)
+        events = [(vk, 0) for vk in codes] + [(vk, self.KEYEVENTF_KEYUP) for vk in reversed(codes)]
+        inputs = (self._INPUT * len(events))()
+        for item, (vk, flags) in zip(inputs, events):
+            item.type = self.INPUT_KEYBOARD
+            item.ki.wVk = vk
+            item.ki.wScan = self._user32.MapVirtualKeyW(vk, 0)
+            item.ki.dwFlags = flags
+        return inputs
+
+    def press(self, key):
+        inputs = self._cache.get(key)
+        if inputs is None:
+            inputs = self._cache[key] = self._build_inputs(key)
+        sent = self._user32.SendInput(len(inputs), inputs, self._ctypes.sizeof(self._INPUT))
+        if sent != len(inputs):
+            raise OSError(f"SendInput 只发送了 {sent}/{len(inputs)} 个事件")
+
+
+class RecordingKeyBackend(KeyInputBackend):
+    """
+    测试与基准用的按键后端：不产生任何真实输入，只记录 (key, time.perf_counter())。
+
+    press_time 可模拟后端本身的耗时（秒）。
+    """
+
+    name = "recording"
+
+    def __init__(self, press_time: float = 0.0):
+        self.press_time = float(press_time)
+        self.presses = []
+
+    def press(self, key):
+        if self.press_time > 0:
+            time.sleep(self.press_time)
+        self.presses.append((key, time.perf_counter()))
+
+
+KEY_BACKENDS = {
+    SendInputKeyBackend.name: SendInputKeyBackend,
+    PyAutoGuiKeyBackend.name: PyAutoGuiKeyBackend,
+    RecordingKeyBackend.name: RecordingKeyBackend,
+}
+
+
+def create_key_backend(config):
+    """
+    根据 rotation_config.yaml 中的 `input` 配置创建按键后端。
+
+    配置示例：
+        input:
+          backend: sendinput   # sendinput / pyautogui / recording
+          max_pending: 2
+
+    sendinput 不可用（非 Windows）时自动回退到 pyautogui。
+    """
+    input_cfg = (config or {}).get("input") or {}
+    backend_name = str(input_cfg.get("backend", "sendinput")).lower()
+
+    if backend_name == RecordingKeyBackend.name:
+        return RecordingKeyBackend()
+    if backend_name == SendInputKeyBackend.name:
+        try:
+            return SendInputKeyBackend()
+        except Exception as e:
+            logger.warning("[Input] SendInput 后端不可用，回退到 pyautogui: %s", e)
+            return PyAutoGuiKeyBackend()
+    if backend_name != PyAutoGuiKeyBackend.name:
+        logger.warning("[Input] 未知的按键后端 '%s'，使用 pyautogui", backend_name)
+    return PyAutoGuiKeyBackend()
+
+
+class KeyInputDispatcher:
+    """
+    运行在独立输入线程上的按键分发器：
+
+    - `submit` 从不阻塞：按键进入一个很小的待发送队列（input.max_pending），
+      同一个键已在队列中时直接合并，队列满时丢弃最旧的一项；
+    - 输入线程依次按下队列中的键，每次按键后等待 KeyPresser 的随机间隔；
+    - 每次按键记录后端耗时（key_press）、排队时间（key_queue）
+      以及从截图到按下的端到端延迟（frame_to_key）；
+    - 读条 / 引导技能（submit 时 cast_time > 0）：先按下一次，之后在施法时间内由定时器堆
+      按随机间隔重复按下，不占用匹配线程；施法期间同一键的推荐被合并，
+      推荐其他键时立即取消尚未执行的施法定时器（抢占）。
+
+    后端在首次按键时于输入线程内懒加载，便于在无显示器的环境中创建分发器。
+    """
+
+    def __init__(self, presser, max_pending: int = 2, latency_stats=None):
+        """
+        参数：
+        - presser: KeyPresser，提供按键后端与随机间隔
+        - max_pending: 待发送队列的最大长度
+        - latency_stats: LatencyStats，用于记录按键相关延迟（可选）
+        """
+        self.presser = presser
+        self.max_pending = max(1, int(max_pending))
+        self.latency_stats = latency_stats
+        self._cond = threading.Condition()
+        self._pending = collections.OrderedDict()  # key -> (frame_time, submitted_at)
+        # 定时器堆：(到期时刻 perf_counter, 序号, key, cast_id)
+        self._timers = []
+        self._timer_seq = 0
+        # 当前施法：键、结束时刻与编号（编号变化即令旧定时器失效）
+        self._cast_key = None
+        self._cast_end = 0.0
+        self._cast_id = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.pressed = 0
+        self.casts = 0
+        self.preempted = 0
+        self.last_press_ms = 0.0
+
+    def start(self):
+        """启动输入线程（已启动时忽略）。"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="rotation-input", daemon=True)
+        self._thread.start()
+
+    def submit(self, key, frame_time=None, cast_time=0.0):
+        """
+        提交一次按键。
+
+        参数：
+        - key：技能快捷键
+        - frame_time：触发该按键的帧的截图时刻（time.time()），用于端到端延迟统计
+        - cast_time：施法 / 引导时间（秒），大于 0 时按施法技能调度
+
+        返回：
+        - True 表示进入队列；False 表示与队列中或正在施法的同一键合并
+        """
+        key = str(key)
+        with self._cond:
+            if self._cast_key is not None and time.perf_counter() >= self._cast_end:
+                self._cancel_cast()
+            if self._cast_key is not None:
+                if key == self._cast_key:
+                    self.coalesced += 1
+                    return False
+                self._cancel_cast()
+                self.preempted += 1
+            if key in self._pending:
+                self.coalesced += 1
+                return False
+            if len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            now = time.perf_counter()
+            self._pending[key] = (frame_time, now)
+            self.submitted += 1
+            if cast_time > 0:
+                self._cast_key = key
+                self._cast_end = now + float(cast_time)
+                self._cast_id += 1
+                self.casts += 1
+            self._cond.notify()
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        return True
+
+    def clear(self):
+        """丢弃所有尚未发送的按键与施法定时器。"""
+        with self._cond:
+            self._pending.clear()
+            self._cancel_cast()
+
+    @property
+    def casting(self):
+        """当前正在施法的键，没有时为 None。"""
+        return self._cast_key
+
+    def _cancel_cast(self):
+        # 调用方持有 self._cond
+        self._cast_key = None
+        self._cast_id += 1
+        self._timers = []
+
+    def _schedule(self, due, key, cast_id):
+        # 调用方持有 self._cond
+        self._timer_seq += 1
+        heapq.heappush(self._timers, (due, self._timer_seq, key, cast_id))
+        self._cond.notify()
+
+    def _next_action(self):
+        """
+        等待下一个要执行的按键：队列中的按键优先，其次是已到期的施法定时器。
+
+        返回：
+        - (key, frame_time, submitted_at)，定时器触发的按键两者均为 None；stop 时返回 None
+        """
+        with self._cond:
+            while not self._stop_event.is_set():
+                if self._pending:
+                    key, (frame_time, submitted_at) = self._pending.popitem(last=False)
+                    return key, frame_time, submitted_at
+                timeout = None
+                if self._timers:
+                    due, _, key, cast_id = self._timers[0]
+                    now = time.perf_counter()
+                    if due <= now:
+                        heapq.heappop(self._timers)
+                        if cast_id != self._cast_id:
+                            continue
+                        if now >= self._cast_end:
+                            self._cast_key = None
+                            continue
+                        return key, None, None
+                    timeout = due - now
+                self._cond.wait(timeout)
+        return None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            action = self._next_action()
+            if action is None:
+                break
+            key, frame_time, submitted_at = action
+            if not self._press(key, frame_time, submitted_at):
+                continue
+            delay = self.presser.delay
+            with self._cond:
+                if key == self._cast_key:
+                    # 施法期间按随机间隔重复按下，直到施法结束或被其他推荐抢占
+                    self._schedule(time.perf_counter() + delay, key, self._cast_id)
+            # 人为的随机按键间隔在输入线程内等待，stop 可以立即打断
+            self._stop_event.wait(delay)
+            self.presser.set_random_delay()
+
+    def _press(self, key, frame_time, submitted_at):
+        press_start = time.perf_counter()
+        if not self.presser.press(key):
+            return False
+        self.pressed += 1
+        self.last_press_ms = self.presser.last_press_ms
+        stats = self.latency_stats
+        if stats is not None:
+            if submitted_at is not None:
+                stats.record("key_queue", (press_start - submitted_at) * 1000.0)
+            stats.record("key_press", self.last_press_ms)
+            if frame_time is not None:
+                stats.record("frame_to_key", (self.presser.last_press_at - frame_time) * 1000.0)
+        return True
+
+    def stop(self, timeout: float = 1.0):
+        """停止输入线程，未发送的按键被丢弃。"""
+        self._stop_event.set()
+        with self._cond:
+            self._pending.clear()
+            self._cancel_cast()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "pressed": self.pressed,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "casts": self.casts,
+            "preempted": self.preempted,
+            "last_press_ms": self.last_press_ms,
+        }
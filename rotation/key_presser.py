@@ -1,21 +1,30 @@
 
 
-import pyautogui
 import random
 import time
+from .key_input import create_key_backend
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 
 class KeyPresser:
-    def __init__(self, config):
+    def __init__(self, config, backend=None):
         """
         初始化按键处理器。
 
         参数：
         - config：配置参数。
+        - backend：按键后端（可选），默认按 config 中的 input.backend 在首次按键时创建。
         """
+        self.config = config
         self.min_delay = config['delay']['min']
         self.max_delay = config['delay']['max']
+        self.backend = backend
         self.set_random_delay()
+        # 最近一次按键：后端本身的耗时（毫秒）与按下完成的时刻（time.time()）
+        self.last_press_ms = 0.0
+        self.last_press_at = None
 
     def set_random_delay(self):
         """
@@ -23,18 +32,38 @@ class KeyPresser:
         """
         self.delay = random.uniform(self.min_delay, self.max_delay)
 
-    def press_key(self, key):
+    def press(self, key):
         """
-        模拟按下一个键。
+        立即按下一个键，不等待随机延迟。
 
         参数：
         - key：要按下的键。
+
+        返回：
+        - 是否成功按下。
         """
         try:
+            # 延迟创建：无界面环境（回放基准、命令行）创建 KeyPresser 时不依赖显示器
+            if self.backend is None:
+                self.backend = create_key_backend(self.config)
             key = str(key)
-            print(f"[Key Press] Pressing key: {key}", flush=True)
-            pyautogui.press(key)
+            logger.debug("[Key Press] Pressing key: %s", key)
+            press_start = time.perf_counter()
+            self.backend.press(key)
+            self.last_press_ms = (time.perf_counter() - press_start) * 1000.0
+            self.last_press_at = time.time()
+            return True
+        except Exception as e:
+            logger.error("按键 %s 时出错: %s", key, e)
+            return False
+
+    def press_key(self, key):
+        """
+        模拟按下一个键，并在当前线程等待随机延迟。
+
+        参数：
+        - key：要按下的键。
+        """
+        if self.press(key):
             time.sleep(self.delay)
             self.set_random_delay()
-        except Exception as e:
-            print(f"按键 {key} 时出错: {e}")
@@ -0,0 +1,140 @@
+import math
+import threading
+import time
+
+
+class LatencyHistogram:
+    """
+    固定大小的对数分桶延迟直方图：
+
+    - 桶边界按固定比例 `growth` 递增，覆盖 `min_ms` ~ `max_ms`，内存占用固定；
+    - `record` 为 O(1)，只做一次对数运算与计数累加，开销可忽略；
+    - 百分位由桶的上边界近似给出，相对误差不超过 growth - 1。
+    """
+
+    def __init__(self, min_ms: float = 0.01, max_ms: float = 10000.0, growth: float = 1.1):
+        self.min_ms = float(min_ms)
+        self.growth = float(growth)
+        self._log_growth = math.log(self.growth)
+        self.bucket_count = int(math.ceil(math.log(max_ms / min_ms) / self._log_growth)) + 2
+        self.counts = [0] * self.bucket_count
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def _bucket(self, value_ms):
+        if value_ms <= self.min_ms:
+            return 0
+        index = int(math.log(value_ms / self.min_ms) / self._log_growth) + 1
+        return min(index, self.bucket_count - 1)
+
+    def _upper_bound(self, index):
+        return self.min_ms * (self.growth ** index)
+
+    def record(self, value_ms):
+        self.counts[self._bucket(value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q):
+        """返回第 q 百分位（0 - 100）的近似值（毫秒），无数据时返回 0.0。"""
+        if self.count == 0:
+            return 0.0
+        target = max(1, int(math.ceil(self.count * q / 100.0)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._upper_bound(index), self.max_ms)
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total_ms / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max_ms,
+        }
+
+    def reset(self):
+        self.counts = [0] * self.bucket_count
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+
+class LatencyStats:
+    """
+    轮转引擎各阶段的延迟统计：
+
+    - 每个阶段（capture / hdr / match / focus / key_press / frame_to_key ...）一个直方图；
+    - `measure(stage)` 作为上下文管理器计时，`record(stage, ms)` 直接写入；
+    - `tick_frame()` 每处理一帧调用一次，用于计算实时 FPS；
+    - `snapshot()` 返回可跨线程传递的普通字典；
+    - `last` 保存每个阶段最近一次的耗时，便于逐帧输出。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self.last = {}
+        self._last_frame_time = None
+        self.fps = 0.0
+
+    def record(self, stage, value_ms):
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = LatencyHistogram()
+            hist.record(value_ms)
+        self.last[stage] = value_ms
+
+    def measure(self, stage):
+        return _StageTimer(self, stage)
+
+    def tick_frame(self):
+        """记录一帧完成，按帧间隔的指数滑动平均更新 FPS。"""
+        now = time.perf_counter()
+        last = self._last_frame_time
+        self._last_frame_time = now
+        if last is None:
+            return
+        interval = now - last
+        if interval <= 0:
+            return
+        instant = 1.0 / interval
+        self.fps = instant if self.fps <= 0 else 0.9 * self.fps + 0.1 * instant
+
+    def snapshot(self):
+        """返回 {"fps": float, "stages": {stage: {count, mean, p50, p95, p99, max}}}。"""
+        with self._lock:
+            stages = {stage: hist.summary() for stage, hist in self._histograms.items()}
+        return {"fps": self.fps, "stages": stages}
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+        self.last = {}
+        self._last_frame_time = None
+        self.fps = 0.0
+
+
+class _StageTimer:
+    __slots__ = ("_stats", "_stage", "_start")
+
+    def __init__(self, stats, stage):
+        self._stats = stats
+        self._stage = stage
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stats.record(self._stage, (time.perf_counter() - self._start) * 1000.0)
+        return False
@@ -0,0 +1,65 @@
+import logging
+import sys
+import threading
+
+
+LOGGER_NAME = "rotation"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+
+class _CurrentStdoutHandler(logging.StreamHandler):
+    """总是写入当前的 sys.stdout：GUI 把 stdout 重定向到日志窗口后，日志随之进入窗口。"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+_setup_lock = threading.Lock()
+_configured = False
+
+
+def setup_logging(config=None):
+    """
+    配置轮转引擎的日志（可重复调用，后一次调用覆盖级别）。
+
+    日志只写入当前的 sys.stdout：GUI 把 stdout 重定向到 PyLoggerWindow，
+    由窗口负责有界保留与批量刷新（logging.gui_max_lines / gui_flush_ms）。
+
+    配置（rotation_config.yaml）：
+        logging:
+          level: INFO         # DEBUG 时输出逐帧的 [Match Debug] 等调试信息
+
+    返回：
+    - 引擎的 logger
+    """
+    global _configured
+    log_cfg = (config or {}).get("logging") or {}
+    level = logging.getLevelName(str(log_cfg.get("level", "INFO")).upper())
+    if not isinstance(level, int):
+        level = logging.INFO
+    with _setup_lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        if not _configured:
+            stdout_handler = _CurrentStdoutHandler()
+            stdout_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+            logger.addHandler(stdout_handler)
+            logger.propagate = False
+            _configured = True
+        logger.setLevel(level)
+    return logger
+
+
+def get_logger(name=LOGGER_NAME):
+    """返回轮转引擎的 logger（首次调用时按默认配置初始化）。"""
+    if not _configured:
+        setup_logging()
+    return logging.getLogger(name)
@@ -1,17 +1,34 @@
 import cv2
 import numpy as np
 import os
+import threading
 import time
-from PIL import ImageGrab
-import pygetwindow as gw
 from datetime import datetime
 from gui.core.json_settings import Settings
+from .capture_backend import create_capture_backend
+from .frame_buffer import FrameRingBuffer
+from .frame_change_detector import FrameChangeDetector
+from .frame_hub import FrameHub, FrameEvent
+from .focus_tracker import FocusTracker
+from .frame_recorder import FrameRecorder
+from .key_input import KeyInputDispatcher
 from .key_presser import KeyPresser
-from .template_matcher import TemplateMatcher
+from .latency_stats import LatencyStats
+from .log import get_logger
+from . import telemetry
+from .template_matcher import (
+    TemplateMatcher,
+    TemplateCache,
+    BatchedTemplateMatcher,
+    SlotTemplateMatcher,
+    PyramidTemplateMatcher,
+)
+
+logger = get_logger(__name__)
 
 
 class ImageMatcher:
-    def __init__(self, icon_templates, key_mapping, config, version, threshold_mapping=None):
+    def __init__(self, icon_templates, key_mapping, config, version, threshold_mapping=None, cast_time_mapping=None):
         """
         初始化图像匹配器。
 
@@ -21,17 +38,26 @@ class ImageMatcher:
         - config：配置参数。
         - version：游戏版本。
         - threshold_mapping：技能阈值映射字典（可选）。
+        - cast_time_mapping：技能施法 / 引导时间映射字典（秒，可选），来自按键绑定 JSON 的 cast_times。
         """
         # 原始图标模板：name -> 图像
         self.icon_templates = icon_templates
         self.key_mapping = key_mapping
         self.threshold_mapping = threshold_mapping or {}  # 技能阈值映射字典
         self.key_presser = KeyPresser(config)
+        # 按键输出：为 None 时交给独立输入线程上的 key_dispatcher；
+        # 回放基准、命令行等场景可替换为任意 callable((shortcut, frame_time))
+        self.key_sink = None
         self.screenshot_delay = config['screenshot_delay']
 
         # HDR 亮度压暗系数（可通过配置控制，范围建议 0.1 - 1.0）
         self.hdr_darkness = float(config.get("hdr_darkness", 0.3))
 
+        # HDR 实现：
+        # - "float"    帧侧原浮点实现（默认）
+        # - "lut"      帧侧查表压缩：更快，但约一半像素与浮点实现相差 ±1，匹配得分会略有变化，需显式开启
+        self.hdr_mode = str(config.get("hdr_mode", "float")).lower()
+
         # 与 GUI 预览使用的 zoom/template_scale 保持一致
         self.zoom = float(config.get("zoom", 1.0))
 
@@ -40,7 +66,7 @@ class ImageMatcher:
             self.threshhold = self.settings.items.get("retail_threshold", 0.5)
         elif version == 'classic':
             self.threshhold = self.settings.items.get("classic_threshold", 0.3)
-        print(self.threshhold)
+        logger.debug("[Matcher Init] 匹配阈值: %s", self.threshhold)
         region_config = config['region']
         self.last_match = None
         self.region = (
@@ -49,21 +75,148 @@ class ImageMatcher:
             region_config['x2'],
             region_config['y2']
         )
+        # 截图后端（rotation_config.yaml 中的 capture.backend），在截图线程内懒加载句柄
+        self.capture_backend = create_capture_backend(config)
         self.running = True
         self.manual_pause = False  # 手动暂停标志
         self.match_callback = None  # Callback function for when icon is matched
-        self.frame_callback = None  # Callback function for previewing each frame
-        self.cast_time_skills = {
-            '20241030222919': 4,
-        }
-        # 预构建模板彩色缓存，匹配方式参考 example/main.py 的模板缓存思路
+        # 每帧的截图 + 匹配结果只计算一次，由 frame_hub 广播给按键决策、预览、录制、遥测等订阅者
+        self.frame_hub = FrameHub()
+        self._frame_callback = None
+        self._frame_callback_subscription = None
+        self._decision_subscription = self.frame_hub.subscribe(self._on_frame_decision, name="decision", order=100)
+        self.cast_time_skills = dict(cast_time_mapping or {})
+        # 预构建模板缓存：BGR 规范化 + 按 zoom 预缩放，只在 zoom 变化或增删图标时失效
         self.template_cache = self._build_template_cache()
-        print(f"[Matcher Init] 加载的模板数量: {len(self.icon_templates)}, 模板名称: {list(self.icon_templates.keys())}", flush=True)
-        print(f"[Matcher Init] 按键映射数量: {len(self.key_mapping)}, 按键映射: {self.key_mapping}", flush=True)
+        # 匹配引擎：
+        # - "template" 逐模板 matchTemplate
+        # - "fft"      批量 FFT 互相关
+        # - "slot"     固定槽位矩阵打分，分数低于 slot_confidence 时回退到完整搜索
+        # - "pyramid"  由粗到细的金字塔匹配（pyramid.levels / pyramid.top_k）
+        self.match_mode = str(config.get("match_mode", "template")).lower()
+        self.batched_matcher = BatchedTemplateMatcher(self.template_cache)
+        self.slot_matcher = SlotTemplateMatcher(
+            self.template_cache, confidence=float(config.get("slot_confidence", 0.6))
+        )
+        pyramid_cfg = config.get("pyramid") or {}
+        self.pyramid_matcher = PyramidTemplateMatcher(
+            self.template_cache,
+            levels=int(pyramid_cfg.get("levels", 1)),
+            top_k=int(pyramid_cfg.get("top_k", 3)),
+        )
+        # 帧变化检测：画面未变化时复用上一帧结果，跳过 HDR 与模板匹配
+        change_cfg = config.get("change_detection") or {}
+        self.change_detector = FrameChangeDetector(
+            threshold=float(change_cfg.get("threshold", 1.0)),
+            enabled=bool(change_cfg.get("enabled", True)),
+        )
+        # 上一次完整匹配的结果：(处理后的截图, best_img_info, best_name, best_score) 及其帧序号
+        self._last_frame_result = None
+        self._last_result_index = -1
+        # 预分配的帧环形缓冲区：截图与 HDR 结果直接写入槽位，下游拿到的是视图
+        self.frame_ring = FrameRingBuffer(int(config.get("frame_buffers", 4)))
+        # 上一次完整匹配所在的槽位（复用结果期间保持引用）与回调期间的当前槽位
+        self._last_slot = None
+        self.current_slot = None
+        # 供截图调度器参考的状态：上一帧是否未变化、游戏窗口是否在前台（None 表示未知）
+        self.last_frame_unchanged = False
+        self.game_focused = None
+        # 单帧匹配耗时（毫秒）：最近一次与滑动平均，用于比较不同匹配引擎
+        self.match_time_ms = 0.0
+        self.match_time_avg_ms = 0.0
+        # 分阶段延迟直方图：capture / hdr / match / focus / skill_action / key_queue / key_press / frame_to_key
+        self.latency_stats = LatencyStats()
+        # 当前正在处理的帧的截图时刻（time.time()），用于计算「截图 → 按键」端到端延迟
+        self._current_frame_time = None
+        # 异步按键分发：按键与随机间隔在输入线程执行，匹配线程不再被阻塞
+        input_cfg = config.get("input") or {}
+        self.key_dispatcher = KeyInputDispatcher(
+            self.key_presser,
+            max_pending=int(input_cfg.get("max_pending", 2)),
+            latency_stats=self.latency_stats,
+        )
+        # 是否要求游戏窗口在前台才按键；回放基准等无界面场景设为 False
+        self.require_focus = True
+        # 前台窗口检测：标题关键字可配置（focus.titles），结果缓存 focus.ttl 秒
+        self.focus_tracker = FocusTracker.from_config(config)
+        # 录制：开启后每帧的原始截图、时间戳与匹配结果由后台线程写入磁盘（rotation_config.yaml 中的 record 段）
+        self.recorder = None
+        record_cfg = config.get("record") or {}
+        if record_cfg.get("enabled", False):
+            self.start_recording(
+                record_cfg.get("path") or self._default_recording_path(), every=int(record_cfg.get("every", 1))
+            )
+        # 遥测：每帧一条二进制事件记录（rotation_config.yaml 中的 telemetry 段）
+        self.telemetry = None
+        # 最近一次匹配的次佳得分与本帧的动作、按键，供遥测记录
+        self.runner_up_score = None
+        self._match_stats = {}
+        self._frame_action = telemetry.ACTION_NONE
+        self._frame_key = None
+        telemetry_cfg = config.get("telemetry") or {}
+        if telemetry_cfg.get("enabled", False):
+            self.start_telemetry(
+                telemetry_cfg.get("path") or self._default_telemetry_path(),
+                max_file_mb=float(telemetry_cfg.get("max_file_mb", 16)),
+                max_files=int(telemetry_cfg.get("max_files", 0)),
+            )
+        logger.info("[Matcher Init] 加载的模板数量: %d, 模板名称: %s", len(self.icon_templates), list(self.icon_templates.keys()))
+        logger.info("[Matcher Init] 按键映射数量: %d, 按键映射: %s", len(self.key_mapping), self.key_mapping)
         # 是否允许在匹配成功时执行按键输入（由 RotationHelper 控制）
         self.enable_keys = True
+        # 运行中的热更新：reconfigure() 登记的修改，由匹配线程在下一帧开始前一次性应用
+        self._pending_changes = {}
+        self._pending_lock = threading.Lock()
+        self.reconfigure_count = 0
 
-    def _apply_hdr_correction(self, frame_bgr):
+    @staticmethod
+    def _default_recording_path():
+        return os.path.join("recordings", datetime.now().strftime("%Y%m%d_%H%M%S"))
+
+    def start_recording(self, path=None, max_pending=64, every=1):
+        """开始录制到 path 目录（默认 recordings/<时间戳>），每 every 帧录一帧；已在录制时先结束旧录制。"""
+        self.stop_recording()
+        path = path or self._default_recording_path()
+        self.recorder = FrameRecorder(path, max_pending=max_pending)
+        self._recorder_subscription = self.frame_hub.subscribe(self._record_frame, every=every, name="recorder")
+        logger.info("[Recorder] 开始录制到 %s", path)
+        return path
+
+    def stop_recording(self):
+        """结束录制，等待后台线程写完剩余帧。"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            self._recorder_subscription.unsubscribe()
+            recorder.close()
+
+    @staticmethod
+    def _default_telemetry_path():
+        return os.path.join("telemetry", datetime.now().strftime("%Y%m%d_%H%M%S"))
+
+    def start_telemetry(self, path=None, max_file_mb=16.0, max_files=0):
+        """开始写遥测到 path 目录（默认 telemetry/<时间戳>），已在写时先结束旧会话。"""
+        self.stop_telemetry()
+        path = path or self._default_telemetry_path()
+        self.telemetry = telemetry.TelemetryWriter(path, max_file_mb=max_file_mb, max_files=max_files)
+        # 在按键决策之后接收，才能记录本帧实际采取的动作
+        self._telemetry_subscription = self.frame_hub.subscribe(self._emit_telemetry, name="telemetry", order=200)
+        logger.info("[Telemetry] 开始写入遥测到 %s", path)
+        return path
+
+    def stop_telemetry(self):
+        """结束遥测，等待后台线程写完剩余记录。"""
+        writer, self.telemetry = self.telemetry, None
+        if writer is not None:
+            self._telemetry_subscription.unsubscribe()
+            writer.close()
+
+    def close(self):
+        """结束录制与遥测并停止输入线程，引擎退出时调用。"""
+        self.stop_recording()
+        self.stop_telemetry()
+        self.key_dispatcher.stop()
+
+    def _apply_hdr_correction(self, frame_bgr, out=None):
         """
         针对开启 HDR 时截图偏亮的问题，对截图做「色调映射」而不是简单整体变暗。
 
@@ -82,42 +235,98 @@ class ImageMatcher:
         亮度压暗系数从配置中的 `hdr_darkness` 读取，默认 0.3。
         """
         # 直接委托给公共封装，确保与其他模块（如 CapturePage、ClassPage 预览）保持一致
-        return TemplateMatcher.apply_hdr_correction(frame_bgr, dark_factor=self.hdr_darkness)
+        if self.hdr_mode == "lut":
+            return TemplateMatcher.apply_hdr_correction_lut(frame_bgr, dark_factor=self.hdr_darkness, out=out)
+        return TemplateMatcher.apply_hdr_correction(frame_bgr, dark_factor=self.hdr_darkness, out=out)
 
     def _build_template_cache(self):
         """
-        将所有图标模板预处理为彩色图并缓存，供匹配阶段直接使用。
+        将所有图标模板规范化为 BGR 并按当前 zoom 预缩放，构建持久的模板缓存。
 
-        （保留旧逻辑以兼容，但实际匹配将使用灰度+缩放公共函数）
+        每帧匹配直接使用缓存中的模板，不再重复做颜色转换和 resize。
         """
-        cache = {}
-        for name, icon_template in self.icon_templates.items():
+        return TemplateCache(self.icon_templates, scale=self.zoom)
+
+    def set_zoom(self, zoom):
+        """更新模板缩放倍率，仅在倍率变化时重建模板缓存。"""
+        self.zoom = float(zoom)
+        self.template_cache.set_scale(self.zoom)
+
+    def add_icon_template(self, name, icon_template):
+        """新增（或替换）一个图标模板，只重建该模板的缓存项。"""
+        self.icon_templates[name] = icon_template
+        self.template_cache.add_template(name, icon_template)
+
+    def remove_icon_template(self, name):
+        """删除一个图标模板及其缓存项。"""
+        self.icon_templates.pop(name, None)
+        self.template_cache.remove_template(name)
+
+    def reconfigure(self, key_mapping=None, threshold_mapping=None, cast_time_mapping=None,
+                    zoom=None, hdr_darkness=None, region=None, templates=None):
+        """
+        在引擎运行中修改匹配参数，不停止线程、不重建 ImageMatcher（可在任意线程调用）。
+
+        修改先登记下来，由匹配线程在下一帧开始前一次性应用：同一帧不会看到一半旧、一半新的设置，
+        匹配也不会中断。只有受影响的模板会重新计算：zoom 变化时重建缩放模板，
+        templates 只处理其中列出的模板。多次调用在应用前会合并，后登记的值覆盖先登记的值。
+
+        参数（None 表示不修改）：
+        - key_mapping / threshold_mapping / cast_time_mapping: 新的按键 / 阈值 / 施法时间映射（整体替换）
+        - zoom: 模板缩放倍率
+        - hdr_darkness: HDR 压暗系数
+        - region: 截图区域 (x1, y1, x2, y2)
+        - templates: {name: 图像}，图像为 None 表示删除该模板
+        """
+        changes = {
+            "key_mapping": key_mapping,
+            "threshold_mapping": threshold_mapping,
+            "cast_time_mapping": cast_time_mapping,
+            "zoom": zoom,
+            "hdr_darkness": hdr_darkness,
+            "region": region,
+        }
+        with self._pending_lock:
+            for name, value in changes.items():
+                if value is not None:
+                    self._pending_changes[name] = value
+            if templates:
+                self._pending_changes.setdefault("templates", {}).update(templates)
+
+    def _apply_pending_changes(self):
+        """应用 reconfigure() 登记的修改（匹配线程在每帧开始前调用，没有修改时几乎无开销）。"""
+        if not self._pending_changes:
+            return
+        with self._pending_lock:
+            changes, self._pending_changes = self._pending_changes, {}
+        start = time.perf_counter()
+        if "key_mapping" in changes:
+            self.key_mapping = dict(changes["key_mapping"])
+        if "threshold_mapping" in changes:
+            self.threshold_mapping = dict(changes["threshold_mapping"])
+        if "cast_time_mapping" in changes:
+            self.cast_time_skills = dict(changes["cast_time_mapping"])
+        if "region" in changes:
+            self.region = tuple(int(v) for v in changes["region"])
+        if "hdr_darkness" in changes:
+            # 帧侧 HDR 每帧读取系数（查表模式按系数缓存查找表），模板不受影响
+            self.hdr_darkness = float(changes["hdr_darkness"])
+        if "zoom" in changes:
+            self.set_zoom(changes["zoom"])
+        for name, icon_template in changes.get("templates", {}).items():
             if icon_template is None:
-                continue
-            try:
-                # 统一为 BGR 彩色图像
-                if len(icon_template.shape) == 3:
-                    # 可能是 BGR 或 BGRA，这里强制转为 BGR
-                    if icon_template.shape[2] == 4:
-                        tmpl_color = cv2.cvtColor(icon_template, cv2.COLOR_BGRA2BGR)
-                    else:
-                        tmpl_color = icon_template.copy()
-                elif len(icon_template.shape) == 2:
-                    # 灰度模板转为 BGR
-                    tmpl_color = cv2.cvtColor(icon_template, cv2.COLOR_GRAY2BGR)
-                else:
-                    continue
-                h, w = tmpl_color.shape[:2]
-                if h == 0 or w == 0:
-                    continue
-                cache[name] = {
-                    "tmpl_color": tmpl_color,
-                    "height": h,
-                    "width": w,
-                }
-            except Exception as e:
-                print(f"构建模板缓存时出错 {name}: {e}", flush=True)
-        return cache
+                self.remove_icon_template(name)
+            else:
+                self.add_icon_template(name, icon_template)
+        if changes.keys() & {"region", "hdr_darkness", "zoom", "templates"}:
+            # 截图或模板变了，上一帧的匹配结果不能再复用
+            self.change_detector.reset()
+            self._last_frame_result = None
+            self.last_match = None
+        self.reconfigure_count += 1
+        logger.info(
+            "[Matcher] 已热更新: %s（%.1fms）", ", ".join(sorted(changes)), (time.perf_counter() - start) * 1000.0
+        )
 
     @staticmethod
     def match_best_icon_with_scale(frame_bgr, templates_dict, scale):
@@ -135,6 +344,30 @@ class ImageMatcher:
         """Set callback for per-frame preview (screenshot + best match info)."""
         self.frame_callback = callback
 
+    @property
+    def frame_callback(self):
+        return self._frame_callback
+
+    @frame_callback.setter
+    def frame_callback(self, callback):
+        """
+        兼容旧接口的逐帧回调 callback(screenshot, best_img_info, best_name, best_score)，
+        作为 frame_hub 的一个订阅者；新代码可直接 `frame_hub.subscribe` 并自选抽样频率。
+        """
+        if self._frame_callback_subscription is not None:
+            self._frame_callback_subscription.unsubscribe()
+            self._frame_callback_subscription = None
+        self._frame_callback = callback
+        if callback is not None:
+            self._frame_callback_subscription = self.frame_hub.subscribe(
+                self._call_frame_callback, name="frame_callback"
+            )
+
+    def _call_frame_callback(self, event):
+        callback = self._frame_callback
+        if callback is not None and event.frame is not None:
+            callback(event.frame, event.best_img_info, event.best_name, event.best_score)
+
     def is_cast_time_skill(self, key):
         """
         判断技能是否有施法时间。
@@ -168,28 +401,58 @@ class ImageMatcher:
             return resized_template
         return template
 
-    def take_screenshot(self):
+    def grab_frame(self):
         """
-        截取屏幕的指定区域，并将图像从 RGB 转换为 BGR。
+        截取屏幕的指定区域，返回未经 HDR 处理的 BGR 图像。
         与 preview 模式的截图方式完全一致：不检查窗口标题，直接截图。
         """
         try:
-            # 直接截图，不检查窗口标题（与 preview_current_region 保持一致）
-            screenshot = ImageGrab.grab(bbox=self.region)
-            if screenshot is None:
-                return None
-            screenshot_np = np.array(screenshot)  # 这是 RGB 格式的图像 (HDR 显示下可能偏亮)
-            if screenshot_np.size == 0:
+            # 直接截图，不检查窗口标题（GUI 预览也使用这里的截图）
+            screenshot_bgr = self.capture_backend.grab(self.region)
+            if screenshot_bgr is None or screenshot_bgr.size == 0:
                 return None
-            # 将图像从 RGB 转换为 BGR
-            screenshot_bgr = cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR)
+            return screenshot_bgr
+        except Exception as e:
+            logger.warning("Failed to take screenshot: %s", e)
+            return None
 
-            # 针对 HDR 做一次亮度压缩，避免画面过亮影响匹配
-            screenshot_bgr = self._apply_hdr_correction(screenshot_bgr)
-            return screenshot_bgr  # 返回 BGR 格式的图像
+    def _capture_into_slot(self):
+        """
+        从环形缓冲区取一个槽位并把截图写入其中。
+
+        返回：
+        - (slot, raw_frame)；截图失败时返回 (None, None)，且槽位已释放
+        """
+        x1, y1, x2, y2 = self.region
+        slot = self.frame_ring.acquire((y2 - y1, x2 - x1, 3))
+        capture_start = time.perf_counter()
+        try:
+            raw_frame = self.capture_backend.grab_into(self.region, slot.raw)
         except Exception as e:
-            print(f"Failed to take screenshot: {e}", flush=True)
+            logger.warning("Failed to take screenshot: %s", e)
+            raw_frame = None
+        self.latency_stats.record("capture", (time.perf_counter() - capture_start) * 1000.0)
+        if raw_frame is None or raw_frame.size == 0:
+            slot.release()
+            return None, None
+        slot.timestamp = time.time()
+        return slot, raw_frame
+
+    def _set_last_slot(self, slot):
+        """把当前槽位设为「上一次完整匹配」槽位，并释放旧槽位的引用。"""
+        if self._last_slot is not None and self._last_slot is not slot:
+            self._last_slot.release()
+        self._last_slot = slot
+
+    def take_screenshot(self):
+        """
+        截取屏幕的指定区域，并针对 HDR 做一次亮度压缩，返回 BGR 图像。
+        """
+        screenshot_bgr = self.grab_frame()
+        if screenshot_bgr is None:
             return None
+        # 针对 HDR 做一次亮度压缩，避免画面过亮影响匹配
+        return self._apply_hdr_correction(screenshot_bgr)
 
     def show_comparison(self, screenshot_color, template_color, template_name, match_value, top_left):
         """
@@ -240,9 +503,11 @@ class ImageMatcher:
         参数：
         - match_result: 一个元组 (best_match, best_match_value)
         """
-        active_window = gw.getActiveWindow()
-        
-        if active_window and "魔兽世界" in active_window.title:
+        self.check_focus()
+        if not self.game_focused:
+            self._frame_action = telemetry.ACTION_UNFOCUSED
+
+        if self.game_focused:
             if match_result is not None:
                 best_match, score = match_result
 
@@ -260,19 +525,29 @@ class ImageMatcher:
                 # 达到对应阈值才执行后续逻辑
                 if score > effective_threshold:
                     if isinstance(best_match, str):
-                        if best_match in self.key_mapping:
-                            shortcut = self.key_mapping.get(best_match, '未知按键')
-                            if self.enable_keys:
-                                # 运行模式：真正执行按键
-                                print(f"[Match Result] 按下 {shortcut} ({best_match})", flush=True)
-                                self.process_skill_action(best_match, score)
-                            else:
-                                # 预览模式：只通知 GUI 高亮，不执行按键
-                                if self.last_match != best_match:
-                                    self.last_match = best_match
-                                    if self.match_callback:
-                                        self.match_callback(best_match)
-
+                        if self.enable_keys:
+                            # 运行模式：只有绑定了按键的技能才真正执行按键
+                            if best_match in self.key_mapping:
+                                logger.debug("[Match Result] 按下 %s (%s)", self.key_mapping[best_match], best_match)
+                                with self.latency_stats.measure("skill_action"):
+                                    self.process_skill_action(best_match, score)
+                        else:
+                            # 预览模式：只通知 GUI 高亮，不执行按键（未绑定的技能同样高亮）
+                            self._frame_action = telemetry.ACTION_PREVIEW
+                            if self.last_match != best_match:
+                                self.last_match = best_match
+                                if self.match_callback:
+                                    self.match_callback(best_match)
+
+
+    def check_focus(self):
+        """刷新并返回 game_focused（缓存的前台窗口检测；require_focus 为 False 时恒为 True）。"""
+        if self.require_focus:
+            with self.latency_stats.measure("focus"):
+                self.game_focused = self.focus_tracker.is_focused()
+        else:
+            self.game_focused = True
+        return self.game_focused
 
     def process_skill_action(self, best_match, score):
         """
@@ -291,10 +566,17 @@ class ImageMatcher:
             if self.match_callback:
                 self.match_callback(best_match)
 
-        if needs_cast_time:
-            self.execute_skill_with_cast(shortcut, cast_time, best_match)
+        # 施法技能交给输入线程的定时器调度，匹配线程不等待施法结束
+        self._dispatch_key(shortcut, cast_time if needs_cast_time else 0.0)
+
+    def _dispatch_key(self, shortcut, cast_time=0.0):
+        """把按键交给当前的按键输出（key_sink 或异步分发器），附带当前帧的截图时刻与施法时间。"""
+        self._frame_action = telemetry.ACTION_CAST if cast_time > 0 else telemetry.ACTION_KEY
+        self._frame_key = shortcut
+        if self.key_sink is not None:
+            self.key_sink((shortcut, self._current_frame_time, cast_time))
         else:
-            self.key_presser.press_key(shortcut)
+            self.key_dispatcher.submit(shortcut, self._current_frame_time, cast_time)
 
     def get_skill_info(self, icon_name):
         """
@@ -309,23 +591,6 @@ class ImageMatcher:
         shortcut = self.key_mapping.get(icon_name, '未知按键')
         return shortcut
 
-    def execute_skill_with_cast(self, shortcut, cast_time):
-        """
-        执行有施法时间的技能。
-
-        参数：
-        - shortcut：技能快捷键。
-        - cast_time：施法时间。
-        - icon_name：技能图标名称。
-        """
-        start_time = time.time()
-        end_time = start_time + cast_time
-
-        while time.time() < end_time:
-            remaining_time = end_time - time.time()
-            if remaining_time + 1 > 1.0:
-                self.key_presser.press_key(shortcut)
-
     def log_skill_usage(self, icon_name, shortcut, score):
         """
         记录技能使用日志。
@@ -335,8 +600,7 @@ class ImageMatcher:
         - shortcut：技能快捷键。
         - score：匹配得分。
         """
-        print(f"{time.strftime('%H:%M:%S')} 按下“{shortcut}” 使用“{icon_name}”，匹配得分 {score:.2f}", flush=True)
-        print("-----------------------", flush=True)
+        logger.info("按下“%s” 使用“%s”，匹配得分 %.2f", shortcut, icon_name, score)
 
     def _match_templates_on_frame(self, screenshot):
         """
@@ -354,17 +618,30 @@ class ImageMatcher:
             else:
                 return None, None, -1.0
         except Exception as e:
-            print(f"转换截图为 BGR 图时出错: {e}", flush=True)
+            logger.error("转换截图为 BGR 图时出错: %s", e)
             return None, None, -1.0
 
-        # 使用公共匹配逻辑（与预览共用），模板来源于 icon_templates
-        normalized_templates = self._normalize_templates_to_bgr()
-        if len(normalized_templates) == 0:
+        # 使用公共匹配逻辑（与预览共用），模板来源于预缩放的模板缓存
+        if len(self.template_cache) == 0:
             return None, None, -1.0
-        
-        best_name, best_img_info, best_score = self.match_best_icon_with_scale(
-            frame_bgr, normalized_templates, self.zoom
-        )
+
+        match_stats = self._match_stats
+        match_stats.clear()
+        match_start = time.perf_counter()
+        if self.match_mode == "fft":
+            best_name, best_img_info, best_score = self.batched_matcher.match_best(frame_bgr, match_stats)
+        elif self.match_mode == "slot":
+            best_name, best_img_info, best_score = self.slot_matcher.match_best(frame_bgr, match_stats)
+        elif self.match_mode == "pyramid":
+            best_name, best_img_info, best_score = self.pyramid_matcher.match_best(frame_bgr, match_stats)
+        else:
+            best_name, best_img_info, best_score = TemplateMatcher.match_best_icon_cached(
+                frame_bgr, self.template_cache, match_stats
+            )
+        match_ms = (time.perf_counter() - match_start) * 1000.0
+        self.runner_up_score = match_stats.get("runner_up")
+        self._record_match_time(match_ms)
+        self.latency_stats.record("match", match_ms)
         
         # 处理 match_best_icon_with_scale 可能返回 None, None, None 的情况
         if best_name is None and best_img_info is None and best_score is None:
@@ -373,57 +650,115 @@ class ImageMatcher:
         # 返回名称、模板信息与得分
         return best_name, best_img_info, best_score
 
-    def _normalize_templates_to_bgr(self):
-        """
-        将传入的 icon_templates 统一转换为 BGR 图像，供公共匹配函数使用。
-        """
-        normalized = {}
-        for name, icon_template in self.icon_templates.items():
-            if icon_template is None:
-                continue
-            try:
-                img = icon_template
-                if len(img.shape) == 3:
-                    if img.shape[2] == 4:
-                        img_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-                    else:
-                        img_bgr = img
-                elif len(img.shape) == 2:
-                    img_bgr = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-                else:
-                    continue
-                if img_bgr.size == 0:
-                    continue
-                normalized[name] = img_bgr
-            except Exception as e:
-                print(f"[DEBUG] 规范化模板 {name} 为 BGR 时出错: {e}", flush=True)
-        return normalized
+    @property
+    def skipped_frames(self):
+        """因画面未变化而跳过匹配的帧数。"""
+        return self.change_detector.skipped
+
+    @property
+    def skip_rate(self):
+        """因画面未变化而跳过匹配的帧占比（0.0 - 1.0）。"""
+        return self.change_detector.skip_rate
+
+    def _record_match_time(self, elapsed_ms):
+        """记录单帧匹配耗时（最近一次 + 指数滑动平均）。"""
+        self.match_time_ms = elapsed_ms
+        if self.match_time_avg_ms <= 0.0:
+            self.match_time_avg_ms = elapsed_ms
+        else:
+            self.match_time_avg_ms = 0.9 * self.match_time_avg_ms + 0.1 * elapsed_ms
+
+    def _record_frame(self, event):
+        """录制订阅者：登记本帧原始截图与匹配结果（录制器内部会拷贝截图）。"""
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(event.raw, event.timestamp, event.best_name, event.best_score)
+
+    def _emit_telemetry(self, event):
+        """遥测订阅者：在按键决策之后登记本帧的匹配结果、各阶段耗时与动作。"""
+        writer = self.telemetry
+        if writer is not None:
+            writer.emit(
+                event.timestamp, event.best_name, event.best_score, self.runner_up_score,
+                self.latency_stats.last, self._frame_action, self._frame_key, event.unchanged,
+            )
+
+    def _on_frame_decision(self, event):
+        """按键决策订阅者（每帧都接收，在预览与录制之后执行）。"""
+        if event.best_name is not None:
+            logger.debug(
+                "[Match Debug] 匹配到技能: %s, 得分: %.3f, enable_keys: %s, 匹配耗时(%s): %.2fms (平均 %.2fms), 跳过率: %.0f%%",
+                event.best_name, event.best_score, self.enable_keys, self.match_mode,
+                self.match_time_ms, self.match_time_avg_ms, self.skip_rate * 100,
+            )
+        self.handler_result((event.best_name, event.best_score))
 
     def match_images(self):
         """
         主图像匹配流程。
         """
-        screenshot = self.take_screenshot()
-        if screenshot is None:
+        slot, raw_frame = self._capture_into_slot()
+        if slot is None:
             return
-        
-        try:
-            # 使用新的彩色匹配逻辑，而不是旧的缩放匹配
-            best_name, best_img_info, best_score = self._match_templates_on_frame(screenshot)
-
-            # 先触发预览回调（如果有）：让 GUI 使用同一份截图与匹配结果进行展示
-            if self.frame_callback is not None and screenshot is not None:
-                try:
-                    self.frame_callback(screenshot, best_img_info, best_name, best_score)
-                except Exception as cb_err:
-                    print(f"[DEBUG] 预览回调执行出错: {cb_err}", flush=True)
-
-            # 再执行按键处理逻辑（只关心名称和得分）
-            match_result = (best_name, best_score)
-            if best_name is not None:
-                print(f"[Match Debug] 匹配到技能: {best_name}, 得分: {best_score:.3f}, enable_keys: {self.enable_keys}", flush=True)
-            self.handler_result(match_result)
-        except Exception as e:
-            print(f"匹配过程中出错: {e}", flush=True)
+        self.process_frame(slot, raw_frame)
 
+    def process_frame(self, slot, raw_frame):
+        """
+        对一帧已截取的图像执行：变化检测 → HDR → 模板匹配，再把结果广播给 frame_hub 的订阅者
+        （预览 / 录制 → 按键决策 → 遥测）。
 
+        参数：
+        - slot: `_capture_into_slot` 返回的槽位，本方法消耗其一次引用
+        - raw_frame: 槽位中（或后端返回的）原始 BGR 截图
+        """
+        self._apply_pending_changes()
+        self._current_frame_time = slot.timestamp
+        self.latency_stats.tick_frame()
+        self._frame_action = telemetry.ACTION_NONE
+        self._frame_key = None
+        if self.telemetry is not None:
+            # 未执行的阶段不应沿用上一帧的计时
+            for stage in ("hdr", "match", "focus"):
+                self.latency_stats.last.pop(stage, None)
+        release_after = None
+        index = self.frame_hub.next_index()
+        try:
+            unchanged = self.change_detector.is_unchanged(raw_frame)
+            self.last_frame_unchanged = unchanged
+            if unchanged and self._last_frame_result is not None:
+                # 画面未变化：直接复用上一帧的 HDR 结果与匹配结果；
+                # 本帧槽位在广播结束后归还（录制订阅者仍要读取其中的原始截图）
+                screenshot, best_img_info, best_name, best_score = self._last_frame_result
+                release_after = slot
+                slot = self._last_slot
+            else:
+                # 针对 HDR 做一次亮度压缩，结果直接写入槽位的 processed 缓冲区
+                processed_out = slot.processed if raw_frame.shape == slot.processed.shape else None
+                with self.latency_stats.measure("hdr"):
+                    screenshot = self._apply_hdr_correction(raw_frame, out=processed_out)
+                # 使用新的彩色匹配逻辑，而不是旧的缩放匹配
+                best_name, best_img_info, best_score = self._match_templates_on_frame(screenshot)
+                self._last_frame_result = (screenshot, best_img_info, best_name, best_score)
+                self._last_result_index = index
+                # 本帧槽位转为「上一次结果」持有，旧槽位释放后可被复用
+                self._set_last_slot(slot)
+
+            # 广播给所有订阅者：截图与匹配每帧只做一次，预览、录制不再重复截图或匹配。
+            # event.frame / event.raw 是槽位内数组的视图：订阅者若需在返回后继续使用，
+            # 应自行拷贝，或调用 `matcher.current_slot.retain()`，用完后 `release()`。
+            event = FrameEvent(
+                screenshot, raw_frame, best_img_info, best_name, best_score,
+                self._current_frame_time, unchanged, index, self._last_result_index,
+            )
+            self.current_slot = slot
+            try:
+                self.frame_hub.publish(event)
+            finally:
+                self.current_slot = None
+        except Exception as e:
+            logger.error("匹配过程中出错: %s", e)
+            if slot is not self._last_slot:
+                slot.release()
+        finally:
+            if release_after is not None:
+                release_after.release()
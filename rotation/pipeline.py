@@ -0,0 +1,167 @@
+import threading
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+class LatestValueQueue:
+    """
+    容量为 1 的「最新值」队列：
+
+    - `put` 从不阻塞：已有未取走的旧值时直接覆盖，并通过 `on_drop` 通知调用方释放旧值；
+    - `get` 阻塞等待新值，超时或队列关闭时返回 (False, None)。
+
+    消费者因此总是处理最新的数据，生产者也不会被慢消费者拖住。
+    """
+
+    def __init__(self, on_drop=None):
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._closed:
+                dropped, has_dropped = item, True
+            else:
+                dropped, has_dropped = self._item, self._has_item
+                if has_dropped:
+                    self.dropped += 1
+                self._item = item
+                self._has_item = True
+                self._cond.notify()
+        if has_dropped and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._has_item and not self._closed:
+                self._cond.wait(timeout)
+            if not self._has_item:
+                return False, None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return True, item
+
+    def close(self):
+        """关闭队列并唤醒等待者；残留的值通过 `on_drop` 释放。"""
+        with self._cond:
+            self._closed = True
+            dropped, has_dropped = self._item, self._has_item
+            self._item = None
+            self._has_item = False
+            self._cond.notify_all()
+        if has_dropped and self.on_drop is not None:
+            self.on_drop(dropped)
+
+
+class RotationPipeline:
+    """
+    分阶段的轮转引擎：截图、匹配、按键三个阶段各自运行。
+
+    - 截图线程：按调度器节奏截图写入帧槽位，放入最新值帧队列（旧帧被覆盖时立即释放槽位）；
+    - 匹配阶段：运行在调用 `run` 的线程（即 RotationThread）中，总是处理最新一帧；
+    - 按键阶段：由 matcher.key_dispatcher 的输入线程执行按键及其随机延迟，不阻塞截图与匹配；
+      该线程在第一次按键时才启动。
+
+    `run` 会阻塞直到 `stop` 被调用，因此 RotationThread 的信号语义保持不变。
+    每个实例只运行一次：在 `run` 之前调用的 `stop` 同样生效，`run` 会立即返回。
+    """
+
+    def __init__(self, matcher, scheduler, before_frame=None, after_frame=None):
+        """
+        参数：
+        - matcher: ImageMatcher 实例
+        - scheduler: FrameScheduler，决定截图节奏
+        - before_frame: 每帧匹配前调用的钩子（例如刷新热键状态）
+        - after_frame: 每帧匹配后调用的钩子（例如定期上报延迟统计）
+        """
+        self.matcher = matcher
+        self.scheduler = scheduler
+        self.before_frame = before_frame
+        self.after_frame = after_frame
+        self.frame_queue = LatestValueQueue(on_drop=lambda item: item[0].release())
+        self._stop_event = threading.Event()
+        self._threads = []
+        self.frames_captured = 0
+        self.frames_matched = 0
+
+    def _capture_loop(self):
+        while not self._stop_event.is_set():
+            self.scheduler.begin_frame()
+            if self.scheduler.paused:
+                # 游戏在后台：不截图，只按暂停间隔检查前台窗口
+                self.scheduler.update(focused=self.matcher.check_focus())
+                if self.scheduler.paused:
+                    self.scheduler.wait(self._stop_event)
+                    continue
+            slot, raw_frame = self.matcher._capture_into_slot()
+            if slot is not None:
+                self.frames_captured += 1
+                self.frame_queue.put((slot, raw_frame))
+            self.scheduler.wait(self._stop_event)
+
+    def _match_loop(self):
+        while not self._stop_event.is_set():
+            ok, item = self.frame_queue.get(timeout=0.1)
+            if not ok:
+                continue
+            slot, raw_frame = item
+            if self.before_frame is not None:
+                try:
+                    self.before_frame()
+                except Exception as e:
+                    logger.error("[Pipeline] 帧前钩子执行出错: %s", e)
+            self.matcher.process_frame(slot, raw_frame)
+            self.frames_matched += 1
+            self.scheduler.update(
+                hotkey_held=self.matcher.enable_keys,
+                focused=self.matcher.game_focused,
+                unchanged=self.matcher.last_frame_unchanged,
+            )
+            if self.after_frame is not None:
+                try:
+                    self.after_frame()
+                except Exception as e:
+                    logger.error("[Pipeline] 帧后钩子执行出错: %s", e)
+
+    def run(self):
+        """启动截图与按键线程，并在当前线程运行匹配阶段，直到 `stop`。"""
+        # 不在这里清除 _stop_event：否则 run 之前到达的 stop 会被抹掉，线程永远不退出
+        if self._stop_event.is_set():
+            return
+        # 输入线程在第一次提交按键时才启动（KeyInputDispatcher.submit），预览模式不会创建它
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="rotation-capture", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        try:
+            self._match_loop()
+        finally:
+            self._stop_event.set()
+            self.frame_queue.close()
+            for thread in self._threads:
+                thread.join(timeout=1.0)
+            self._threads = []
+
+    def stop(self):
+        """请求所有阶段结束。"""
+        self._stop_event.set()
+        self.scheduler.wake()
+
+    def stats(self):
+        """各阶段计数与因覆盖而丢弃的帧 / 按键数量。"""
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_matched": self.frames_matched,
+            "frames_dropped": self.frame_queue.dropped,
+            "keys": self.matcher.key_dispatcher.stats(),
+            "subscribers": self.matcher.frame_hub.stats(),
+            "latency": self.matcher.latency_stats.snapshot(),
+            "scheduler": self.scheduler.stats(),
+        }
@@ -0,0 +1,72 @@
+import threading
+from collections import namedtuple
+import numpy as np
+
+
+# 一帧预览：GUI 只负责绘制，所有字段在引擎线程中准备好
+# - image:  HDR 处理后的区域截图（BGR，独立拷贝，不引用帧环形缓冲区；只读，画面未变化的帧共用同一数组）
+# - box:    最佳匹配在 image 中的位置 (x, y, w, h)，无匹配时为 None
+# - icon:   最佳匹配的模板图像（BGR），无匹配时为 None
+# - region: 截图区域 (x1, y1, x2, y2)
+PreviewFrame = namedtuple(
+    "PreviewFrame", ["image", "best_name", "best_score", "box", "icon", "region", "timestamp"]
+)
+
+
+class PreviewThrottle:
+    """
+    引擎侧的预览帧出口，作为 `ImageMatcher.frame_hub` 的订阅者使用：
+
+    - 订阅时用 max_fps（显示器刷新率）抽样，更快的帧由 FrameHub 直接跳过，不做拷贝；
+    - 只保留一帧待绘制的预览：GUI 还没取走上一帧时，新帧覆盖旧帧，并且不再重复通知，
+      界面落后时丢弃的是过时的画面，而不是让引擎或信号队列堆积；
+    - on_ready() 在引擎线程中调用（通常是发射一个 Qt 信号），GUI 收到后调用 `take()` 取帧。
+    """
+
+    def __init__(self, matcher, on_ready):
+        self.matcher = matcher
+        self.on_ready = on_ready
+        self._lock = threading.Lock()
+        self._pending = None
+        # 上一次拷贝的截图及其来源帧：画面未变化时直接复用，不再拷贝，GUI 端的缩放缓存也随之命中
+        self._last_image = None
+        self._last_source_index = None
+        self.produced = 0
+        self.dropped = 0
+
+    def __call__(self, event):
+        if event.frame is None:
+            return
+        box = icon = None
+        if event.best_img_info is not None:
+            icon, (x, y), (w, h) = event.best_img_info
+            box = (int(x), int(y), int(w), int(h))
+        if event.source_index == self._last_source_index and self._last_image is not None:
+            image = self._last_image
+        else:
+            image = np.ascontiguousarray(event.frame).copy()
+            self._last_image = image
+            self._last_source_index = event.source_index
+        frame = PreviewFrame(
+            image=image,
+            best_name=event.best_name,
+            best_score=event.best_score,
+            box=box,
+            icon=icon,
+            region=tuple(self.matcher.region),
+            timestamp=event.timestamp,
+        )
+        with self._lock:
+            behind = self._pending is not None
+            if behind:
+                self.dropped += 1
+            self._pending = frame
+            self.produced += 1
+        if not behind:
+            self.on_ready()
+
+    def take(self):
+        """取走最新的一帧预览（GUI 线程调用），没有新帧时返回 None。"""
+        with self._lock:
+            frame, self._pending = self._pending, None
+        return frame
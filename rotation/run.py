@@ -1,60 +1,177 @@
-import keyboard
 import os
 import time
-import yaml
+from .config_store import get_config_store, with_overrides
 from .icon_loader import SkillIconLoader
+from .frame_scheduler import FrameScheduler
+from .hotkey import HotkeyState
+from .log import get_logger, setup_logging
 from .matcher import ImageMatcher
+from .pipeline import RotationPipeline
+from .preview import PreviewThrottle
 from .user_key_binding import UserKeyBindLoader
 
+logger = get_logger(__name__)
+
 
 class RotationHelper:
-    def __init__(self, class_name, talent_name, config_file='rotation_config.yaml', keybind_file='config.json', game_version='retail'):
+    def __init__(self, class_name, talent_name, config_file='rotation_config.yaml', keybind_file='config.json', game_version='retail',
+                 hotkey_source=None):
         self.game_version = game_version
         self.config_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), config_file)
-        self.rotation_config = self._load_rotation_config(self.config_file_path)
+        # 进程内共享的配置缓存：文件未变化时不再重新解析，得到的是只读快照
+        self.config_store = get_config_store(self.config_file_path)
+        self.rotation_config = self.config_store.snapshot()
+        # 日志级别（rotation_config.yaml 中的 logging 段）
+        setup_logging(self.rotation_config)
 
+        self.keybind_file = keybind_file
         self.user_key_bind_loader = UserKeyBindLoader(keybind_file)
         self.binded_abilities = self.user_key_bind_loader.binded_abilities()
         self.key_mapping = self.user_key_bind_loader.get_skill_key_mapping()
         self.threshold_mapping = self.user_key_bind_loader.get_skill_threshold_mapping()
+        self.cast_time_mapping = self.user_key_bind_loader.get_skill_cast_time_mapping()
         
         # 从配置JSON文件中读取zoom值（与preview模式保持一致）
         # 如果配置JSON中有zoom字段，优先使用它；否则使用rotation_config.yaml中的zoom
-        config_json_zoom = self.user_key_bind_loader.get_zoom_from_config()
-        if config_json_zoom is not None:
-            self.rotation_config['zoom'] = config_json_zoom
-            print(f"[RotationHelper] 从配置JSON中读取zoom: {config_json_zoom}", flush=True)
+        self._json_zoom = self.user_key_bind_loader.get_zoom_from_config()
+        if self._json_zoom is not None:
+            self.rotation_config = with_overrides(self.rotation_config, zoom=self._json_zoom)
+            logger.info("[RotationHelper] 从配置JSON中读取zoom: %s", self._json_zoom)
 
         self.icon_loader = SkillIconLoader(class_name, talent_name, self.binded_abilities, game_version=self.game_version)
         self.images = self.icon_loader.get_images()
+        # 预览模式额外匹配的未绑定技能图标（首次进入预览时才解码，只高亮、不按键）
+        self._preview_images = None
 
-        self.matcher = ImageMatcher(self.images, self.key_mapping, self.rotation_config, self.game_version, self.threshold_mapping)
+        # 匹配器持有模板字典的副本：热更新时由匹配线程增删，不与这里的 images 互相影响
+        self.matcher = ImageMatcher(
+            dict(self.images), self.key_mapping, self.rotation_config, self.game_version,
+            self.threshold_mapping, self.cast_time_mapping,
+        )
+        # rotation_config.yaml 中 region / zoom / hdr_darkness 变化时热更新到匹配器
+        self._config_unsubscribe = self.config_store.subscribe(
+            self._on_rotation_config_changed, keys=("hdr_darkness", "region", "zoom")
+        )
 
         # 循环与模式控制：
         # - is_running 为 False 时主循环结束
         # - mode: "preview" 只做匹配与预览，不按键；"run" 在热键按下时会按键
         self.is_running = True
         self.mode = "run"
+        self._started = False
         self.match_callback = None  # Callback function for when icon is matched
+        # 预览：由引擎线程按显示刷新率产出预览帧，GUI 只负责绘制（见 set_preview_callback）
+        self.preview = None
+        self._preview_subscription = None
 
-    def _load_rotation_config(self, config_file):
-        default_set = {
-            'delay': {'min': 0.069, 'max': 0.160},
-            'screenshot_delay': 0.3,
-            'region': {'x': 0, 'y': 0, 'width': 80, 'height': 200},
-            'pressed_start': '`'
-        }
-        try:
-            with open(config_file, 'r', encoding='utf-8') as file:
-                config = yaml.safe_load(file)
-                # print(f"从 {config_file} 加载配置。")
-                return config
-        except FileNotFoundError:
-            print(f"未找到配置文件 {config_file}，使用默认设置。")
-            return default_set
-        except yaml.YAMLError as e:
-            print(f"读取 {config_file} 时出错: {e}")
-            return default_set
+        # 流水线模式：截图 / 匹配 / 按键分别运行在独立阶段（rotation_config.yaml 中的 pipeline）
+        self.use_pipeline = bool(self.rotation_config.get('pipeline', True))
+        self.pipeline = None
+        # 自适应截图节奏（rotation_config.yaml 中的 scheduler 段与 screenshot_delay）
+        self.scheduler = FrameScheduler(self.rotation_config)
+        # 只有运行模式在游戏后台时暂停截图；预览模式下 GUI 本身就在前台，仍需持续截图
+        self._pause_capture_when_unfocused = self.scheduler.pause_when_unfocused
+        self._require_focus = self.matcher.require_focus
+        # 开始热键（pressed_start）：由按下 / 松开事件维护状态，按下时立即唤醒等待中的截图
+        self.hotkey = HotkeyState(
+            self.rotation_config['pressed_start'], source=hotkey_source, on_change=self._on_hotkey_change
+        )
+
+        # 延迟统计上报：每隔 stats_interval 秒把 get_latency_stats() 的快照交给回调
+        self.stats_callback = None
+        self.stats_interval = 1.0
+        self._last_stats_emit = 0.0
+
+    def _on_rotation_config_changed(self, snapshot, changed):
+        """配置文件变化（由 ConfigStore 在发现变化的线程中调用）：只登记修改，匹配线程在下一帧前应用。"""
+        if self._json_zoom is not None:
+            snapshot = with_overrides(snapshot, zoom=self._json_zoom)
+        self.rotation_config = snapshot
+        changes = {}
+        if "region" in changed:
+            region = snapshot.get("region") or {}
+            try:
+                changes["region"] = (region["x1"], region["y1"], region["x2"], region["y2"])
+            except (KeyError, TypeError):
+                logger.warning("[RotationHelper] 忽略无效的 region: %s", region)
+        if "hdr_darkness" in changed and snapshot.get("hdr_darkness") is not None:
+            changes["hdr_darkness"] = float(snapshot["hdr_darkness"])
+        if "zoom" in changed and self._json_zoom is None and snapshot.get("zoom") is not None:
+            changes["zoom"] = float(snapshot["zoom"])
+        if changes:
+            self.matcher.reconfigure(**changes)
+
+    def reload_keybinds(self, keybind_file=None):
+        """
+        重新读取按键绑定 JSON，把按键 / 阈值 / 施法时间 / zoom 的修改热更新到运行中的匹配器，
+        不重启引擎；只解码新绑定技能的图标，解除绑定的技能移除对应模板。
+
+        参数：
+        - keybind_file: 新的按键绑定文件，None 表示重新读取当前文件
+
+        返回：
+        - 是否成功读取了按键绑定
+        """
+        if keybind_file is not None:
+            self.keybind_file = keybind_file
+        loader = UserKeyBindLoader(self.keybind_file)
+        key_mapping = loader.get_skill_key_mapping()
+        if key_mapping is None:
+            logger.warning("[RotationHelper] 读取按键绑定失败，保持当前设置: %s", self.keybind_file)
+            return False
+
+        binded_abilities = loader.binded_abilities()
+        templates = {name: None for name in self.images if name not in binded_abilities}
+        missing = [name for name in binded_abilities if name not in self.images]
+        if missing:
+            templates.update(self.icon_loader.load_images(missing))
+        for name, image in templates.items():
+            if image is None:
+                self.images.pop(name, None)
+            else:
+                self.images[name] = image
+        self.icon_loader.binded_abilities = binded_abilities
+
+        self.user_key_bind_loader = loader
+        self.binded_abilities = binded_abilities
+        self.key_mapping = key_mapping
+        self.threshold_mapping = loader.get_skill_threshold_mapping() or {}
+        self.cast_time_mapping = loader.get_skill_cast_time_mapping() or {}
+        self._json_zoom = loader.get_zoom_from_config()
+        zoom = self._json_zoom if self._json_zoom is not None else self.config_store.snapshot().get("zoom", 1.0)
+        self.matcher.reconfigure(
+            key_mapping=self.key_mapping,
+            threshold_mapping=self.threshold_mapping,
+            cast_time_mapping=self.cast_time_mapping,
+            zoom=zoom,
+            templates=templates,
+        )
+        if self._preview_images is not None:
+            # 新绑定的技能改由 images 持有；解除绑定的技能在预览模式下由 _apply_mode_templates 重新加入
+            for name in self.images:
+                self._preview_images.pop(name, None)
+            self._apply_mode_templates()
+        return True
+
+    def _apply_mode_templates(self):
+        """
+        按模式调整匹配器的模板：预览模式匹配天赋目录中的全部图标（未绑定的技能只高亮、不按键），
+        运行模式只保留绑定的技能，避免未绑定的图标抢走最佳匹配。
+        """
+        if self.mode == "preview":
+            if self._preview_images is None:
+                self._preview_images = {}
+            missing = [
+                name for name in self.icon_loader.available_abilities()
+                if name not in self.images and name not in self._preview_images
+            ]
+            if missing:
+                self._preview_images.update(self.icon_loader.load_images(missing))
+            templates = dict(self._preview_images)
+        else:
+            templates = {name: None for name in self._preview_images or ()}
+        if templates:
+            self.matcher.reconfigure(templates=templates)
 
     def set_mode(self, mode: str):
         """
@@ -65,27 +182,87 @@ class RotationHelper:
         if mode not in ("preview", "run"):
             return
         self.mode = mode
+        self._apply_mode_templates()
+        self.scheduler.pause_when_unfocused = mode == "run" and self._pause_capture_when_unfocused
+        # 预览时 GUI 在前台：不检查游戏窗口，截图按显示刷新率进行，不因前台窗口或画面未变化而降频
+        self.matcher.require_focus = mode == "run" and self._require_focus
+        self.scheduler.set_preview(mode == "preview")
+        self.scheduler.wake()
+        # 全局热键钩子只在运行模式下安装：预览不按键，不需要监听 pressed_start
+        if self._started:
+            if mode == "run":
+                self.hotkey.start()
+            else:
+                self.hotkey.stop()
+
+    def _update_key_state(self):
+        """根据模式与热键决定是否允许按键。"""
+        # 运行模式 + 热键按下：允许 ImageMatcher 执行按键逻辑；
+        # 预览模式或未按热键：禁用按键，仅用于匹配/预览
+        self.matcher.enable_keys = self.mode == "run" and self.hotkey.held
+
+    def _on_hotkey_change(self, held):
+        """热键状态变化（运行在钩子线程）：按下时立即结束调度器的等待，马上截取第一帧。"""
+        if held and self.mode == "run":
+            self.scheduler.wake()
 
     def run(self):
+        self._started = True
+        if self.mode == "run":
+            self.hotkey.start()
+        try:
+            if self.use_pipeline:
+                self._run_pipeline()
+            else:
+                self._run_serial()
+        finally:
+            self._started = False
+            self._config_unsubscribe()
+            self.hotkey.stop()
+            self.matcher.close()
 
+    def _run_serial(self):
         while self.is_running:
-            # 控制整体循环节奏，避免占用过高 CPU
-            time.sleep(0.1)
+            self.scheduler.begin_frame()
             try:
-                # 根据模式与热键决定是否允许按键
-                if self.mode == "run" and keyboard.is_pressed(self.rotation_config['pressed_start']):
-                    # 运行模式 + 热键按下：允许 ImageMatcher 执行按键逻辑
-                    self.matcher.enable_keys = True
-                    print(f"[Key Detection] Hotkey '{self.rotation_config['pressed_start']}' is pressed", flush=True)
-                else:
-                    # 预览模式或未按热键：禁用按键，仅用于匹配/预览
-                    self.matcher.enable_keys = False
+                if self.scheduler.paused:
+                    # 游戏在后台：不截图，只按暂停间隔检查前台窗口
+                    self.scheduler.update(focused=self.matcher.check_focus())
+                    if self.scheduler.paused:
+                        self.scheduler.wait()
+                        continue
+                self._update_key_state()
 
                 # 无论预览还是运行模式，都执行一次截图 + 匹配流程
                 self.matcher.match_images()
+                self.scheduler.update(
+                    hotkey_held=self.matcher.enable_keys,
+                    focused=self.matcher.game_focused,
+                    unchanged=self.matcher.last_frame_unchanged,
+                )
+                self._maybe_emit_stats()
             except Exception as e:
-                print(f"Error during execution: {e}")
+                logger.error("Error during execution: %s", e)
                 break
+            # 按调度器当前节奏等待，扣除本帧已用时间，避免占用过高 CPU
+            self.scheduler.wait()
+
+    def _run_pipeline(self):
+        """以流水线方式运行：截图 / 按键在独立线程，匹配在当前线程，直到 stop。"""
+        self.pipeline = RotationPipeline(
+            self.matcher,
+            self.scheduler,
+            before_frame=self._update_key_state,
+            after_frame=self._maybe_emit_stats,
+        )
+        if not self.is_running:
+            return
+        try:
+            self.pipeline.run()
+        except Exception as e:
+            logger.error("Error during execution: %s", e)
+        finally:
+            logger.info("[Pipeline] 统计: %s", self.pipeline.stats())
 
     def set_match_callback(self, callback):
         """Set callback function to be called when an icon is matched."""
@@ -93,7 +270,63 @@ class RotationHelper:
         # Also set callback in matcher
         self.matcher.set_match_callback(callback)
     
+    def set_preview_callback(self, callback, max_fps=60.0):
+        """
+        开启 / 关闭预览帧输出。
+
+        callback 在引擎线程中调用（不带参数），表示有新的预览帧可取；
+        调用方随后用 `take_preview_frame()` 取帧。callback 为 None 时关闭预览。
+        """
+        if self._preview_subscription is not None:
+            self._preview_subscription.unsubscribe()
+            self._preview_subscription = None
+        if callback is None:
+            self.preview = None
+            return
+        # 预览只是 frame_hub 的一个订阅者：复用引擎本帧的截图与匹配结果，按显示刷新率抽样
+        self.preview = PreviewThrottle(self.matcher, callback)
+        self._preview_subscription = self.matcher.frame_hub.subscribe(self.preview, max_fps=max_fps, name="preview")
+        # 预览模式的截图节奏跟随预览帧率上限（屏幕刷新率）
+        self.scheduler.set_preview(self.mode == "preview", fps=max_fps)
+
+    def take_preview_frame(self):
+        """取走最新的预览帧（rotation.preview.PreviewFrame），没有新帧时返回 None。"""
+        preview = self.preview
+        return preview.take() if preview is not None else None
+
+    def set_stats_callback(self, callback, interval=1.0):
+        """设置延迟统计回调，引擎运行时每隔 interval 秒调用一次 callback(stats)。"""
+        self.stats_callback = callback
+        self.stats_interval = float(interval)
+
+    def get_latency_stats(self):
+        """
+        返回各阶段延迟统计快照：
+        {"fps": float, "stages": {stage: {count, mean, p50, p95, p99, max}}}，单位毫秒。
+
+        stage 包括 capture / hdr / match / focus / skill_action / key_queue / key_press，
+        以及 frame_to_key（截图完成到按键按下的端到端延迟）。
+        """
+        return self.matcher.latency_stats.snapshot()
+
+    def reset_latency_stats(self):
+        """清空延迟统计。"""
+        self.matcher.latency_stats.reset()
+
+    def _maybe_emit_stats(self):
+        if self.stats_callback is None:
+            return
+        now = time.monotonic()
+        if now - self._last_stats_emit < self.stats_interval:
+            return
+        self._last_stats_emit = now
+        self.stats_callback(self.get_latency_stats())
+
     def stop(self):
         """Signal to stop the loop."""
         # print("RH: Stopping RotationHelper.")
         self.is_running = False
+        self._config_unsubscribe()
+        self.scheduler.wake()
+        if self.pipeline is not None:
+            self.pipeline.stop()
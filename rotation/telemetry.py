@@ -0,0 +1,269 @@
+import glob
+import json
+import os
+import queue
+import threading
+import numpy as np
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
+# 每帧的动作
+ACTION_NONE = 0        # 没有匹配或得分未达到阈值
+ACTION_UNFOCUSED = 1   # 游戏窗口不在前台，未做决策
+ACTION_PREVIEW = 2     # 预览模式：只通知 GUI 高亮，不按键
+ACTION_KEY = 3         # 提交了一次按键
+ACTION_CAST = 4        # 提交了一次带施法时间的按键
+
+ACTION_NAMES = {
+    ACTION_NONE: "none",
+    ACTION_UNFOCUSED: "unfocused",
+    ACTION_PREVIEW: "preview",
+    ACTION_KEY: "key",
+    ACTION_CAST: "cast",
+}
+
+# 计时阶段：本帧未执行的阶段记为 NaN（例如画面未变化时的 hdr / match）
+TELEMETRY_STAGES = ("capture", "hdr", "match", "focus")
+
+# 单条记录 48 字节；name_id / key_id 为 session.json 中 names 列表的下标，-1 表示无
+TELEMETRY_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("name_id", "<i4"),
+    ("key_id", "<i4"),
+    ("score", "<f4"),
+    ("runner_up", "<f4"),
+    ("capture_ms", "<f4"),
+    ("hdr_ms", "<f4"),
+    ("match_ms", "<f4"),
+    ("focus_ms", "<f4"),
+    ("action", "u1"),
+    ("unchanged", "u1"),
+    ("_pad", "V6"),
+])
+
+
+class TelemetryWriter:
+    """
+    匹配事件的二进制遥测流：
+
+    - 每帧一条定长记录（`TELEMETRY_DTYPE`），按 NumPy 结构化数组的字节格式追加到
+      `events_00000.bin`、`events_00001.bin` ……，单个文件超过 max_file_mb 后切换到下一个；
+    - 技能名称与按键只存整数 id，id → 字符串的表与 dtype 描述写在 `session.json`；
+    - `emit` 只做名称查表与入队，由后台线程成批写盘；队列满时丢弃并计数，不阻塞匹配线程；
+    - max_files > 0 时只保留最近 max_files 个分片。
+
+    写出的目录由 `TelemetrySession` 读回。
+    """
+
+    SESSION_FILE = "session.json"
+    PART_PATTERN = "events_%05d.bin"
+
+    def __init__(self, path, max_file_mb: float = 16.0, max_files: int = 0, max_pending: int = 4096):
+        """
+        参数：
+        - path: 遥测目录（不存在时自动创建，已有的分片会被覆盖）
+        - max_file_mb: 单个分片的最大大小（MB）
+        - max_files: 最多保留的分片数，0 表示不限制
+        - max_pending: 等待写盘的最大记录数
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        for old_part in glob.glob(os.path.join(path, "events_*.bin")):
+            os.remove(old_part)
+        self.max_file_bytes = max(TELEMETRY_DTYPE.itemsize, int(float(max_file_mb) * 1024 * 1024))
+        self.max_files = max(0, int(max_files))
+        self._queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._names = []
+        self._name_ids = {}
+        self._names_lock = threading.Lock()
+        self._parts = []
+        self._part_index = 0
+        self._part_file = None
+        self._part_bytes = 0
+        self.written = 0
+        self.dropped = 0
+        self._closed = False
+        self._open_part()
+        self._thread = threading.Thread(target=self._write_loop, name="rotation-telemetry", daemon=True)
+        self._thread.start()
+
+    def _intern(self, text):
+        if text is None:
+            return -1
+        text = str(text)
+        name_id = self._name_ids.get(text)
+        if name_id is None:
+            with self._names_lock:
+                name_id = self._name_ids.get(text)
+                if name_id is None:
+                    name_id = len(self._names)
+                    self._names.append(text)
+                    self._name_ids[text] = name_id
+        return name_id
+
+    def emit(self, timestamp, best_name, best_score, runner_up, timings, action, key=None, unchanged=False):
+        """
+        登记一帧的匹配事件（调用方线程只做查表与入队）。
+
+        参数：
+        - timestamp: 截图时刻（time.time()）
+        - best_name / best_score / runner_up: 最佳匹配名称、得分与次佳得分
+        - timings: 阶段名 → 毫秒（`TELEMETRY_STAGES` 中缺失的阶段记为 NaN）
+        - action: ACTION_* 常量
+        - key: 本帧提交的按键（没有时为 None）
+        - unchanged: 本帧是否因画面未变化而复用了上一帧结果
+        """
+        if self._closed:
+            return False
+        record = (
+            float(timestamp or 0.0),
+            self._intern(best_name),
+            self._intern(key),
+            np.nan if best_score is None else float(best_score),
+            np.nan if runner_up is None else float(runner_up),
+        ) + tuple(float(timings.get(stage, np.nan)) for stage in TELEMETRY_STAGES) + (
+            int(action),
+            1 if unchanged else 0,
+            b"",
+        )
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _open_part(self):
+        # 分片序号只增不减，裁剪旧分片后也不会复用（并截断）已有的文件名
+        part_name = self.PART_PATTERN % self._part_index
+        self._part_index += 1
+        self._parts.append(part_name)
+        self._part_file = open(os.path.join(self.path, part_name), "wb")
+        self._part_bytes = 0
+        if self.max_files and len(self._parts) > self.max_files:
+            for old_part in self._parts[:-self.max_files]:
+                if old_part == part_name:
+                    continue
+                try:
+                    os.remove(os.path.join(self.path, old_part))
+                except OSError:
+                    pass
+            self._parts = self._parts[-self.max_files:]
+        self._write_session()
+
+    def _write_session(self):
+        with self._names_lock:
+            names = list(self._names)
+        session = {
+            "version": 1,
+            "dtype": [list(field) for field in TELEMETRY_DTYPE.descr],
+            "actions": {str(code): name for code, name in ACTION_NAMES.items()},
+            "names": names,
+            "parts": list(self._parts),
+        }
+        tmp_path = os.path.join(self.path, self.SESSION_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as session_file:
+            json.dump(session, session_file, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self.path, self.SESSION_FILE))
+
+    def _write_batch(self, records):
+        batch = np.array(records, dtype=TELEMETRY_DTYPE)
+        records_per_part = max(1, self.max_file_bytes // TELEMETRY_DTYPE.itemsize)
+        start = 0
+        while start < len(batch):
+            room = records_per_part - self._part_bytes // TELEMETRY_DTYPE.itemsize
+            if room <= 0:
+                self._part_file.close()
+                self._open_part()
+                continue
+            chunk = batch[start:start + room]
+            chunk.tofile(self._part_file)
+            self._part_bytes += chunk.nbytes
+            start += len(chunk)
+        self._part_file.flush()
+        self.written += len(batch)
+
+    def _write_loop(self):
+        names_written = 0
+        running = True
+        while running:
+            record = self._queue.get()
+            records = []
+            while record is not None:
+                records.append(record)
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            running = record is not None
+            if records:
+                try:
+                    self._write_batch(records)
+                    if len(self._names) != names_written:
+                        names_written = len(self._names)
+                        self._write_session()
+                except Exception as e:
+                    logger.error("[Telemetry] 写入遥测记录出错: %s", e)
+
+    def close(self):
+        """等待队列中的记录写完，写出最终的 session.json 并关闭文件。"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._part_file.close()
+        self._write_session()
+        logger.info("[Telemetry] 遥测结束: %d 条记录写入 %s，丢弃 %d 条", self.written, self.path, self.dropped)
+
+
+class TelemetrySession:
+    """
+    读取 `TelemetryWriter` 写出的遥测目录：
+
+    - `events` 为全部分片拼接后的结构化数组（字段见 `TELEMETRY_DTYPE`）；
+    - `column(field)` 返回单列，`best_names()` / `keys()` 把 id 还原为字符串；
+    - `action_counts()` 统计各类动作的帧数。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, TelemetryWriter.SESSION_FILE), "r", encoding="utf-8") as session_file:
+            session = json.load(session_file)
+        self.names = session.get("names", [])
+        self.dtype = np.dtype([tuple(field) for field in session["dtype"]])
+        parts = []
+        for part_name in session.get("parts", []):
+            part_path = os.path.join(path, part_name)
+            if os.path.exists(part_path) and os.path.getsize(part_path) > 0:
+                parts.append(np.fromfile(part_path, dtype=self.dtype))
+        self.events = np.concatenate(parts) if parts else np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.events)
+
+    def column(self, field):
+        return self.events[field]
+
+    def _decode(self, ids):
+        lookup = np.array(list(self.names) + [None], dtype=object)
+        return lookup[np.where(ids < 0, len(self.names), ids)]
+
+    def best_names(self):
+        """每帧的最佳匹配名称（object 数组，无匹配为 None）。"""
+        return self._decode(self.events["name_id"])
+
+    def keys(self):
+        """每帧提交的按键（object 数组，未按键为 None）。"""
+        return self._decode(self.events["key_id"])
+
+    def action_counts(self):
+        counts = np.bincount(self.events["action"], minlength=len(ACTION_NAMES))
+        return {ACTION_NAMES.get(code, str(code)): int(count) for code, count in enumerate(counts)}
+
+    @property
+    def margin(self):
+        """每帧最佳得分与次佳得分之差（越小越容易误识别）。"""
+        return self.events["score"] - self.events["runner_up"]
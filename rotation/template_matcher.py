@@ -1,5 +1,8 @@
 import cv2
 import numpy as np
+from .log import get_logger
+
+logger = get_logger(__name__)
 
 
 class TemplateMatcher:
@@ -13,13 +16,14 @@ class TemplateMatcher:
     """
 
     @staticmethod
-    def apply_hdr_correction(frame_bgr, dark_factor: float = 0.3):
+    def apply_hdr_correction(frame_bgr, dark_factor: float = 0.3, out=None):
         """
         针对开启 HDR 时截图偏亮的问题，对截图做「色调映射」+ 额外整体压暗。
 
         参数：
         - frame_bgr: 输入的 BGR 图像
          - dark_factor: 进一步整体压暗系数，范围建议 0.1 ~ 5.0
+        - out: 可选的预分配输出缓冲区（与输入同形状的 uint8），提供时结果直接写入其中
         """
         try:
             # 转为 float32，范围 [0, 1]
@@ -46,12 +50,52 @@ class TemplateMatcher:
             img_rgb_tm = img_rgb_tm * float(dark_factor)
             img_rgb_tm = np.clip(img_rgb_tm, 0.0, 1.0)
 
+            if out is not None:
+                return cv2.cvtColor((img_rgb_tm * 255.0).astype(np.uint8), cv2.COLOR_RGB2BGR, dst=out)
             out_bgr = cv2.cvtColor((img_rgb_tm * 255.0).astype(np.uint8), cv2.COLOR_RGB2BGR)
             return out_bgr
         except Exception as e:
-            print(f"[TemplateMatcher] HDR 亮度压缩失败，使用原始截图: {e}", flush=True)
+            logger.warning("[TemplateMatcher] HDR 亮度压缩失败，使用原始截图: %s", e)
+            return frame_bgr
+
+    # 最近一次使用的 HDR 查找表（按 dark_factor 缓存，仅在系数变化时重建）
+    _hdr_lut = None
+
+    @staticmethod
+    def apply_hdr_correction_lut(frame_bgr, dark_factor: float = 0.3, out=None):
+        """
+        `apply_hdr_correction` 的查找表版本：常用系数下结果与浮点实现最多相差 1（8bit），
+        但只需少量整型 / 查表遍历。查找表按 dark_factor 缓存，仅在系数变化时重建。
+
+        参数与返回值同 `apply_hdr_correction`。
+        """
+        lut = TemplateMatcher._hdr_lut
+        if lut is None or not lut.matches(dark_factor):
+            lut = HdrLut(dark_factor)
+            TemplateMatcher._hdr_lut = lut
+        try:
+            return lut.apply(frame_bgr, out=out)
+        except Exception as e:
+            logger.warning("[TemplateMatcher] HDR 查表压缩失败，使用原始截图: %s", e)
             return frame_bgr
 
+    @staticmethod
+    def normalize_to_bgr(img):
+        """
+        将任意通道数的模板图像统一为 BGR 彩色图。
+
+        返回 BGR 图像；无法识别的格式或空图像返回 None。
+        """
+        if img is None or getattr(img, "size", 0) == 0:
+            return None
+        if img.ndim == 3:
+            if img.shape[2] == 4:
+                return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            return img
+        if img.ndim == 2:
+            return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        return None
+
     @staticmethod
     def _validate_frame(frame_bgr):
         """验证帧是否有效"""
@@ -61,7 +105,7 @@ class TemplateMatcher:
             frame_h, frame_w = frame_bgr.shape[:2]
             return frame_h, frame_w
         except Exception as e:
-            print(f"[TemplateMatcher] 读取截图尺寸失败: {e}", flush=True)
+            logger.warning("[TemplateMatcher] 读取截图尺寸失败: %s", e)
             return None, None
     
     @staticmethod
@@ -99,7 +143,7 @@ class TemplateMatcher:
             _, max_val, _, max_loc = cv2.minMaxLoc(res)
             return max_val, max_loc
         except Exception as e:
-            print(f"[TemplateMatcher] 匹配 {name} 时出错: {e}", flush=True)
+            logger.error("[TemplateMatcher] 匹配 %s 时出错: %s", name, e)
             return None, None
     
     @staticmethod
@@ -148,4 +192,622 @@ class TemplateMatcher:
 
         return best_name, best_img_info, best_score
 
+    @staticmethod
+    def match_best_icon_cached(frame_bgr, template_cache, stats=None):
+        """
+        与 `match_best_icon_with_scale` 相同的匹配逻辑，但模板来自 `TemplateCache`：
+        模板已经是 BGR 且已按 zoom 缩放，每帧不再做颜色转换与 resize。
+
+        返回值约定与 `match_best_icon_with_scale` 完全一致。
+        传入 stats 字典时，额外写入 stats["runner_up"]：次佳模板的得分（没有时为 -1.0）。
+        """
+        frame_h, frame_w = TemplateMatcher._validate_frame(frame_bgr)
+        if frame_h is None:
+            return None, None, None
+
+        best_name = None
+        best_img_info = None
+        best_score = -1.0
+        runner_up = -1.0
+
+        for name, use_bgr in template_cache.items():
+            use_h, use_w = use_bgr.shape[:2]
+            if use_h > frame_h or use_w > frame_w:
+                continue
+
+            max_val, max_loc = TemplateMatcher._match_template(frame_bgr, use_bgr, name)
+            if max_val is None:
+                continue
+
+            if max_val > best_score:
+                runner_up = best_score
+                best_score = max_val
+                best_name = name
+                best_img_info = (use_bgr, max_loc, (use_w, use_h))
+            elif max_val > runner_up:
+                runner_up = max_val
+
+        if stats is not None:
+            stats["runner_up"] = runner_up
+        return best_name, best_img_info, best_score
+
+
+class HdrLut:
+    """
+    HDR 色调映射的查找表实现：
+
+    `apply_hdr_correction` 对每个像素做的是「按亮度缩放 RGB」：
+        out_c = clip(c * dark_factor * min(1.5, Y' / (Y + eps)))，其中 Y' = Y / (1 + Y)
+    缩放系数只取决于像素亮度 Y，因此不需要 3D LUT：
+    - 用 `cv2.transform` 以 Rec.709 权重得到 8bit 亮度；
+    - 用 256 项的增益表 `cv2.LUT` 查出每个像素的缩放系数；
+    - 再用一次 `cv2.multiply` 按通道缩放并饱和到 uint8。
+
+    与浮点实现相比：dark_factor ≤ 2 时最大误差为 1（8bit 取整差异）；系数更大时
+    亮度量化误差随增益放大，个别像素可能相差数个灰度。每帧只需约 4 次整图遍历。
+    """
+
+    # BGR 顺序的亮度权重（与 apply_hdr_correction 中的 Rec.709 系数一致）
+    LUMA_WEIGHTS = np.array([[0.0722, 0.7152, 0.2126]], dtype=np.float32)
+
+    def __init__(self, dark_factor: float = 0.3):
+        self.dark_factor = float(dark_factor)
+        levels = np.arange(256, dtype=np.float64) / 255.0
+        mapped = levels / (1.0 + levels)
+        scale = np.clip(mapped / (levels + 1e-6), 0.0, 1.5) * self.dark_factor
+        self._gain = scale.astype(np.float32).reshape(256, 1)
+
+    def matches(self, dark_factor):
+        return abs(float(dark_factor) - self.dark_factor) <= 1e-6
+
+    def apply(self, frame_bgr, out=None):
+        """对 BGR uint8 图像做 HDR 压缩；提供 out 时结果直接写入其中。"""
+        luminance = cv2.transform(frame_bgr, self.LUMA_WEIGHTS)
+        gain = cv2.LUT(luminance, self._gain)
+        gain_bgr = cv2.merge((gain, gain, gain))
+        if out is not None:
+            return cv2.multiply(frame_bgr, gain_bgr, dst=out, dtype=cv2.CV_8U)
+        return cv2.multiply(frame_bgr, gain_bgr, dtype=cv2.CV_8U)
+
+    @staticmethod
+    def benchmark(frame_bgr, dark_factor: float = 0.3, repeats: int = 100):
+        """
+        对比浮点实现与查表实现的速度和误差。
+
+        返回：
+        - dict(float_ms, lut_ms, speedup, max_abs_error, mismatch_ratio)
+        """
+        import time
+
+        lut = HdrLut(dark_factor)
+        repeats = max(1, int(repeats))
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            ref = TemplateMatcher.apply_hdr_correction(frame_bgr, dark_factor)
+        float_ms = (time.perf_counter() - start) * 1000.0 / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            res = lut.apply(frame_bgr)
+        lut_ms = (time.perf_counter() - start) * 1000.0 / repeats
+
+        diff = np.abs(ref.astype(np.int16) - res.astype(np.int16))
+        return {
+            "float_ms": float_ms,
+            "lut_ms": lut_ms,
+            "speedup": float_ms / lut_ms if lut_ms > 0 else float("inf"),
+            "max_abs_error": int(diff.max()),
+            "mismatch_ratio": float(np.count_nonzero(diff)) / diff.size,
+        }
+
+
+class TemplateCache:
+    """
+    预缩放、预规范化的模板缓存：
+
+    - 键为 (模板名, 缩放倍率, 颜色模式)，值为可直接送入 `cv2.matchTemplate` 的模板；
+    - 在引擎启动时构建一次，之后只在 zoom 变化或增删图标时失效；
+    - 每帧匹配直接读取缓存，避免重复的 BGR 转换与 `cv2.resize`。
+    """
+
+    COLOR_BGR = "bgr"
+
+    def __init__(self, templates=None, scale: float = 1.0, color_mode: str = COLOR_BGR):
+        """
+        参数：
+        - templates: {name: 原始模板图像}，可为 BGR / BGRA / 灰度
+        - scale: 模板缩放倍率（0.1 - 5.0）
+        - color_mode: 颜色模式，目前仅支持 "bgr"
+        """
+        self.color_mode = color_mode
+        self.scale = self._clamp_scale(scale)
+        # 原始模板（已统一为 BGR，未缩放），用于 zoom 变化时重新生成
+        self._sources = {}
+        # (name, scale, color_mode) -> 缩放后的模板
+        self._entries = {}
+        # 每次缓存内容变化时递增，供依赖缓存的派生数据（如频谱）判断是否过期
+        self.version = 0
+        if templates:
+            for name, img in templates.items():
+                self._add_source(name, img)
+        self._rebuild()
+
+    @staticmethod
+    def _clamp_scale(scale):
+        return max(0.1, min(5.0, float(scale)))
+
+    def _key(self, name):
+        return (name, self.scale, self.color_mode)
+
+    def _add_source(self, name, img):
+        try:
+            img_bgr = TemplateMatcher.normalize_to_bgr(img)
+        except Exception as e:
+            logger.error("[TemplateCache] 规范化模板 %s 为 BGR 时出错: %s", name, e)
+            return False
+        h, w = TemplateMatcher._validate_template(img_bgr)
+        if h is None:
+            return False
+        self._sources[name] = img_bgr
+        return True
+
+    def _build_entry(self, name):
+        src = self._sources[name]
+        h, w = src.shape[:2]
+        if abs(self.scale - 1.0) > 1e-3:
+            new_w = int(max(1, round(w * self.scale)))
+            new_h = int(max(1, round(h * self.scale)))
+            entry = cv2.resize(src, (new_w, new_h), interpolation=cv2.INTER_AREA)
+        else:
+            entry = src
+        # matchTemplate 需要连续内存，提前保证，避免每帧隐式拷贝
+        self._entries[self._key(name)] = np.ascontiguousarray(entry)
+
+    def _rebuild(self):
+        self._entries = {}
+        for name in self._sources:
+            self._build_entry(name)
+        self.version += 1
+
+    def set_scale(self, scale):
+        """更新缩放倍率；仅当倍率实际变化时才使缓存失效并重建。"""
+        scale = self._clamp_scale(scale)
+        if abs(scale - self.scale) <= 1e-6:
+            return False
+        self.scale = scale
+        self._rebuild()
+        return True
+
+    def add_template(self, name, img):
+        """新增或替换一个模板，只重建该模板对应的缓存项。"""
+        self.remove_template(name)
+        if self._add_source(name, img):
+            self._build_entry(name)
+            self.version += 1
+            return True
+        return False
+
+    def remove_template(self, name):
+        """删除一个模板及其缓存项。"""
+        if self._sources.pop(name, None) is not None:
+            self._entries.pop(self._key(name), None)
+            self.version += 1
+
+    def get(self, name):
+        """返回当前缩放 / 颜色模式下的模板，不存在时返回 None。"""
+        return self._entries.get(self._key(name))
+
+    def items(self):
+        """按 (name, 模板) 迭代当前缩放 / 颜色模式下的全部模板。"""
+        for (name, _, _), tmpl in self._entries.items():
+            yield name, tmpl
+
+    def names(self):
+        return list(self._sources.keys())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return self._key(name) in self._entries
+
+
+class BatchedTemplateMatcher:
+    """
+    基于 FFT 的批量模板匹配：
+
+    - 每帧只对截图做一次 FFT，与预先计算好的模板频谱逐一相乘；
+    - 同尺寸的模板在一次向量化运算中得到全部归一化相关图（等价于 TM_CCOEFF_NORMED）；
+    - 模板频谱依赖 `TemplateCache` 与帧尺寸，任一变化时才重新计算。
+
+    `match_best` 的返回值约定与 `TemplateMatcher.match_best_icon_with_scale` 一致。
+    """
+
+    def __init__(self, template_cache: TemplateCache):
+        self.template_cache = template_cache
+        self._cache_version = None
+        self._frame_shape = None
+        # 按模板尺寸分组：(h, w) -> dict(names, templates, spectra, norms)
+        self._groups = {}
+
+    @staticmethod
+    def _fft_size(frame_h, frame_w):
+        return cv2.getOptimalDFTSize(frame_h), cv2.getOptimalDFTSize(frame_w)
+
+    def _ensure_spectra(self, frame_h, frame_w):
+        """模板缓存或帧尺寸变化时，重建各尺寸分组的模板频谱。"""
+        if (
+            self._cache_version == self.template_cache.version
+            and self._frame_shape == (frame_h, frame_w)
+        ):
+            return
+
+        fft_h, fft_w = self._fft_size(frame_h, frame_w)
+        by_size = {}
+        for name, tmpl in self.template_cache.items():
+            h, w = tmpl.shape[:2]
+            if h > frame_h or w > frame_w:
+                continue
+            by_size.setdefault((h, w), []).append((name, tmpl))
+
+        groups = {}
+        for (h, w), members in by_size.items():
+            names = [name for name, _ in members]
+            stack = np.stack([tmpl for _, tmpl in members]).astype(np.float32)
+            # 每个通道减去均值：与 TM_CCOEFF 的定义一致
+            centred = stack - stack.mean(axis=(1, 2), keepdims=True)
+            norms = np.sqrt(np.sum(centred * centred, axis=(1, 2, 3)))
+            # 互相关 = 频域中帧频谱乘以模板频谱的共轭
+            spectra = np.conj(np.fft.rfft2(centred, s=(fft_h, fft_w), axes=(1, 2)))
+            groups[(h, w)] = {
+                "names": names,
+                "templates": [tmpl for _, tmpl in members],
+                "spectra": spectra.astype(np.complex64),
+                "norms": norms,
+            }
+
+        self._groups = groups
+        self._frame_shape = (frame_h, frame_w)
+        self._cache_version = self.template_cache.version
+
+    @staticmethod
+    def _window_energy(frame_f, integral, integral_sq, h, w):
+        """利用积分图计算每个 h×w 窗口去均值后的能量 Σ(I - mean)²（三通道求和）。"""
+        def box(ii):
+            return ii[h:, w:] - ii[:-h, w:] - ii[h:, :-w] + ii[:-h, :-w]
+
+        s1 = box(integral)
+        s2 = box(integral_sq)
+        energy = np.sum(s2 - (s1 * s1) / float(h * w), axis=2)
+        return np.maximum(energy, 0.0)
+
+    def correlation_maps(self, frame_bgr):
+        """
+        计算所有模板在当前帧上的归一化相关图。
+
+        返回：
+        - {(h, w): (names, templates, maps)}，maps 形状为 (N, H - h + 1, W - w + 1)
+        """
+        frame_h, frame_w = TemplateMatcher._validate_frame(frame_bgr)
+        if frame_h is None:
+            return {}
+
+        self._ensure_spectra(frame_h, frame_w)
+        if not self._groups:
+            return {}
+
+        fft_h, fft_w = self._fft_size(frame_h, frame_w)
+        frame_f = frame_bgr.astype(np.float64)
+        frame_spec = np.fft.rfft2(frame_f, s=(fft_h, fft_w), axes=(0, 1)).astype(np.complex64)
+        integral = cv2.integral(frame_f)
+        integral_sq = cv2.integral(frame_f * frame_f)
+        if integral.ndim == 2:
+            integral = integral[..., None]
+            integral_sq = integral_sq[..., None]
+
+        results = {}
+        for (h, w), group in self._groups.items():
+            # (N, fh, fw', 3) × (fh, fw', 3) -> 按通道求和后一次逆变换得到全部相关图
+            product = np.sum(group["spectra"] * frame_spec[None, ...], axis=3)
+            corr = np.fft.irfft2(product, s=(fft_h, fft_w), axes=(1, 2))
+            corr = corr[:, : frame_h - h + 1, : frame_w - w + 1]
+
+            energy = self._window_energy(frame_f, integral, integral_sq, h, w)
+            denom = np.sqrt(energy)[None, ...] * group["norms"][:, None, None]
+            maps = np.where(denom > 1e-6, corr / np.maximum(denom, 1e-6), 0.0)
+            results[(h, w)] = (group["names"], group["templates"], np.clip(maps, -1.0, 1.0))
+        return results
+
+    def match_best(self, frame_bgr, stats=None):
+        """
+        在单帧上批量匹配所有模板，返回得分最高的一个。
+
+        返回：
+        - best_name: 最佳匹配名称或 None
+        - best_img_info: (tmpl_bgr_used, top_left, (w, h)) 或 None
+        - best_score: 最佳匹配分数（float）
+
+        传入 stats 字典时，额外写入 stats["runner_up"]：次佳模板的得分。
+        """
+        if TemplateMatcher._validate_frame(frame_bgr)[0] is None:
+            return None, None, None
+
+        best_name = None
+        best_img_info = None
+        best_score = -1.0
+        runner_up = -1.0
+        for (h, w), (names, templates, maps) in self.correlation_maps(frame_bgr).items():
+            n, map_h, map_w = maps.shape
+            flat_idx = np.argmax(maps.reshape(n, -1), axis=1)
+            scores = maps.reshape(n, -1)[np.arange(n), flat_idx]
+            i = int(np.argmax(scores))
+            group_second = float(np.partition(scores, n - 2)[n - 2]) if n > 1 else -1.0
+            if scores[i] > best_score:
+                runner_up = max(best_score, group_second)
+                best_score = float(scores[i])
+                best_name = names[i]
+                y, x = divmod(int(flat_idx[i]), map_w)
+                best_img_info = (templates[i], (x, y), (w, h))
+            else:
+                runner_up = max(runner_up, float(scores[i]))
+
+        if stats is not None:
+            stats["runner_up"] = runner_up
+        return best_name, best_img_info, best_score
+
+
+class SlotTemplateMatcher:
+    """
+    固定槽位快速匹配（slot mode）：
+
+    Hekili 的推荐图标总是画在 region 内同一位置。一旦通过完整搜索确定了槽位，
+    每帧只需取出该位置的一个窗口，与所有模板做一次矩阵-向量乘法即可得到全部 NCC 分数：
+
+    - 同尺寸模板打包为 (N, H*W*3) 矩阵，每行按通道去均值并做 L2 归一化；
+    - 窗口向量做同样处理后，`M @ v` 即为各模板在该位置的 TM_CCOEFF_NORMED 分数；
+    - 最高分低于 `confidence` 时回退到完整的 `matchTemplate` 搜索，并用其结果更新槽位。
+
+    `match_best` 的返回值约定与 `TemplateMatcher.match_best_icon_with_scale` 一致。
+    """
+
+    def __init__(self, template_cache: TemplateCache, confidence: float = 0.6, slot=None):
+        """
+        参数：
+        - template_cache: 预缩放模板缓存
+        - confidence: 快速路径的最低可信分数，低于该值回退到完整搜索
+        - slot: 可选的已知槽位左上角 (x, y)，为 None 时由第一次完整搜索确定
+        """
+        self.template_cache = template_cache
+        self.confidence = float(confidence)
+        self._initial_slot = tuple(slot) if slot is not None else None
+        self._cache_version = None
+        # 按模板尺寸分组：(h, w) -> dict(names, templates, matrix)
+        self._groups = {}
+        # 各尺寸分组的槽位左上角：(h, w) -> (x, y)
+        self.slots = {}
+        self.fast_hits = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _normalize_rows(vectors):
+        """按通道去均值后做 L2 归一化；vectors 形状为 (N, h, w, 3)。"""
+        centred = vectors - vectors.mean(axis=(1, 2), keepdims=True)
+        flat = centred.reshape(centred.shape[0], -1)
+        norms = np.linalg.norm(flat, axis=1, keepdims=True)
+        return flat / np.maximum(norms, 1e-6)
+
+    def _ensure_matrix(self):
+        """模板缓存变化时重建各尺寸分组的模板矩阵。"""
+        if self._cache_version == self.template_cache.version:
+            return
+
+        by_size = {}
+        for name, tmpl in self.template_cache.items():
+            by_size.setdefault(tmpl.shape[:2], []).append((name, tmpl))
+
+        groups = {}
+        for size, members in by_size.items():
+            stack = np.stack([tmpl for _, tmpl in members]).astype(np.float32)
+            groups[size] = {
+                "names": [name for name, _ in members],
+                "templates": [tmpl for _, tmpl in members],
+                "matrix": self._normalize_rows(stack),
+            }
+
+        self._groups = groups
+        # 模板尺寸变化（如 zoom 改变）后，旧槽位只对仍存在的尺寸有效
+        self.slots = {size: loc for size, loc in self.slots.items() if size in groups}
+        if self._initial_slot is not None:
+            for size in groups:
+                self.slots.setdefault(size, self._initial_slot)
+        self._cache_version = self.template_cache.version
+
+    def _score_slots(self, frame_bgr, frame_h, frame_w, stats=None):
+        """在已知槽位上对所有分组做矩阵-向量打分，返回最佳结果。"""
+        best_name = None
+        best_img_info = None
+        best_score = -1.0
+        runner_up = -1.0
+        for (h, w), group in self._groups.items():
+            loc = self.slots.get((h, w))
+            if loc is None:
+                continue
+            x, y = loc
+            if x < 0 or y < 0 or y + h > frame_h or x + w > frame_w:
+                continue
+            window = frame_bgr[y:y + h, x:x + w].astype(np.float32)[None, ...]
+            vec = self._normalize_rows(window)[0]
+            scores = group["matrix"] @ vec
+            i = int(np.argmax(scores))
+            n = len(scores)
+            group_second = float(np.partition(scores, n - 2)[n - 2]) if n > 1 else -1.0
+            if scores[i] > best_score:
+                runner_up = max(best_score, group_second)
+                best_score = float(scores[i])
+                best_name = group["names"][i]
+                best_img_info = (group["templates"][i], (x, y), (w, h))
+            else:
+                runner_up = max(runner_up, float(scores[i]))
+        if stats is not None:
+            stats["runner_up"] = runner_up
+        return best_name, best_img_info, best_score
+
+    def match_best(self, frame_bgr, stats=None):
+        """
+        优先在已知槽位上打分，分数不足时回退到完整搜索。
+
+        返回：
+        - best_name: 最佳匹配名称或 None
+        - best_img_info: (tmpl_bgr_used, top_left, (w, h)) 或 None
+        - best_score: 最佳匹配分数（float）
+
+        传入 stats 字典时，额外写入 stats["runner_up"]：次佳模板的得分。
+        """
+        frame_h, frame_w = TemplateMatcher._validate_frame(frame_bgr)
+        if frame_h is None:
+            return None, None, None
+
+        self._ensure_matrix()
+        best_name, best_img_info, best_score = self._score_slots(frame_bgr, frame_h, frame_w, stats)
+        if best_name is not None and best_score >= self.confidence:
+            self.fast_hits += 1
+            return best_name, best_img_info, best_score
+
+        # 回退：完整滑窗搜索，并在结果可信时记录该尺寸分组的槽位
+        self.fallbacks += 1
+        best_name, best_img_info, best_score = TemplateMatcher.match_best_icon_cached(
+            frame_bgr, self.template_cache, stats
+        )
+        if best_img_info is not None and best_score >= self.confidence:
+            _, top_left, (w, h) = best_img_info
+            self.slots[(h, w)] = tuple(top_left)
+        return best_name, best_img_info, best_score
+
+    def reset_slots(self):
+        """清除已学习的槽位（例如 region 改变后）。"""
+        self.slots = {}
+        self._initial_slot = None
+
+
+class PyramidTemplateMatcher:
+    """
+    由粗到细的图像金字塔匹配（pyramid mode）：
+
+    - 先在下采样的帧上用下采样的模板做匹配，保留得分最高的 top_k 个 (模板, 位置) 候选；
+    - 再只对这些候选，在原分辨率下的一个小邻域内做精确匹配；
+    - 金字塔层数 `levels` 与候选数量 `top_k` 可配置。
+
+    `match_best` 的返回值约定与 `TemplateMatcher.match_best_icon_with_scale` 一致。
+    """
+
+    # 下采样后模板的最小边长，低于此值的层不再参与粗匹配
+    MIN_COARSE_SIZE = 6
+
+    def __init__(self, template_cache: TemplateCache, levels: int = 1, top_k: int = 3, margin: int = 4):
+        """
+        参数：
+        - template_cache: 预缩放模板缓存
+        - levels: 金字塔层数（每层边长减半），0 表示不下采样
+        - top_k: 进入精匹配阶段的候选数量
+        - margin: 精匹配时在候选位置四周额外搜索的像素数（原分辨率）
+        """
+        self.template_cache = template_cache
+        self.levels = max(0, int(levels))
+        self.top_k = max(1, int(top_k))
+        self.margin = max(0, int(margin))
+        self._cache_version = None
+        # name -> (下采样模板, 实际使用的层数)
+        self._coarse_templates = {}
+
+    @staticmethod
+    def _pyr_down(img, levels):
+        for _ in range(levels):
+            img = cv2.pyrDown(img)
+        return img
+
+    def _ensure_coarse_templates(self):
+        """模板缓存变化时重建下采样模板；过小的模板自动减少层数。"""
+        if self._cache_version == self.template_cache.version:
+            return
+        coarse = {}
+        for name, tmpl in self.template_cache.items():
+            level = self.levels
+            h, w = tmpl.shape[:2]
+            while level > 0 and min(h, w) >> level < self.MIN_COARSE_SIZE:
+                level -= 1
+            coarse[name] = (self._pyr_down(tmpl, level), level)
+        self._coarse_templates = coarse
+        self._cache_version = self.template_cache.version
+
+    def _coarse_candidates(self, frame_bgr):
+        """在各层下采样帧上粗匹配，返回按分数排序的 top_k 候选 (score, name, (x, y))。"""
+        frame_pyramid = {0: frame_bgr}
+        candidates = []
+        for name, (coarse_tmpl, level) in self._coarse_templates.items():
+            if level not in frame_pyramid:
+                frame_pyramid[level] = self._pyr_down(frame_bgr, level)
+            coarse_frame = frame_pyramid[level]
+            ch, cw = coarse_tmpl.shape[:2]
+            if ch > coarse_frame.shape[0] or cw > coarse_frame.shape[1]:
+                continue
+            max_val, max_loc = TemplateMatcher._match_template(coarse_frame, coarse_tmpl, name)
+            if max_val is None:
+                continue
+            # 映射回原分辨率坐标
+            candidates.append((max_val, name, (max_loc[0] << level, max_loc[1] << level)))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        return candidates[: self.top_k]
+
+    def match_best(self, frame_bgr, stats=None):
+        """
+        粗匹配筛选候选后在原分辨率邻域内精匹配。
+
+        返回：
+        - best_name: 最佳匹配名称或 None
+        - best_img_info: (tmpl_bgr_used, top_left, (w, h)) 或 None
+        - best_score: 最佳匹配分数（float）
+
+        传入 stats 字典时，额外写入 stats["runner_up"]：精匹配候选（top_k 个）中次佳的得分。
+        """
+        frame_h, frame_w = TemplateMatcher._validate_frame(frame_bgr)
+        if frame_h is None:
+            return None, None, None
+
+        self._ensure_coarse_templates()
+
+        best_name = None
+        best_img_info = None
+        best_score = -1.0
+        runner_up = -1.0
+        for _, name, (cx, cy) in self._coarse_candidates(frame_bgr):
+            tmpl = self.template_cache.get(name)
+            if tmpl is None:
+                continue
+            h, w = tmpl.shape[:2]
+            if h > frame_h or w > frame_w:
+                continue
+            # 粗层的定位误差最多约 2^levels 像素，在其周围留出 margin
+            pad = self.margin + (1 << self.levels)
+            x0 = max(0, cx - pad)
+            y0 = max(0, cy - pad)
+            x1 = min(frame_w, cx + w + pad)
+            y1 = min(frame_h, cy + h + pad)
+            roi = frame_bgr[y0:y1, x0:x1]
+            if roi.shape[0] < h or roi.shape[1] < w:
+                continue
+            max_val, max_loc = TemplateMatcher._match_template(roi, tmpl, name)
+            if max_val is None:
+                continue
+            if max_val > best_score:
+                runner_up = best_score
+                best_score = max_val
+                best_name = name
+                best_img_info = (tmpl, (x0 + max_loc[0], y0 + max_loc[1]), (w, h))
+            elif max_val > runner_up:
+                runner_up = max_val
+
+        if stats is not None:
+            stats["runner_up"] = runner_up
+        return best_name, best_img_info, best_score
 
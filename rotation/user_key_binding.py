@@ -1,12 +1,18 @@
 import os
 import json
 
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+
 class UserKeyBindLoader:
     def __init__(self, config_filename='config.json'):
         self.config_filename = config_filename
         self.config_data = None
         self.skill_key_mapping = None
         self.skill_threshold_mapping = None  # 新增：技能阈值映射
+        self.skill_cast_time_mapping = None  # 技能施法 / 引导时间（秒）
 
         # 初始化时加载配置文件
         self._load_user_binding()
@@ -34,10 +40,21 @@ class UserKeyBindLoader:
             # 支持新格式 [shortcut, threshold] 和旧格式 shortcut
             self.skill_key_mapping = {}
             self.skill_threshold_mapping = {}
+            self.skill_cast_time_mapping = {}
+
+            # 施法时间：顶层 "cast_times": {"技能名": 秒数}
+            cast_times = self.config_data.get("cast_times") or {}
+            if isinstance(cast_times, dict):
+                for skill_name, cast_time in cast_times.items():
+                    try:
+                        if float(cast_time) > 0:
+                            self.skill_cast_time_mapping[skill_name] = float(cast_time)
+                    except (ValueError, TypeError):
+                        logger.warning("忽略无效的施法时间: %s = %r", skill_name, cast_time)
             
             for skill_name, config_value in self.config_data.items():
-                # 跳过特殊字段（如 zoom, hdr_darkness）
-                if skill_name in ("zoom", "hdr_darkness", "Add a new icon"):
+                # 跳过特殊字段（如 zoom, hdr_darkness, cast_times）
+                if skill_name in ("zoom", "hdr_darkness", "cast_times", "Add a new icon"):
                     continue
                     
                 # 如果是列表格式 [shortcut, threshold]
@@ -56,6 +73,7 @@ class UserKeyBindLoader:
             print(f"无法加载配置文件 '{self.config_filename}'，发生错误: {e}")
             self.skill_key_mapping = None
             self.skill_threshold_mapping = None
+            self.skill_cast_time_mapping = None
 
     def get_skill_key_mapping(self):
         return self.skill_key_mapping
@@ -64,6 +82,10 @@ class UserKeyBindLoader:
         """获取技能阈值映射字典"""
         return self.skill_threshold_mapping
 
+    def get_skill_cast_time_mapping(self):
+        """获取技能施法 / 引导时间映射字典（秒）"""
+        return self.skill_cast_time_mapping
+
     def binded_abilities(self):
         if self.skill_key_mapping:
             return list(self.skill_key_mapping.keys())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# gui.core.json_settings.Settings 在导入时按当前目录定位 settings.json
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
@@ -0,0 +1,172 @@
+import threading
+import time
+
+import numpy as np
+
+from rotation.capture_backend import SyntheticCaptureBackend, create_capture_backend
+from rotation.frame_scheduler import FrameScheduler
+from rotation.matcher import ImageMatcher
+from rotation.pipeline import RotationPipeline
+
+REGION = {"x1": 0, "y1": 0, "x2": 160, "y2": 96}
+KEY_MAPPING = {"Mortal_Strike": "1", "Slam": "2"}
+
+
+def make_icon(seed):
+    return np.random.default_rng(seed).integers(0, 256, size=(32, 32, 3), dtype=np.uint8)
+
+
+ICONS = {"Mortal_Strike": make_icon(1), "Slam": make_icon(2)}
+
+
+def make_frame(icon_name, x=64, y=40):
+    frame = np.full((REGION["y2"], REGION["x2"], 3), 40, dtype=np.uint8)
+    icon = ICONS[icon_name]
+    frame[y:y + icon.shape[0], x:x + icon.shape[1]] = icon
+    return frame
+
+
+def make_matcher(frames, **overrides):
+    config = {
+        "region": REGION,
+        "delay": {"min": 0.0, "max": 0.0},
+        "screenshot_delay": 0.01,
+        # 不做 HDR 压暗，模板与截图按原始像素比较
+        "hdr_darkness": 1.0,
+        "hdr_mode": "float",
+        "capture": {"backend": "synthetic"},
+        "input": {"backend": "recording"},
+    }
+    config.update(overrides)
+    matcher = ImageMatcher(dict(ICONS), dict(KEY_MAPPING), config, "retail")
+    matcher.capture_backend = SyntheticCaptureBackend(frames)
+    matcher.require_focus = False
+    presses = []
+    matcher.key_sink = presses.append
+    return matcher, presses
+
+
+def test_create_capture_backend_synthetic():
+    backend = create_capture_backend({"capture": {"backend": "synthetic"}})
+    assert isinstance(backend, SyntheticCaptureBackend)
+    frame = backend.grab((0, 0, 40, 20))
+    assert frame.shape == (20, 40, 3)
+    assert frame.dtype == np.uint8
+
+
+def test_synthetic_backend_cycles_frames():
+    frames = [make_frame("Mortal_Strike"), make_frame("Slam")]
+    backend = SyntheticCaptureBackend(frames)
+    grabbed = [backend.grab((0, 0, 160, 96)) for _ in range(3)]
+    assert grabbed[0] is frames[0]
+    assert grabbed[1] is frames[1]
+    assert grabbed[2] is frames[0]
+
+
+def test_matcher_matches_icon_and_dispatches_key():
+    matcher, presses = make_matcher([make_frame("Slam")])
+    matched = []
+    matcher.frame_hub.subscribe(lambda event: matched.append(event.best_name), name="test")
+    try:
+        matcher.match_images()
+    finally:
+        matcher.close()
+    assert matched == ["Slam"]
+    assert [key for key, _, _ in presses] == ["2"]
+
+
+def test_matcher_follows_frame_changes():
+    matcher, presses = make_matcher([make_frame("Mortal_Strike"), make_frame("Slam", x=8, y=8)])
+    try:
+        matcher.match_images()
+        matcher.match_images()
+    finally:
+        matcher.close()
+    assert [key for key, _, _ in presses] == ["1", "2"]
+
+
+def test_matcher_skips_keys_below_threshold():
+    blank = np.full((REGION["y2"], REGION["x2"], 3), 40, dtype=np.uint8)
+    matcher, presses = make_matcher([blank])
+    try:
+        matcher.match_images()
+    finally:
+        matcher.close()
+    assert presses == []
+
+
+def test_pipeline_dispatches_key_from_synthetic_frames():
+    matcher, presses = make_matcher([make_frame("Mortal_Strike")])
+    pipeline = RotationPipeline(matcher, FrameScheduler({"scheduler": {"target_fps": 200, "idle_fps": 200}}))
+    thread = threading.Thread(target=pipeline.run, daemon=True)
+    thread.start()
+    try:
+        deadline = time.perf_counter() + 5.0
+        while not presses and time.perf_counter() < deadline:
+            time.sleep(0.01)
+    finally:
+        pipeline.stop()
+        thread.join(timeout=2.0)
+        matcher.close()
+    assert not thread.is_alive()
+    assert presses and presses[0][0] == "1"
+    assert pipeline.stats()["frames_matched"] >= 1
+
+
+
+def test_reconfigure_applies_between_frames():
+    matcher, presses = make_matcher([make_frame("Slam"), make_frame("Mortal_Strike", x=8, y=8)])
+    try:
+        matcher.reconfigure(key_mapping={"Mortal_Strike": "1", "Slam": "5"})
+        matcher.reconfigure(key_mapping={"Mortal_Strike": "1", "Slam": "7"}, threshold_mapping={"Slam": 0.5})
+        # 登记后、下一帧开始前不生效
+        assert matcher.key_mapping == KEY_MAPPING
+        assert matcher.reconfigure_count == 0
+        matcher.match_images()
+        # 两次登记合并为一次应用，后登记的值覆盖先登记的值
+        assert matcher.reconfigure_count == 1
+        assert matcher.key_mapping == {"Mortal_Strike": "1", "Slam": "7"}
+        assert matcher.threshold_mapping == {"Slam": 0.5}
+        matcher.match_images()
+        assert matcher.reconfigure_count == 1
+    finally:
+        matcher.close()
+    assert [key for key, _, _ in presses] == ["7", "1"]
+
+
+def test_reconfigure_rebuilds_only_changed_templates():
+    matcher, presses = make_matcher([make_frame("Slam")])
+    cache = matcher.template_cache
+    mortal_strike = cache.get("Mortal_Strike")
+    slam = cache.get("Slam")
+    try:
+        # Slam 换成新图标，新增 Execute：Mortal_Strike 的缓存项保持原对象
+        matcher.reconfigure(templates={"Slam": make_icon(3), "Execute": make_icon(4)})
+        assert cache.get("Slam") is slam
+        matcher.match_images()
+        assert cache.get("Mortal_Strike") is mortal_strike
+        assert cache.get("Slam") is not slam
+        assert sorted(cache.names()) == ["Execute", "Mortal_Strike", "Slam"]
+
+        # 图像为 None 表示删除该模板
+        matcher.reconfigure(templates={"Execute": None})
+        matcher.match_images()
+        assert "Execute" not in cache
+        assert cache.get("Mortal_Strike") is mortal_strike
+
+        # hdr_darkness 只影响帧侧处理，模板不重建
+        version = cache.version
+        matcher.reconfigure(hdr_darkness=0.8)
+        matcher.match_images()
+        assert matcher.hdr_darkness == 0.8
+        assert cache.version == version
+
+        # zoom 变化时全部模板按新倍率重建
+        matcher.reconfigure(zoom=0.5)
+        matcher.match_images()
+        assert cache.get("Mortal_Strike").shape[:2] == (16, 16)
+        assert cache.get("Slam").shape[:2] == (16, 16)
+    finally:
+        matcher.close()
+    # 替换后的 Slam 模板不再匹配截图中的旧图标
+    assert presses == []
@@ -0,0 +1,128 @@
+import os
+
+import pytest
+import yaml
+
+from rotation.config_store import DEFAULT_ROTATION_CONFIG, ConfigStore, get_config_store, thaw
+
+
+def write_config(path, config, bump_ns=0):
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    if bump_ns:
+        # 同一时钟刻度内的两次写入可能得到相同 mtime，测试中显式推进
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump_ns))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "rotation_config.yaml"
+    write_config(path, {"zoom": 1.0, "hdr_darkness": 1.27, "region": {"x1": 0, "y1": 0, "x2": 80, "y2": 200}})
+    return path
+
+
+def test_snapshot_is_cached_and_read_only(config_path):
+    store = ConfigStore(str(config_path), check_interval=0.0)
+    first = store.snapshot()
+    assert store.snapshot() is first
+    assert store.loads == 1
+    assert first["region"]["x2"] == 80
+    with pytest.raises(TypeError):
+        first["zoom"] = 2.0
+    with pytest.raises(TypeError):
+        first["region"]["x2"] = 100
+
+
+def test_mtime_change_invalidates_snapshot(config_path):
+    store = ConfigStore(str(config_path), check_interval=0.0)
+    old = store.snapshot()
+    version = store.version
+    write_config(config_path, {"zoom": 1.5, "hdr_darkness": 1.27, "region": dict(thaw(old["region"]))}, bump_ns=10**9)
+
+    assert store.poll() == ("zoom",)
+    new = store.snapshot()
+    assert new is not old
+    assert (old["zoom"], new["zoom"]) == (1.0, 1.5)
+    assert (store.loads, store.version) == (2, version + 1)
+
+    # 内容相同但 mtime 变化：重新解析，但不算作配置变化
+    write_config(config_path, thaw(new), bump_ns=2 * 10**9)
+    assert store.poll() == ()
+    assert (store.loads, store.version) == (3, version + 1)
+    assert store.snapshot() == new
+
+
+def test_poll_respects_check_interval(config_path):
+    store = ConfigStore(str(config_path), check_interval=3600.0)
+    store.poll(force=True)
+    write_config(config_path, {"zoom": 2.0}, bump_ns=10**9)
+    assert store.poll() == ()
+    assert store.snapshot()["zoom"] == 1.0
+    assert store.poll(force=True) == ("hdr_darkness", "region", "zoom")
+    assert store.snapshot()["zoom"] == 2.0
+
+
+def test_parse_error_keeps_previous_snapshot(config_path):
+    store = ConfigStore(str(config_path), check_interval=0.0)
+    previous = store.snapshot()
+    config_path.write_text("zoom: [1.0\n", encoding="utf-8")
+    os.utime(config_path, ns=(0, os.stat(config_path).st_mtime_ns + 10**9))
+    assert store.poll() == ()
+    assert store.snapshot() is previous
+
+
+def test_missing_file_uses_defaults(tmp_path):
+    store = ConfigStore(str(tmp_path / "missing.yaml"))
+    assert thaw(store.snapshot()) == DEFAULT_ROTATION_CONFIG
+
+
+def test_subscribe_filters_keys_and_unsubscribes(config_path):
+    store = ConfigStore(str(config_path), check_interval=0.0)
+    all_changes = []
+    zoom_changes = []
+
+    def broken(snapshot, changed):
+        raise RuntimeError("订阅者出错不影响其他订阅者")
+
+    store.subscribe(broken)
+    store.subscribe(lambda snapshot, changed: all_changes.append(changed))
+    unsubscribe = store.subscribe(lambda snapshot, changed: zoom_changes.append(snapshot["zoom"]), keys=("zoom",))
+
+    write_config(config_path, {"zoom": 1.0, "hdr_darkness": 0.8, "region": {"x1": 0, "y1": 0, "x2": 80, "y2": 200}},
+                 bump_ns=10**9)
+    store.poll()
+    assert all_changes == [("hdr_darkness",)]
+    assert zoom_changes == []
+
+    write_config(config_path, {"zoom": 1.25, "hdr_darkness": 0.8, "region": {"x1": 0, "y1": 0, "x2": 80, "y2": 200}},
+                 bump_ns=2 * 10**9)
+    store.poll()
+    assert all_changes[-1] == ("zoom",)
+    assert zoom_changes == [1.25]
+
+    unsubscribe()
+    store.update(zoom=0.75)
+    assert all_changes[-1] == ("zoom",)
+    assert zoom_changes == [1.25]
+
+
+def test_update_writes_file_and_notifies_without_reparse(config_path):
+    store = ConfigStore(str(config_path), check_interval=0.0)
+    notified = []
+    store.subscribe(lambda snapshot, changed: notified.append((snapshot["zoom"], changed)))
+
+    snapshot = store.update({"zoom": 1.5}, hdr_darkness=1.27)
+    assert snapshot["zoom"] == 1.5
+    # hdr_darkness 未变化，只通知 zoom
+    assert notified == [(1.5, ("zoom",))]
+    assert yaml.safe_load(config_path.read_text(encoding="utf-8"))["zoom"] == 1.5
+    # 自己写出的文件不再重新解析
+    assert store.poll() == ()
+    assert store.loads == 1
+    assert ConfigStore(str(config_path)).snapshot()["zoom"] == 1.5
+
+
+def test_get_config_store_shares_instances(config_path):
+    store = get_config_store(str(config_path))
+    assert get_config_store(str(config_path)) is store
+    assert get_config_store(os.path.join(str(config_path.parent), ".", config_path.name)) is store
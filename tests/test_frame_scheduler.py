@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+
+from rotation import frame_scheduler
+from rotation.frame_scheduler import FrameScheduler
+
+CONFIG = {
+    "screenshot_delay": 0.5,
+    "scheduler": {"target_fps": 10, "active_fps": 40, "idle_after": 3, "preview_fps": 60},
+    "focus": {"pause_capture": True, "poll_interval": 0.25},
+}
+
+
+class FakeClock:
+    """替换 perf_counter 的假时钟；等待时直接把时间拨到超时点，测试不真正睡眠。"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.waits = []
+
+    def perf_counter(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeWakeEvent:
+    def __init__(self, clock):
+        self.clock = clock
+        self._set = False
+
+    def wait(self, timeout):
+        self.clock.waits.append(timeout)
+        if self._set:
+            return True
+        self.clock.advance(timeout)
+        return False
+
+    def set(self):
+        self._set = True
+
+    def clear(self):
+        self._set = False
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(frame_scheduler.time, "perf_counter", clock.perf_counter)
+    return clock
+
+
+def make_scheduler(clock, config=CONFIG):
+    scheduler = FrameScheduler(config)
+    scheduler._wake_event = FakeWakeEvent(clock)
+    return scheduler
+
+
+def test_mode_selection_and_fps():
+    scheduler = FrameScheduler(CONFIG)
+    assert (scheduler.mode, scheduler.current_fps) == (FrameScheduler.MODE_TARGET, 10)
+
+    scheduler.update(hotkey_held=True)
+    assert (scheduler.mode, scheduler.current_fps) == (FrameScheduler.MODE_ACTIVE, 40)
+
+    # 画面连续未变化：热键按住时仍保持 active
+    for _ in range(3):
+        scheduler.update(unchanged=True)
+    assert scheduler.mode == FrameScheduler.MODE_ACTIVE
+    scheduler.update(hotkey_held=False)
+    assert (scheduler.mode, scheduler.current_fps) == (FrameScheduler.MODE_IDLE, 2.0)
+
+    # 画面一变化就回到目标帧率
+    scheduler.update(unchanged=False)
+    assert scheduler.mode == FrameScheduler.MODE_TARGET
+
+    # 失去前台：暂停截图，只按 poll_interval 检查前台窗口
+    scheduler.update(focused=False, hotkey_held=True)
+    assert scheduler.paused
+    assert scheduler.current_interval == pytest.approx(0.25)
+
+    scheduler.update(focused=True)
+    assert scheduler.mode == FrameScheduler.MODE_ACTIVE
+    assert scheduler.stats()["mode_switches"] == 5
+
+
+def test_unfocused_without_pause_drops_to_idle():
+    scheduler = FrameScheduler(dict(CONFIG, focus={"pause_capture": False}))
+    scheduler.update(focused=False)
+    assert scheduler.mode == FrameScheduler.MODE_IDLE
+
+
+def test_preview_overrides_focus_and_unchanged_frames():
+    scheduler = FrameScheduler(CONFIG)
+    scheduler.set_preview(True, fps=144)
+    scheduler.update(focused=False, unchanged=True)
+    for _ in range(5):
+        scheduler.update(unchanged=True)
+    assert (scheduler.mode, scheduler.current_fps) == (FrameScheduler.MODE_PREVIEW, 144)
+
+    # 关闭预览后恢复按状态选择的节奏，并保留预览帧率供下次开启
+    scheduler.set_preview(False)
+    assert scheduler.paused
+    assert scheduler.preview_fps == 144
+
+
+def test_wait_subtracts_time_spent_on_the_frame(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.begin_frame()
+    clock.advance(0.03)  # 截图 + 匹配耗时
+    waited = scheduler.wait()
+    assert clock.waits == [pytest.approx(0.07)]
+    assert waited == pytest.approx(0.07)
+    assert scheduler.overruns == 0
+
+
+def test_overrun_frame_does_not_wait_or_compensate(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.begin_frame()
+    clock.advance(0.25)
+    assert scheduler.wait() == 0.0
+    assert clock.waits == []
+    assert scheduler.overruns == 1
+
+    # 下一帧从当前时刻重新计时，而不是缩短间隔追赶
+    scheduler.begin_frame()
+    clock.advance(0.01)
+    scheduler.wait()
+    assert clock.waits == [pytest.approx(0.09)]
+
+
+def test_deadline_follows_mode_change_during_frame(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.begin_frame()
+    clock.advance(0.01)
+    scheduler.update(hotkey_held=True)  # 40 FPS -> 25ms 间隔
+    scheduler.wait()
+    assert clock.waits == [pytest.approx(0.015)]
+
+
+def test_wait_returns_immediately_when_stopped(clock):
+    scheduler = make_scheduler(clock)
+    stop_event = threading.Event()
+    stop_event.set()
+    scheduler.begin_frame()
+    assert scheduler.wait(stop_event) == 0.0
+    assert clock.waits == []
+
+
+def test_wake_ends_wait_early(clock):
+    scheduler = make_scheduler(clock)
+    scheduler.begin_frame()
+    scheduler.wake()
+    assert scheduler.wait() == 0.0
+    # 唤醒标记被消费，下一次等待照常睡到截止时间
+    scheduler.begin_frame()
+    assert scheduler.wait() == pytest.approx(0.1)
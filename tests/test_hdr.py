@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from rotation.capture_backend import SyntheticCaptureBackend
+from rotation.matcher import ImageMatcher
+from rotation.template_matcher import TemplateMatcher
+
+REGION = {"x1": 0, "y1": 0, "x2": 160, "y2": 96}
+ICONS = {
+    name: np.random.default_rng(seed).integers(0, 256, size=(32, 32, 3), dtype=np.uint8)
+    for seed, name in enumerate(("Mortal_Strike", "Slam", "Execute"), start=1)
+}
+
+
+def make_frames(seed=0):
+    """每个图标一帧：噪声背景上的某个位置放一个模板（模拟偏亮的 HDR 截图）。"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for name, icon in ICONS.items():
+        frame = rng.integers(60, 200, size=(REGION["y2"], REGION["x2"], 3), dtype=np.uint8)
+        x = int(rng.integers(0, REGION["x2"] - 32))
+        y = int(rng.integers(0, REGION["y2"] - 32))
+        frame[y:y + 32, x:x + 32] = icon
+        frames.append((name, (x, y), frame))
+    return frames
+
+
+def match_all(hdr_mode, dark_factor, frames):
+    config = {
+        "region": REGION,
+        "delay": {"min": 0.0, "max": 0.0},
+        "screenshot_delay": 0.01,
+        "hdr_darkness": dark_factor,
+        "hdr_mode": hdr_mode,
+        "change_detection": {"enabled": False},
+        "capture": {"backend": "synthetic"},
+        "input": {"backend": "recording"},
+    }
+    matcher = ImageMatcher(dict(ICONS), {}, config, "retail")
+    matcher.capture_backend = SyntheticCaptureBackend([frame for _, _, frame in frames])
+    results = []
+    matcher.frame_hub.subscribe(
+        lambda event: results.append((event.best_name, event.best_img_info[1], event.best_score)), name="test"
+    )
+    try:
+        for _ in frames:
+            matcher.match_images()
+    finally:
+        matcher.close()
+    return results
+
+
+@pytest.mark.parametrize("dark_factor", [0.3, 1.0, 1.27, 2.5])
+def test_lut_matches_float_pixels_within_one_level(dark_factor):
+    frame = np.random.default_rng(7).integers(0, 256, size=(64, 64, 3), dtype=np.uint8)
+    reference = TemplateMatcher.apply_hdr_correction(frame, dark_factor).astype(np.int16)
+    lut = TemplateMatcher.apply_hdr_correction_lut(frame, dark_factor).astype(np.int16)
+    assert np.abs(reference - lut).max() <= 1
+
+
+@pytest.mark.parametrize("dark_factor", [0.3, 1.27])
+def test_float_and_lut_modes_agree_on_synthetic_frames(dark_factor):
+    frames = make_frames()
+    float_results = match_all("float", dark_factor, frames)
+    lut_results = match_all("lut", dark_factor, frames)
+    assert len(float_results) == len(lut_results) == len(frames)
+    for (name, location, _), (float_name, float_loc, float_score), (lut_name, lut_loc, lut_score) in zip(
+        frames, float_results, lut_results
+    ):
+        assert float_name == lut_name == name
+        assert tuple(float_loc) == tuple(lut_loc) == location
+        assert abs(float_score - lut_score) < 0.01
@@ -0,0 +1,84 @@
+import threading
+import time
+
+from rotation.frame_scheduler import FrameScheduler
+from rotation.hotkey import HotkeySource, HotkeyState, SyntheticHotkeySource
+
+
+class FailingHotkeySource(HotkeySource):
+    def start(self, key, callback):
+        raise OSError("no keyboard hook")
+
+
+def make_state():
+    source = SyntheticHotkeySource()
+    changes = []
+    state = HotkeyState("`", source=source, on_change=changes.append)
+    assert state.start()
+    return state, source, changes
+
+
+def test_press_and_release_toggle_held():
+    state, source, changes = make_state()
+    assert not state.held
+    source.press()
+    assert state.held
+    source.release()
+    assert not state.held
+    assert changes == [True, False]
+
+
+def test_auto_repeat_does_not_retrigger():
+    state, source, changes = make_state()
+    source.press()
+    source.press()
+    source.press()
+    source.release()
+    source.release()
+    assert changes == [True, False]
+
+
+def test_stop_clears_held_and_ignores_later_events():
+    state, source, changes = make_state()
+    source.press()
+    state.stop()
+    assert not state.held
+    assert not state.started
+    source.press()
+    assert not state.held
+    assert changes == [True]
+
+
+def test_start_failure_keeps_hotkey_released():
+    state = HotkeyState("`", source=FailingHotkeySource())
+    assert not state.start()
+    assert not state.started
+    assert not state.held
+
+
+def wake_on_press(scheduler):
+    return lambda held: scheduler.wake() if held else None
+
+
+def test_press_wakes_waiting_scheduler():
+    scheduler = FrameScheduler({"scheduler": {"target_fps": 0.5}})
+    source = SyntheticHotkeySource()
+    HotkeyState("`", source=source, on_change=wake_on_press(scheduler)).start()
+    scheduler.begin_frame()
+    timer = threading.Timer(0.05, source.press)
+    timer.start()
+    waited = scheduler.wait()
+    timer.join()
+    assert waited < 1.0
+
+
+def test_press_before_wait_is_not_lost():
+    scheduler = FrameScheduler({"scheduler": {"target_fps": 0.5}})
+    source = SyntheticHotkeySource()
+    HotkeyState("`", source=source, on_change=wake_on_press(scheduler)).start()
+    scheduler.begin_frame()
+    # 热键在引擎处理上一帧时按下：下一次等待应立即返回，而不是睡满整个间隔
+    source.press()
+    start = time.perf_counter()
+    scheduler.wait()
+    assert time.perf_counter() - start < 1.0
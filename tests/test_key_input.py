@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from rotation.key_input import KeyInputDispatcher, RecordingKeyBackend, create_key_backend
+from rotation.key_presser import KeyPresser
+
+
+class GatedKeyBackend(RecordingKeyBackend):
+    """第一次按键阻塞到 gate 打开，便于在输入线程忙碌时堆积待发送的按键。"""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+
+    def press(self, key):
+        self.entered.set()
+        self.gate.wait(2.0)
+        super().press(key)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def make_dispatcher(backend, delay=0.0, max_pending=2):
+    presser = KeyPresser({"delay": {"min": delay, "max": delay}}, backend=backend)
+    return KeyInputDispatcher(presser, max_pending=max_pending)
+
+
+@pytest.fixture
+def recording():
+    return RecordingKeyBackend()
+
+
+def pressed_keys(backend):
+    return [key for key, _ in backend.presses]
+
+
+def test_create_key_backend_recording():
+    assert isinstance(create_key_backend({"input": {"backend": "recording"}}), RecordingKeyBackend)
+
+
+def test_submit_presses_in_order(recording):
+    dispatcher = make_dispatcher(recording)
+    try:
+        assert dispatcher.submit("1")
+        assert wait_until(lambda: len(recording.presses) == 1)
+        assert dispatcher.submit("2")
+        assert wait_until(lambda: len(recording.presses) == 2)
+    finally:
+        dispatcher.stop()
+    assert pressed_keys(recording) == ["1", "2"]
+    assert dispatcher.stats()["pressed"] == 2
+
+
+def test_max_pending_drops_oldest_and_coalesces_duplicates():
+    backend = GatedKeyBackend()
+    dispatcher = make_dispatcher(backend, max_pending=2)
+    try:
+        dispatcher.submit("1")
+        assert backend.entered.wait(2.0)
+        # 输入线程卡在 "1" 上：队列只能容纳两项，"2" 作为最旧的一项被丢弃
+        assert dispatcher.submit("2")
+        assert dispatcher.submit("3")
+        assert not dispatcher.submit("3")
+        assert dispatcher.submit("4")
+        backend.gate.set()
+        assert wait_until(lambda: len(backend.presses) == 3)
+    finally:
+        dispatcher.stop()
+    assert pressed_keys(backend) == ["1", "3", "4"]
+    stats = dispatcher.stats()
+    assert stats["dropped"] == 1
+    assert stats["coalesced"] == 1
+
+
+def test_cast_repeats_until_cast_time_ends(recording):
+    dispatcher = make_dispatcher(recording, delay=0.02)
+    try:
+        start = time.perf_counter()
+        dispatcher.submit("5", cast_time=0.15)
+        # 施法期间同一键的推荐被合并
+        assert not dispatcher.submit("5", cast_time=0.15)
+        assert wait_until(lambda: dispatcher.casting is None and time.perf_counter() - start > 0.2)
+        count = len(recording.presses)
+        time.sleep(0.1)
+    finally:
+        dispatcher.stop()
+    assert len(recording.presses) == count
+    assert count >= 3
+    assert set(pressed_keys(recording)) == {"5"}
+    times = [t for _, t in recording.presses]
+    assert all(later - earlier >= 0.015 for earlier, later in zip(times, times[1:]))
+    assert times[-1] - start < 0.15 + 0.05
+
+
+def test_other_key_preempts_cast(recording):
+    dispatcher = make_dispatcher(recording, delay=0.02)
+    try:
+        dispatcher.submit("5", cast_time=1.0)
+        assert wait_until(lambda: len(recording.presses) >= 2)
+        assert dispatcher.submit("1")
+        assert dispatcher.casting is None
+        assert wait_until(lambda: "1" in pressed_keys(recording))
+        count = len(recording.presses)
+        time.sleep(0.1)
+    finally:
+        dispatcher.stop()
+    keys = pressed_keys(recording)
+    assert len(keys) == count
+    assert keys[-1] == "1"
+    assert set(keys[:-1]) == {"5"}
+    assert dispatcher.stats()["preempted"] == 1
+
+
+def test_timers_fire_in_due_order(recording):
+    dispatcher = make_dispatcher(recording)
+    dispatcher.start()
+    try:
+        with dispatcher._cond:
+            now = time.perf_counter()
+            dispatcher._cast_key = "x"
+            dispatcher._cast_end = now + 10.0
+            cast_id = dispatcher._cast_id
+            dispatcher._schedule(now + 0.06, "a", cast_id)
+            dispatcher._schedule(now + 0.02, "b", cast_id)
+            dispatcher._schedule(now + 0.04, "c", cast_id)
+            # 编号过期的定时器（被抢占的施法）不会触发
+            dispatcher._schedule(now + 0.01, "stale", cast_id - 1)
+        assert wait_until(lambda: len(recording.presses) == 3)
+        time.sleep(0.05)
+    finally:
+        dispatcher.stop()
+    assert pressed_keys(recording) == ["b", "c", "a"]
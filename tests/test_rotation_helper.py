@@ -0,0 +1,79 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from rotation.capture_backend import SyntheticCaptureBackend
+from rotation.frame_scheduler import FrameScheduler
+from rotation.hotkey import SyntheticHotkeySource
+from rotation.run import RotationHelper
+
+
+@pytest.fixture
+def helper(tmp_path):
+    keybind_file = tmp_path / "warrior_fury.json"
+    keybind_file.write_text(json.dumps({"Slam": "5"}), encoding="utf-8")
+    helper = RotationHelper("warrior", "fury", keybind_file=str(keybind_file), hotkey_source=SyntheticHotkeySource())
+    helper.matcher.require_focus = False
+    # 不依赖本机 rotation_config.yaml 中的截图区域与缩放
+    helper.matcher.region = (0, 0, 96, 80)
+    helper.matcher.set_zoom(0.5)
+    yield helper
+    helper.matcher.close()
+
+
+def frame_with_icon(helper, name):
+    x1, y1, x2, y2 = helper.matcher.region
+    frame = np.full((y2 - y1, x2 - x1, 3), 40, dtype=np.uint8)
+    icon = helper.icon_loader.load_images([name])[name]
+    h, w = icon.shape[:2]
+    icon = cv2.resize(icon, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+    h, w = icon.shape[:2]
+    frame[10:10 + h, 20:20 + w] = icon
+    return frame
+
+
+def run_frame(helper, frame):
+    helper.matcher.capture_backend = SyntheticCaptureBackend([frame])
+    helper._update_key_state()
+    helper.matcher.match_images()
+
+
+def test_run_mode_matches_only_bound_icons(helper):
+    run_frame(helper, frame_with_icon(helper, "Slam"))
+    assert set(helper.matcher.icon_templates) == {"Slam"}
+
+
+def test_preview_mode_matches_every_talent_icon(helper):
+    helper.set_mode("preview")
+    run_frame(helper, frame_with_icon(helper, "Bloodthirst"))
+    assert set(helper.matcher.icon_templates) == set(helper.icon_loader.available_abilities())
+
+    helper.set_mode("run")
+    run_frame(helper, frame_with_icon(helper, "Slam"))
+    assert set(helper.matcher.icon_templates) == {"Slam"}
+
+
+def test_preview_highlights_unbound_icon_without_pressing(helper):
+    matched = []
+    presses = []
+    helper.set_match_callback(matched.append)
+    helper.matcher.key_sink = presses.append
+    helper.set_mode("preview")
+    run_frame(helper, frame_with_icon(helper, "Bloodthirst"))
+    assert matched == ["Bloodthirst"]
+    assert presses == []
+
+
+def test_preview_mode_keeps_display_rate(helper):
+    helper.set_mode("preview")
+    helper.set_preview_callback(lambda: None, max_fps=144.0)
+    scheduler = helper.scheduler
+    for _ in range(scheduler.idle_after + 5):
+        scheduler.update(focused=False, unchanged=True)
+    assert scheduler.mode == FrameScheduler.MODE_PREVIEW
+    assert scheduler.current_fps == 144.0
+
+    helper.set_mode("run")
+    assert scheduler.mode != FrameScheduler.MODE_PREVIEW
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+
+from rotation import telemetry
+from rotation.capture_backend import SyntheticCaptureBackend
+from rotation.matcher import ImageMatcher
+from rotation.telemetry import TELEMETRY_DTYPE, TelemetrySession, TelemetryWriter
+
+REGION = {"x1": 0, "y1": 0, "x2": 160, "y2": 96}
+SLAM = np.random.default_rng(2).integers(0, 256, size=(32, 32, 3), dtype=np.uint8)
+
+
+def part_files(path):
+    return sorted(name for name in os.listdir(path) if name.endswith(".bin"))
+
+
+def test_writer_session_round_trip(tmp_path):
+    writer = TelemetryWriter(str(tmp_path))
+    writer.emit(1.0, "Slam", 0.9, 0.4, {"capture": 1.5, "hdr": 0.5, "match": 2.0, "focus": 0.1},
+                telemetry.ACTION_KEY, key="2")
+    writer.emit(2.0, "Slam", 0.9, 0.4, {"capture": 1.25}, telemetry.ACTION_NONE, unchanged=True)
+    writer.emit(3.0, None, None, None, {"capture": 1.0}, telemetry.ACTION_UNFOCUSED)
+    writer.close()
+    assert (writer.written, writer.dropped) == (3, 0)
+    # 关闭后不再接收记录
+    assert writer.emit(4.0, "Slam", 0.9, 0.4, {}, telemetry.ACTION_KEY) is False
+
+    session = TelemetrySession(str(tmp_path))
+    assert len(session) == 3
+    assert session.dtype == TELEMETRY_DTYPE
+    assert list(session.column("t")) == [1.0, 2.0, 3.0]
+    assert list(session.best_names()) == ["Slam", "Slam", None]
+    assert list(session.keys()) == ["2", None, None]
+    assert list(session.column("unchanged")) == [0, 1, 0]
+    assert session.action_counts() == {"none": 1, "unfocused": 1, "preview": 0, "key": 1, "cast": 0}
+    # 未执行的阶段记为 NaN
+    assert session.column("match_ms")[0] == np.float32(2.0)
+    assert np.isnan(session.column("match_ms")[1:]).all()
+    assert np.isnan(session.column("score")[2])
+    assert session.margin[0] == np.float32(0.9) - np.float32(0.4)
+
+
+def test_writer_rolls_parts_and_trims_old_ones(tmp_path):
+    # 每个分片只放两条记录，最多保留两个分片
+    records_mb = 2 * TELEMETRY_DTYPE.itemsize / (1024 * 1024)
+    writer = TelemetryWriter(str(tmp_path), max_file_mb=records_mb, max_files=2)
+    for i in range(7):
+        writer.emit(float(i), "Slam", 0.9, 0.1, {}, telemetry.ACTION_KEY, key="2")
+    writer.close()
+
+    assert writer.written == 7
+    assert part_files(tmp_path) == ["events_00002.bin", "events_00003.bin"]
+    session = TelemetrySession(str(tmp_path))
+    assert list(session.column("t")) == [4.0, 5.0, 6.0]
+    assert list(session.keys()) == ["2", "2", "2"]
+
+
+def test_new_writer_replaces_previous_session_parts(tmp_path):
+    writer = TelemetryWriter(str(tmp_path), max_file_mb=TELEMETRY_DTYPE.itemsize / (1024 * 1024))
+    for i in range(3):
+        writer.emit(float(i), "Slam", 0.9, 0.1, {}, telemetry.ACTION_KEY)
+    writer.close()
+    assert len(part_files(tmp_path)) == 3
+
+    writer = TelemetryWriter(str(tmp_path))
+    writer.emit(10.0, "Execute", 0.8, 0.2, {}, telemetry.ACTION_NONE)
+    writer.close()
+    assert part_files(tmp_path) == ["events_00000.bin"]
+    session = TelemetrySession(str(tmp_path))
+    assert list(session.column("t")) == [10.0]
+    assert list(session.best_names()) == ["Execute"]
+
+
+def test_matcher_emits_telemetry_for_synthetic_frames(tmp_path):
+    frame = np.full((REGION["y2"], REGION["x2"], 3), 40, dtype=np.uint8)
+    frame[40:72, 64:96] = SLAM
+    config = {
+        "region": REGION,
+        "delay": {"min": 0.0, "max": 0.0},
+        "screenshot_delay": 0.01,
+        "hdr_darkness": 1.0,
+        "hdr_mode": "float",
+        "capture": {"backend": "synthetic"},
+        "input": {"backend": "recording"},
+    }
+    matcher = ImageMatcher({"Slam": SLAM}, {"Slam": "2"}, config, "retail")
+    matcher.capture_backend = SyntheticCaptureBackend([frame])
+    matcher.require_focus = False
+    presses = []
+    matcher.key_sink = presses.append
+    matcher.start_telemetry(str(tmp_path))
+    try:
+        matcher.match_images()
+        matcher.match_images()
+    finally:
+        matcher.stop_telemetry()
+        matcher.close()
+
+    session = TelemetrySession(str(tmp_path))
+    assert len(session) == 2
+    assert list(session.best_names()) == ["Slam", "Slam"]
+    # 第二帧画面未变化：复用上一帧结果，不重新做 HDR / 匹配
+    assert list(session.column("unchanged")) == [0, 1]
+    assert not np.isnan(session.column("match_ms")[0])
+    assert np.isnan(session.column("match_ms")[1])
+    assert session.keys()[0] == "2"
+    assert session.column("action")[0] == telemetry.ACTION_KEY
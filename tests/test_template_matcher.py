@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+import pytest
+
+from rotation.template_matcher import (
+    BatchedTemplateMatcher,
+    PyramidTemplateMatcher,
+    SlotTemplateMatcher,
+    TemplateCache,
+)
+
+FRAME_H, FRAME_W = 96, 160
+
+
+def make_icon(seed, h, w):
+    return np.random.default_rng(seed).integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+
+
+TEMPLATES = {
+    "Mortal_Strike": make_icon(1, 32, 32),
+    "Slam": make_icon(2, 32, 32),
+    "Execute": make_icon(3, 24, 28),
+    # 比 region 还大的模板：所有匹配器都应跳过，而不是报错或误匹配
+    "Bladestorm": make_icon(4, FRAME_H + 8, FRAME_W + 8),
+}
+
+MATCHERS = {
+    "batched": lambda cache: BatchedTemplateMatcher(cache),
+    "slot": lambda cache: SlotTemplateMatcher(cache, confidence=0.6),
+    "pyramid": lambda cache: PyramidTemplateMatcher(cache, levels=1, top_k=3, margin=4),
+}
+
+
+def make_frame(name, x, y, seed=0):
+    frame = np.random.default_rng(seed).integers(0, 256, size=(FRAME_H, FRAME_W, 3), dtype=np.uint8)
+    icon = TEMPLATES[name]
+    frame[y:y + icon.shape[0], x:x + icon.shape[1]] = icon
+    return frame
+
+
+def reference_best(frame, templates):
+    """cv2.matchTemplate(TM_CCOEFF_NORMED) 逐模板全图搜索的参考结果。"""
+    best_name, best_loc, best_score = None, None, -1.0
+    for name, tmpl in templates.items():
+        if tmpl.shape[0] > frame.shape[0] or tmpl.shape[1] > frame.shape[1]:
+            continue
+        _, score, _, loc = cv2.minMaxLoc(cv2.matchTemplate(frame, tmpl, cv2.TM_CCOEFF_NORMED))
+        if score > best_score:
+            best_name, best_loc, best_score = name, loc, score
+    return best_name, best_loc, best_score
+
+
+PLACEMENTS = [
+    pytest.param("Mortal_Strike", 64, 40, id="centre"),
+    pytest.param("Slam", 0, 0, id="top-left-edge"),
+    pytest.param("Slam", FRAME_W - 32, FRAME_H - 32, id="bottom-right-edge"),
+    pytest.param("Execute", FRAME_W - 28, 0, id="top-right-edge-smaller-template"),
+    pytest.param("Execute", 0, FRAME_H - 24, id="bottom-left-edge-smaller-template"),
+]
+
+
+@pytest.mark.parametrize("matcher_name", sorted(MATCHERS))
+@pytest.mark.parametrize("name,x,y", PLACEMENTS)
+def test_matchers_agree_with_cv2_reference(matcher_name, name, x, y):
+    frame = make_frame(name, x, y)
+    ref_name, ref_loc, ref_score = reference_best(frame, TEMPLATES)
+    assert (ref_name, ref_loc) == (name, (x, y))
+
+    matcher = MATCHERS[matcher_name](TemplateCache(TEMPLATES))
+    # 连续两帧：slot 模式第一帧完整搜索学习槽位，第二帧走快速路径
+    for _ in range(2):
+        best_name, best_img_info, best_score = matcher.match_best(frame)
+        assert best_name == ref_name
+        assert tuple(best_img_info[1]) == ref_loc
+        assert best_img_info[2] == (TEMPLATES[name].shape[1], TEMPLATES[name].shape[0])
+        assert best_score == pytest.approx(ref_score, abs=1e-3)
+
+
+@pytest.mark.parametrize("matcher_name", sorted(MATCHERS))
+def test_matchers_follow_icon_across_frames(matcher_name):
+    matcher = MATCHERS[matcher_name](TemplateCache(TEMPLATES))
+    # 图标换位置（例如 region 内换了槽位）后仍与参考结果一致
+    for name, x, y in (("Mortal_Strike", 64, 40), ("Slam", FRAME_W - 32, FRAME_H - 32), ("Mortal_Strike", 8, 50)):
+        frame = make_frame(name, x, y, seed=x + y)
+        ref_name, ref_loc, ref_score = reference_best(frame, TEMPLATES)
+        best_name, best_img_info, best_score = matcher.match_best(frame)
+        assert (best_name, tuple(best_img_info[1])) == (ref_name, ref_loc)
+        assert best_score == pytest.approx(ref_score, abs=1e-3)
+
+
+@pytest.mark.parametrize("matcher_name", sorted(MATCHERS))
+def test_template_larger_than_region_is_skipped(matcher_name):
+    frame = make_frame("Slam", 10, 10)
+    matcher = MATCHERS[matcher_name](TemplateCache({"Bladestorm": TEMPLATES["Bladestorm"]}))
+    best_name, best_img_info, _ = matcher.match_best(frame)
+    assert best_name is None
+    assert best_img_info is None
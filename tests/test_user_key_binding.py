@@ -0,0 +1,44 @@
+import json
+
+from rotation.user_key_binding import UserKeyBindLoader
+
+
+def write_keybinds(tmp_path, data):
+    path = tmp_path / "keybinds.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def test_cast_times_loaded_and_invalid_values_skipped(tmp_path, capsys):
+    path = write_keybinds(tmp_path, {
+        "Slam": ["5", 0.7],
+        "Pyroblast": "6",
+        "cast_times": {
+            "Pyroblast": 3.5,
+            "Frostbolt": "1.5",
+            "Slam": 0,
+            "Arcane_Missiles": -2,
+            "Fireball": "slow",
+            "Blizzard": None,
+        },
+    })
+    loader = UserKeyBindLoader(path)
+
+    assert loader.get_skill_cast_time_mapping() == {"Pyroblast": 3.5, "Frostbolt": 1.5}
+    # cast_times 是特殊字段，不会被当成技能绑定
+    assert loader.get_skill_key_mapping() == {"Slam": "5", "Pyroblast": "6"}
+    assert loader.get_skill_threshold_mapping() == {"Slam": 0.7}
+
+    out = capsys.readouterr().out
+    assert "忽略无效的施法时间: Fireball = 'slow'" in out
+    assert "忽略无效的施法时间: Blizzard = None" in out
+    # 0 与负数表示瞬发，直接忽略而不告警
+    assert "Slam =" not in out
+    assert "Arcane_Missiles" not in out
+
+
+def test_missing_or_malformed_cast_times_give_empty_mapping(tmp_path):
+    assert UserKeyBindLoader(write_keybinds(tmp_path, {"Slam": "5"})).get_skill_cast_time_mapping() == {}
+    loader = UserKeyBindLoader(write_keybinds(tmp_path, {"Slam": "5", "cast_times": ["Slam", 1.0]}))
+    assert loader.get_skill_cast_time_mapping() == {}
+    assert loader.get_skill_key_mapping() == {"Slam": "5"}